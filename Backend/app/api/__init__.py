@@ -18,6 +18,7 @@ from app.api.reports import router as reports_router
 from app.api.products import router as products_router
 from app.api.assistants import router as assistant_router
 from app.api.drivers import router as drivers_router 
+from app.api.admin import router as admin_router
 
 api_router = APIRouter()
 api_router.include_router(customer_router, tags=["customer"])
@@ -36,5 +37,6 @@ api_router.include_router(products_router, tags=["products"])
 api_router.include_router(assistant_router, tags= ["Assistant"])
 api_router.include_router(drivers_router, tags=["Drivers"])
 api_router.include_router(trucks, tags=["Trucks"])
+api_router.include_router(admin_router, tags=["Admin"])
 
 
@@ -0,0 +1,140 @@
+# app/api/admin.py
+from typing import Literal, Optional
+from fastapi import APIRouter, Query, Security, status
+from app.core.auth import require_system_admin, principal_cache, token_cache
+from app.core.database import engine, async_engine, replica_engine, replica_async_engine
+from app.core.pool_metrics import pool_status
+from app.core.slow_query_log import recent_slow_queries, clear_slow_queries, SLOW_QUERY_MS
+from app.core.reference_cache import reference_cache
+from app.core.token_versions import token_versions
+from app.core.transactions import transaction_stats, reset_transaction_stats
+from app.core.login_throttle import login_throttle
+from app.core.idempotency import idempotency
+from app.core.status_history import status_history
+
+router = APIRouter(prefix="/admin")
+
+
+@router.get("/db/pool", status_code=status.HTTP_200_OK)
+def get_pool_metrics(current_user: dict = Security(require_system_admin)):
+    """Connection pool gauges, event counters and checkout wait histograms (SystemAdmin only)"""
+    pools = {
+        "primary": pool_status(engine, "primary"),
+        "primary_async": pool_status(async_engine.sync_engine, "primary_async"),
+    }
+    if replica_engine is not engine:
+        pools["replica"] = pool_status(replica_engine, "replica")
+        pools["replica_async"] = pool_status(replica_async_engine.sync_engine, "replica_async")
+    return pools
+
+
+@router.get("/db/slow-queries", status_code=status.HTTP_200_OK)
+def get_slow_queries(limit: int = Query(50, ge=1, le=1000), current_user: dict = Security(require_system_admin)):
+    """Most recent slow statements with their captured EXPLAIN plans (SystemAdmin only)"""
+    entries = recent_slow_queries(limit)
+    return {"threshold_ms": SLOW_QUERY_MS, "count": len(entries), "entries": entries}
+
+
+@router.delete("/db/slow-queries", status_code=status.HTTP_200_OK)
+def delete_slow_queries(current_user: dict = Security(require_system_admin)):
+    """Clear the slow statement buffer (SystemAdmin only)"""
+    clear_slow_queries()
+    return {"detail": "Slow query log cleared"}
+
+
+@router.get("/db/transactions", status_code=status.HTTP_200_OK)
+def get_transaction_metrics(current_user: dict = Security(require_system_admin)):
+    """Per-route commit, deadlock/lock-timeout retry and abort counters (SystemAdmin only)"""
+    return transaction_stats()
+
+
+@router.delete("/db/transactions", status_code=status.HTTP_200_OK)
+def delete_transaction_metrics(current_user: dict = Security(require_system_admin)):
+    """Reset the transaction retry counters (SystemAdmin only)"""
+    reset_transaction_stats()
+    return {"detail": "Transaction counters reset"}
+
+
+@router.get("/cache/reference", status_code=status.HTTP_200_OK)
+def get_reference_cache_stats(current_user: dict = Security(require_system_admin)):
+    """Reference-data cache hit/miss counters and cached row counts (SystemAdmin only)"""
+    return reference_cache.stats()
+
+
+@router.delete("/cache/reference", status_code=status.HTTP_200_OK)
+def clear_reference_cache(current_user: dict = Security(require_system_admin)):
+    """Drop every cached reference table; each reloads on next use (SystemAdmin only)"""
+    for name in reference_cache.tables:
+        reference_cache.invalidate(name)
+    return {"detail": "Reference cache cleared"}
+
+
+@router.get("/cache/principals", status_code=status.HTTP_200_OK)
+def get_principal_cache_stats(current_user: dict = Security(require_system_admin)):
+    """Authenticated-principal cache size and hit ratio (SystemAdmin only)"""
+    return principal_cache.stats()
+
+
+@router.delete("/cache/principals", status_code=status.HTTP_200_OK)
+def clear_principal_cache(current_user: dict = Security(require_system_admin)):
+    """Drop every cached principal (SystemAdmin only)"""
+    principal_cache.clear()
+    return {"detail": "Principal cache cleared"}
+
+
+@router.get("/cache/token-versions", status_code=status.HTTP_200_OK)
+def get_token_version_stats(current_user: dict = Security(require_system_admin)):
+    """Token version map used by claims-carrying tokens: checks, rejections, reloads (SystemAdmin only)"""
+    return token_versions.stats()
+
+
+@router.get("/cache/tokens", status_code=status.HTTP_200_OK)
+def get_token_cache_stats(current_user: dict = Security(require_system_admin)):
+    """Decoded-token cache size and hit ratio (SystemAdmin only)"""
+    return token_cache.stats()
+
+
+@router.delete("/cache/tokens", status_code=status.HTTP_200_OK)
+def clear_token_cache(current_user: dict = Security(require_system_admin)):
+    """Drop every cached token payload (SystemAdmin only)"""
+    token_cache.clear()
+    return {"detail": "Token cache cleared"}
+
+
+@router.get("/auth/login-throttle", status_code=status.HTTP_200_OK)
+def get_login_throttle_stats(current_user: dict = Security(require_system_admin)):
+    """Login throttle limits, lockouts and throttled-attempt counters (SystemAdmin only)"""
+    return login_throttle.stats()
+
+
+@router.delete("/auth/login-throttle", status_code=status.HTTP_200_OK)
+def clear_login_throttle(
+    username: Optional[str] = None,
+    scope: Literal["users", "customers"] = "users",
+    current_user: dict = Security(require_system_admin),
+):
+    """Unlock one username, or every username and IP when none is given (SystemAdmin only)"""
+    if username:
+        login_throttle.unlock(scope, username)
+        return {"detail": f"Login throttle cleared for {scope} {username}"}
+    login_throttle.store.clear()
+    return {"detail": "Login throttle cleared"}
+
+
+@router.get("/idempotency", status_code=status.HTTP_200_OK)
+def get_idempotency_stats(current_user: dict = Security(require_system_admin)):
+    """Idempotency-Key store size and replay/conflict counters (SystemAdmin only)"""
+    return idempotency.stats()
+
+
+@router.delete("/idempotency", status_code=status.HTTP_200_OK)
+def clear_idempotency_keys(current_user: dict = Security(require_system_admin)):
+    """Forget every stored Idempotency-Key and response (SystemAdmin only)"""
+    idempotency.store.clear()
+    return {"detail": "Idempotency keys cleared"}
+
+
+@router.get("/status-history", status_code=status.HTTP_200_OK)
+def get_status_history_stats(current_user: dict = Security(require_system_admin)):
+    """Order status history writer queue and batch counters (SystemAdmin only)"""
+    return status_history.stats()
@@ -6,7 +6,12 @@ from app.core.database import get_db
 from app.core import model, schemas
 import pytz
 from enum import Enum
-from app.core.auth import get_current_user
+from app.core.policies import require_policy
+from app.core.transactions import run_in_transaction
+from app.utils.streaming import stream_rows, json_array_response
+from app.utils.order_status import transition
+from sqlalchemy import select
+from itertools import chain
 from app.utils.capacity_calculator import (
     calculate_order_space,
     check_capacity_available,
@@ -24,61 +29,48 @@ class AllocationType(str, Enum):
 
 @router.get("/", status_code=status.HTTP_200_OK)
 def get_all_allocations(
-    db: db_dependency,
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(require_policy("allocations.list"))
 ):
     """Get all allocations (both rail and truck)"""
-    role = current_user.get("role")
-    if role not in ["SystemAdmin", "Assistant", "Management"]:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="You cannot access Routes"
-        )
-
-    # Get both rail and truck allocations
-    rail_allocations = db.query(model.RailAllocations).all()
-    truck_allocations = db.query(model.TruckAllocations).all()
-
-    # Combine and format the allocations
-    allocations = []
-    
-    for rail in rail_allocations:
-        allocations.append({
-            "allocation_id": rail.allocation_id,
-            "order_id": rail.order_id,
-            "schedule_id": rail.schedule_id,
-            "shipment_date": rail.shipment_date,
-            "allocated_space": rail.allocated_space,
-            "status": rail.status.value,
+    # Stream both rail and truck allocations (rail first) from server-side cursors
+    rail = model.RailAllocations
+    truck = model.TruckAllocations
+    rail_query = select(rail.allocation_id, rail.order_id, rail.schedule_id, rail.shipment_date,
+                        rail.allocated_space, rail.status)
+    truck_query = select(truck.allocation_id, truck.order_id, truck.schedule_id, truck.shipment_date,
+                         truck.status)
+
+    def to_rail(row):
+        return {
+            "allocation_id": row.allocation_id,
+            "order_id": row.order_id,
+            "schedule_id": row.schedule_id,
+            "shipment_date": row.shipment_date,
+            "allocated_space": row.allocated_space,
+            "status": row.status.value,
             "allocation_type": "Rail"
-        })
-    
-    for truck in truck_allocations:
-        allocations.append({
-            "allocation_id": truck.allocation_id,
-            "order_id": truck.order_id,
-            "schedule_id": truck.schedule_id,
-            "shipment_date": truck.shipment_date,
-            "status": truck.status.value,
+        }
+
+    def to_truck(row):
+        return {
+            "allocation_id": row.allocation_id,
+            "order_id": row.order_id,
+            "schedule_id": row.schedule_id,
+            "shipment_date": row.shipment_date,
+            "status": row.status.value,
             "allocation_type": "Truck"
-        })
+        }
 
-    return allocations
+    allocations = chain(map(to_rail, stream_rows(rail_query)), map(to_truck, stream_rows(truck_query)))
+    return json_array_response(allocations)
 
 @router.get("/{allocation_id}", status_code=status.HTTP_200_OK)
 def get_allocation_by_id(
     allocation_id: str,
     db: db_dependency,
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(require_policy("allocations.read"))
 ):
     """Get a specific allocation by ID"""
-    role = current_user.get("role")
-    if role not in ["Assistant", "Management"]:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="You cannot access Routes"
-        )
-
     # Try to find in rail allocations first
     rail_allocation = db.query(model.RailAllocations).filter(
         model.RailAllocations.allocation_id == allocation_id
@@ -122,16 +114,9 @@ def create_allocation(
     allocation_type: AllocationType,
     shipment_date: date,
     db: db_dependency,
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(require_policy("allocations.create"))
 ):
     """Create a new allocation"""
-    role = current_user.get("role")
-    if role not in ["SystemAdmin", "Assistant", "Management"]:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="You cannot access Routes"
-        )
-
     # Validate order exists
     order = db.query(model.Orders).filter(model.Orders.order_id == order_id).first()
     if not order:
@@ -154,7 +139,9 @@ def create_allocation(
             detail="Shipment date cannot be in the past"
         )
 
-    try:
+    # The capacity check and the insert run as one transaction, retried as a whole if
+    # it deadlocks with a concurrent allocation on the same schedule.
+    def write(db: Session):
         if allocation_type == AllocationType.RAIL:
             # Validate train schedule exists
             schedule = db.query(model.TrainSchedules).filter(
@@ -195,7 +182,7 @@ def create_allocation(
             )
             
             # Update order status to SCHEDULED_RAIL
-            order.status = model.OrderStatus.SCHEDULED_RAIL
+            transition(order, model.OrderStatus.SCHEDULED_RAIL)
             
         else:
             # Validate truck schedule exists
@@ -216,10 +203,14 @@ def create_allocation(
             )
             
             # Update order status to SCHEDULED_ROAD
-            order.status = model.OrderStatus.SCHEDULED_ROAD
+            transition(order, model.OrderStatus.SCHEDULED_ROAD)
 
         db.add(allocation)
-        db.commit()
+        db.flush()
+        return allocation
+
+    try:
+        allocation = run_in_transaction(db, write, route="allocations.create_allocation")
         db.refresh(allocation)
 
         response = {
@@ -237,6 +228,8 @@ def create_allocation(
 
         return response
 
+    except HTTPException:
+        raise
     except Exception as e:
         db.rollback()
         raise HTTPException(
@@ -248,17 +241,11 @@ def create_allocation(
 def update_allocation(
     allocation_id: str,
     db: db_dependency,
-    current_user: dict = Depends(get_current_user),
+    current_user: dict = Depends(require_policy("allocations.update")),
     shipment_date: date = None,
     status: model.ScheduleStatus = None
 ):
     """Update an allocation"""
-    role = current_user.get("role")
-    if role not in ["SystemAdmin", "Assistant", "Management"]:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="You cannot access Allocations"
-        )
     # Try to find and update in rail allocations first
     rail_allocation = db.query(model.RailAllocations).filter(
         model.RailAllocations.allocation_id == allocation_id
@@ -316,16 +303,9 @@ def update_allocation(
 def delete_allocation(
     allocation_id: str,
     db: db_dependency,
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(require_policy("allocations.delete"))
 ):
     """Delete an allocation"""
-    role = current_user.get("role")
-    if role not in ["SystemAdmin", "Assistant", "Management"]:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="You cannot access Routes"
-        )
-
     # Try to find and delete in rail allocations first
     rail_allocation = db.query(model.RailAllocations).filter(
         model.RailAllocations.allocation_id == allocation_id
@@ -363,16 +343,9 @@ def delete_allocation(
 def get_schedule_capacity(
     schedule_id: str,
     db: db_dependency,
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(require_policy("allocations.capacity"))
 ):
     """Get capacity information for a train schedule"""
-    role = current_user.get("role")
-    if role not in ["SystemAdmin", "Assistant", "Management"]:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="You cannot access capacity information"
-        )
-
     try:
         capacity_info = get_schedule_capacity_info(db, schedule_id)
         return capacity_info
@@ -387,16 +360,9 @@ def get_schedule_capacity(
 def get_schedule_allocated_orders(
     schedule_id: str,
     db: db_dependency,
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(require_policy("allocations.schedule_orders"))
 ):
     """Get all orders allocated to a specific train schedule"""
-    role = current_user.get("role")
-    if role not in ["SystemAdmin", "Assistant", "Management"]:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="You cannot access allocations"
-        )
-
     # Verify schedule exists
     schedule = db.query(model.TrainSchedules).filter(
         model.TrainSchedules.schedule_id == schedule_id
@@ -1,28 +1,23 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Security
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Annotated, List
-from app.core.database import get_db
+from app.core.database import get_async_db
 from app.core import model, schemas
-from app.core.auth import get_current_user, check_role_permission
+from app.core.policies import require_policy
+from app.core.reference_cache import reference_cache
 
 router = APIRouter(prefix="/assistants")
-db_dependency = Annotated[Session, Depends(get_db)]
+db_dependency = Annotated[AsyncSession, Depends(get_async_db)]
 
 
 @router.get("/", response_model=List[schemas.AssistantResponse], status_code=status.HTTP_200_OK)
 async def get_all_assistants(
     db: db_dependency,
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(require_policy("assistants.read"))
 ):
     """Get all assistants (Management role required)"""
-    role = current_user.get("role")
-    if not check_role_permission(role, ["Management"]):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Management or SystemAdmin role required"
-        )
-    
-    assistants = db.query(model.Assistants).all()
+    assistants = (await db.scalars(select(model.Assistants))).all()
     if assistants is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -34,19 +29,11 @@ async def get_all_assistants(
 async def get_assistant(
     assistant_id: str,
     db: db_dependency,
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(require_policy("assistants.read"))
 ):
     """Get details of a specific assistant"""
     # Allow access if user is Management or is the assistant themselves
-    role = current_user.get("role")
-    if not check_role_permission(role, ["Management"]):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Management or SystemAdmin role required"
-        )
-    
-    
-    assistant = db.query(model.Assistants).filter(model.Assistants.assistant_id == assistant_id).first()
+    assistant = await db.scalar(select(model.Assistants).where(model.Assistants.assistant_id == assistant_id))
     if not assistant:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -59,17 +46,11 @@ async def get_assistant(
 async def create_assistant(
     assistant: schemas.AssistantCreate,
     db: db_dependency,
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(require_policy("assistants.write"))
 ):
     """Create a new assistant (Management role required)"""
-    role = current_user.get("role")
-    if not check_role_permission(role, ["Management"]):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Management or SystemAdmin role required"
-        )
     # Check if user exists and has Assistant role
-    user = db.query(model.Users).filter(model.Users.user_id == assistant.user_id).first()
+    user = await db.scalar(select(model.Users).where(model.Users.user_id == assistant.user_id))
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -77,9 +58,9 @@ async def create_assistant(
         )
     
     # Check if user is already an assistant
-    existing_assistant = db.query(model.Assistants).filter(
+    existing_assistant = await db.scalar(select(model.Assistants).where(
         model.Assistants.user_id == assistant.user_id
-    ).first()
+    ))
     if existing_assistant:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -95,12 +76,13 @@ async def create_assistant(
         )
         
         db.add(new_assistant)
-        db.commit()
-        db.refresh(new_assistant)
+        await db.commit()
+        reference_cache.invalidate("assistants")
+        await db.refresh(new_assistant)
         return new_assistant
         
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
@@ -111,20 +93,13 @@ async def update_assistant(
     assistant_id: str,
     assistant_update: schemas.AssistantUpdate,
     db: db_dependency,
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(require_policy("assistants.write"))
 ):
     """Update assistant details (Management role required)"""
-    
-    role = current_user.get("role")
-    if not check_role_permission(role, ["Management"]):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Management or SystemAdmin role required"
-        )
     # Check if assistant exists
-    assistant = db.query(model.Assistants).filter(
+    assistant = await db.scalar(select(model.Assistants).where(
         model.Assistants.assistant_id == assistant_id
-    ).first()
+    ))
     if not assistant:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -152,12 +127,13 @@ async def update_assistant(
                 )
             assistant.weekly_working_hours = total_working_hours
         
-        db.commit()
-        db.refresh(assistant)
+        await db.commit()
+        reference_cache.invalidate("assistants")
+        await db.refresh(assistant)
         return assistant
         
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
@@ -167,20 +143,13 @@ async def update_assistant(
 async def delete_assistant(
     assistant_id: str,
     db: db_dependency,
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(require_policy("assistants.write"))
 ):
     """Delete an assistant (Management role required)"""
-    role = current_user.get("role")
-    if not check_role_permission(role, ["Management"]):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Management or SystemAdmin role required"
-        )
-    
     # Check if assistant exists
-    assistant = db.query(model.Assistants).filter(
+    assistant = await db.scalar(select(model.Assistants).where(
         model.Assistants.assistant_id == assistant_id
-    ).first()
+    ))
     if not assistant:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -188,10 +157,10 @@ async def delete_assistant(
         )
     
     # Check if assistant has any active schedules
-    active_schedules = db.query(model.TruckSchedules).filter(
+    active_schedules = await db.scalar(select(model.TruckSchedules).where(
         model.TruckSchedules.assistant_id == assistant_id,
         model.TruckSchedules.status.in_([model.ScheduleStatus.PLANNED, model.ScheduleStatus.IN_PROGRESS])
-    ).first()
+    ))
     
     if active_schedules:
         raise HTTPException(
@@ -200,12 +169,13 @@ async def delete_assistant(
         )
     
     try:
-        db.delete(assistant)
-        db.commit()
+        await db.delete(assistant)
+        await db.commit()
+        reference_cache.invalidate("assistants")
         return {"detail": f"Assistant {assistant_id} deleted successfully"}
         
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
@@ -1,34 +1,35 @@
-from fastapi import APIRouter, Depends, status, HTTPException
+from fastapi import APIRouter, Depends, Request, status, HTTPException
 from fastapi.security import OAuth2PasswordRequestForm
-from app.core.database import get_db, engine
+from app.core.database import get_db, get_async_db
 import app.core.model as model
 from typing import Annotated, List
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.core import model, schemas
 from app.core.auth import (
-    verify_password,
+    verify_and_update_password_async,
     create_access_token,
-    get_password_hash,
+    get_password_hash_async,
     ACCESS_TOKEN_EXPIRE_MINUTES,
-    require_management,
     get_current_customer,
-    get_current_user,
-    check_role_permission
+    get_current_user
 )
+from app.core.policies import require_policy
+from app.core.login_throttle import login_throttle, client_ip
 from datetime import timedelta
 
 router = APIRouter(prefix="/customers")
-model.Base.metadata.create_all(bind=engine)
 db_dependency = Annotated[Session, Depends(get_db)]
 
 
 @router.post("/signup", status_code=status.HTTP_201_CREATED)
-async def signup(customer: schemas.CustomerCreate, db: Session = Depends(get_db)):
+async def signup(customer: schemas.CustomerCreate, db: AsyncSession = Depends(get_async_db)):
     """Public endpoint for customer registration"""
     # Check if username already exists
-    existing_user = db.query(model.Customers).filter(
+    existing_user = await db.scalar(select(model.Customers).where(
         model.Customers.customer_user_name == customer.customer_user_name
-    ).first()
+    ))
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -36,9 +37,9 @@ async def signup(customer: schemas.CustomerCreate, db: Session = Depends(get_db)
         )
     
     # Check if phone number already exists
-    existing_phone = db.query(model.Customers).filter(
+    existing_phone = await db.scalar(select(model.Customers).where(
         model.Customers.phone_number == customer.phone_number
-    ).first()
+    ))
     if existing_phone:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -46,7 +47,7 @@ async def signup(customer: schemas.CustomerCreate, db: Session = Depends(get_db)
         )
     
     # Create new customer with hashed password
-    hashed_password = get_password_hash(customer.password)
+    hashed_password = await get_password_hash_async(customer.password)
     new_customer = model.Customers(
         customer_user_name=customer.customer_user_name,
         customer_name=customer.customer_name,
@@ -56,8 +57,8 @@ async def signup(customer: schemas.CustomerCreate, db: Session = Depends(get_db)
     )
     
     db.add(new_customer)
-    db.commit()
-    db.refresh(new_customer)
+    await db.commit()
+    await db.refresh(new_customer)
     
     # Automatically log in the new customer
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -77,17 +78,31 @@ async def signup(customer: schemas.CustomerCreate, db: Session = Depends(get_db)
 
 
 @router.post("/login")
-async def login(db: Session = Depends(get_db), form_data: OAuth2PasswordRequestForm = Depends()):
+async def login(request: Request, db: AsyncSession = Depends(get_async_db), form_data: OAuth2PasswordRequestForm = Depends()):
     """Authenticate user and return JWT token"""
-    customer = db.query(model.Customers).filter(model.Customers.customer_user_name == form_data.username).first()
-    print(customer)
-    if not customer or not verify_password(form_data.password, customer.password_hash):
+    # Rejects locked-out usernames/IPs with 429 before any lookup or password hashing
+    attempt = ("customers", form_data.username, client_ip(request))
+    login_throttle.check(*attempt)
+
+    customer = await db.scalar(select(model.Customers).where(model.Customers.customer_user_name == form_data.username))
+    valid, new_hash = False, None
+    if customer:
+        valid, new_hash = await verify_and_update_password_async(form_data.password, customer.password_hash)
+    if not valid:
+        login_throttle.failure(*attempt)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    login_throttle.success(*attempt)
+
+    # Upgrade legacy SHA-256 digests to pbkdf2_sha256 now that we know the password
+    if new_hash:
+        customer.password_hash = new_hash
+        await db.commit()
+
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     token = create_access_token(data={"sub": customer.customer_id, "role": "Customer"}, expires_delta=access_token_expires)
 
@@ -102,27 +117,15 @@ async def login(db: Session = Depends(get_db), form_data: OAuth2PasswordRequestF
 
 
 @router.get("/", response_model=List[schemas.CustomerBase], status_code=status.HTTP_200_OK) 
-async def get_all_customers(db: db_dependency, current_user: dict = Depends(get_current_user)):
+async def get_all_customers(db: db_dependency, current_user: dict = Depends(require_policy("customers.read"))):
     # check the role 
-    role = current_user.get("role")
-    if not check_role_permission(role, ["Management"]):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Management or SystemAdmin role required"
-        )
     customers = db.query(model.Customers).all()
     if not customers:
         raise HTTPException(status_code=404, detail=f"Customers not found")
     return customers
 
 @router.get("/{customer_id}", response_model=schemas.CustomerBase, status_code=status.HTTP_200_OK)
-async def get_customer(customer_id: str, db: db_dependency, current_user: dict = Depends(get_current_user)):
-    role = current_user.get("role")
-    if not check_role_permission(role, ["Management"]):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Management or SystemAdmin role required"
-        )
+async def get_customer(customer_id: str, db: db_dependency, current_user: dict = Depends(require_policy("customers.read"))):
     customer = db.query(model.Customers).filter(model.Customers.customer_id == customer_id).first()
     if not customer:
         raise HTTPException(status_code=404, detail=f"Customer {customer_id} not found")
@@ -141,13 +144,7 @@ async def create_customer(customer: schemas.CustomerCreate, db: db_dependency, c
     return {"message": "Customer added successfully", "customer": new_customer}
 
 @router.put("/{customer_id}", response_model=schemas.CustomerBase, status_code=status.HTTP_200_OK)
-async def update_customer(customer_id: str, customer_update: schemas.customerUpdate, db: db_dependency, current_user: dict = Depends(get_current_user)):
-    role = current_user.get("role")
-    if not check_role_permission(role, ["Management"]):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Management or SystemAdmin role required"
-        )
+async def update_customer(customer_id: str, customer_update: schemas.customerUpdate, db: db_dependency, current_user: dict = Depends(require_policy("customers.write"))):
     customer = db.query(model.Customers).filter(model.Customers.customer_id == customer_id).first()
     if not customer:
         raise HTTPException(status_code=404, detail=f"Customer {customer_id} not found")
@@ -163,13 +160,7 @@ async def update_customer(customer_id: str, customer_update: schemas.customerUpd
     return customer
 
 @router.delete("/{customer_id}", status_code=status.HTTP_200_OK)
-async def delete_customer(customer_id: str, db: db_dependency, current_user: dict = Depends(get_current_user)):
-    role = current_user.get("role")
-    if not check_role_permission(role, ["Management"]):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Management or SystemAdmin role required"
-        )
+async def delete_customer(customer_id: str, db: db_dependency, current_user: dict = Depends(require_policy("customers.write"))):
     customer = db.query(model.Customers).filter(model.Customers.customer_id == customer_id).first()
     if not customer:
         raise HTTPException(status_code=404, detail=f"Customer {customer_id} not found")
@@ -1,28 +1,24 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Security
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Annotated, List
-from app.core.database import get_db
+from app.core.database import get_async_db
 from app.core import model, schemas
-from app.core.auth import get_current_user, check_role_permission
+from app.core.policies import require_policy
+from app.core.reference_cache import reference_cache
 
 router = APIRouter(prefix="/drivers")
-db_dependency = Annotated[Session, Depends(get_db)]
+db_dependency = Annotated[AsyncSession, Depends(get_async_db)]
 
 
 
 @router.get("/", response_model=List[schemas.DriverResponse], status_code=status.HTTP_200_OK)
 async def get_all_drivers(
     db: db_dependency,
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(require_policy("drivers.read"))
 ):
     """Get all drivers (Management role required)"""
-    role = current_user.get("role")
-    if not check_role_permission(role, ["Assistant", "Management"]):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Assistant, Management or SystemAdmin role required"
-        )
-    drivers = db.query(model.Drivers).all()
+    drivers = (await db.scalars(select(model.Drivers))).all()
     if drivers is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -34,17 +30,11 @@ async def get_all_drivers(
 async def get_driver(
     driver_id: str,
     db: db_dependency,
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(require_policy("drivers.read"))
 ):
     """Get details of a specific driver"""
     # Allow access if user is Management or is the driver themselves
-    role = current_user.get("role")
-    if not check_role_permission(role, ["Assistant", "Management"]):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Assistant, Management or SystemAdmin role required"
-        )
-    driver = db.query(model.Drivers).filter(model.Drivers.driver_id == driver_id).first()
+    driver = await db.scalar(select(model.Drivers).where(model.Drivers.driver_id == driver_id))
     if not driver:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -57,18 +47,11 @@ async def get_driver(
 async def create_driver(
     driver: schemas.DriverCreate,
     db: db_dependency,
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(require_policy("drivers.manage"))
 ):
     """Create a new driver (Management role required)"""
-    role = current_user.get("role")
-    if not check_role_permission(role, ["Management"]):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Management or SystemAdmin role required"
-        )
-    
     # Check if user exists and has Driver role
-    user = db.query(model.Users).filter(model.Users.user_id == driver.user_id).first()
+    user = await db.scalar(select(model.Users).where(model.Users.user_id == driver.user_id))
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -76,7 +59,7 @@ async def create_driver(
         )
     
     # Check if user is already a driver
-    existing_driver = db.query(model.Drivers).filter(model.Drivers.user_id == driver.user_id).first()
+    existing_driver = await db.scalar(select(model.Drivers).where(model.Drivers.user_id == driver.user_id))
     if existing_driver:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -92,12 +75,13 @@ async def create_driver(
         )
         
         db.add(new_driver)
-        db.commit()
-        db.refresh(new_driver)
+        await db.commit()
+        reference_cache.invalidate("drivers")
+        await db.refresh(new_driver)
         return new_driver
         
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
@@ -108,18 +92,11 @@ async def update_driver(
     driver_id: str,
     driver_update: schemas.DriverUpdate,
     db: db_dependency,
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(require_policy("drivers.update"))
 ):
     """Update driver details (Management role required)"""
-    role = current_user.get("role")
-    if not check_role_permission(role, ["Assistant", "Management"]):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Assistant, Management or SystemAdmin role required"
-        )
-    
     # Check if driver exists
-    driver = db.query(model.Drivers).filter(model.Drivers.driver_id == driver_id).first()
+    driver = await db.scalar(select(model.Drivers).where(model.Drivers.driver_id == driver_id))
     if not driver:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -151,12 +128,13 @@ async def update_driver(
                 )
 
         
-        db.commit()
-        db.refresh(driver)
+        await db.commit()
+        reference_cache.invalidate("drivers")
+        await db.refresh(driver)
         return driver
         
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
@@ -166,18 +144,11 @@ async def update_driver(
 async def delete_driver(
     driver_id: str,
     db: db_dependency,
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(require_policy("drivers.manage"))
 ):
     """Delete a driver (Management role required)"""
-    role = current_user.get("role")
-    if not check_role_permission(role, ["Management"]):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Management or SystemAdmin role required"
-        )
-    
     # Check if driver exists
-    driver = db.query(model.Drivers).filter(model.Drivers.driver_id == driver_id).first()
+    driver = await db.scalar(select(model.Drivers).where(model.Drivers.driver_id == driver_id))
     if not driver:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -185,10 +156,10 @@ async def delete_driver(
         )
     
     # Check if driver has any active schedules
-    active_schedules = db.query(model.TruckSchedules).filter(
+    active_schedules = await db.scalar(select(model.TruckSchedules).where(
         model.TruckSchedules.driver_id == driver_id,
         model.TruckSchedules.status.in_([model.ScheduleStatus.PLANNED, model.ScheduleStatus.IN_PROGRESS])
-    ).first()
+    ))
     
     if active_schedules:
         raise HTTPException(
@@ -197,12 +168,13 @@ async def delete_driver(
         )
     
     try:
-        db.delete(driver)
-        db.commit()
+        await db.delete(driver)
+        await db.commit()
+        reference_cache.invalidate("drivers")
         return {"detail": f"Driver {driver_id} deleted successfully"}
         
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
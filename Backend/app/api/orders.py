@@ -1,12 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, Response, UploadFile, status
 from sqlalchemy.orm import Session
-from typing import Annotated, List
+from typing import Annotated, List, Literal, Optional
 from uuid import UUID, uuid4
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from app.core.database import get_db
 from app.core import model, schemas
 import pytz
-from app.core.auth import get_current_user, get_current_customer, check_role_permission
+from app.core.auth import get_current_user, get_current_customer
+from app.core.policies import require_policy, authorize, apply_scope, scope_filter
+from app.core.reference_cache import reference_cache
+from app.core.status_history import record_status_change
+from app.core.transactions import run_in_transaction
+from app.utils.streaming import stream_rows, json_array_response, ndjson_response, csv_response, accepts_gzip
+from app.utils.bulk import bulk_insert
+from app.utils.lead_times import order_timeline
+from app.utils.order_import import import_format, import_orders_file
+from app.utils.order_status import (
+    bulk_transition, check_transition, transition, order_ids_scope, warehouse_scope, route_scope,
+    truck_schedule_scope, train_schedule_scope,
+)
+from app.utils.pagination import PageParams, page_params, paginate, split_page, count_total, page_headers
+from sqlalchemy import and_, select
 
 router = APIRouter(prefix="/orders")
 db_dependency = Annotated[Session, Depends(get_db)]
@@ -15,42 +29,110 @@ db_dependency = Annotated[Session, Depends(get_db)]
 
 
 @router.get("/history", status_code=status.HTTP_200_OK)
-def get_all_orders_history(db: db_dependency, current_user: dict = Depends(get_current_user)):
-    role = current_user.get("role")
-    if not check_role_permission(role, ["StoreManager", "Management"]):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="StoreManager, Management or SystemAdmin role required"
+def get_all_orders_history(
+    db: db_dependency,
+    current_user: dict = Depends(require_policy("orders.history")),
+    page: PageParams = Depends(page_params),
+):
+    # join Orders with Customers to get customer name alongside order fields;
+    # the full list is streamed from a server-side cursor so memory doesn't grow with
+    # the orders table, a page (?limit=) is read in one go
+    query = (
+        select(
+            model.Orders.order_id,
+            model.Customers.customer_name,
+            model.Orders.order_date,
+            model.Orders.deliver_address,
+            model.Orders.status,
         )
-
-    # join Orders with Customers to get customer name alongside order fields
-    rows = (
-        db.query(model.Orders, model.Customers)
         .join(model.Customers, model.Orders.customer_id == model.Customers.customer_id)
-        .all()
     )
+    total = count_total(db, query) if page.include_total else None
+    query = paginate(query, page, model.Orders.order_date, model.Orders.order_id)
 
-    results = []
-    for order, customer in rows:
-        customer_name = getattr(customer, "customer_name", None) or getattr(customer, "name", None) or ""
-        results.append({
-            "order_id": order.order_id,
-            "customer_name": customer_name,
-            "order_date": order.order_date,
-            "deliver_address": order.deliver_address,
-            "state": order.status
-        })
+    def to_history(row):
+        return {
+            "order_id": row.order_id,
+            "customer_name": row.customer_name or "",
+            "order_date": row.order_date,
+            "deliver_address": row.deliver_address,
+            "state": row.status
+        }
 
-    return results
+    if page.limit is None:
+        return json_array_response(stream_rows(query), serialize=to_history, headers=page_headers(None, total))
+    rows, next_cursor = split_page(list(stream_rows(query)), page)
+    return json_array_response(rows, serialize=to_history, headers=page_headers(next_cursor, total))
+
+EXPORT_FIELDS = [
+    "order_id", "order_date", "status", "customer_id", "customer_name",
+    "deliver_address", "deliver_city_id", "warehouse_id", "full_price",
+]
+
+
+@router.get("/export", status_code=status.HTTP_200_OK)
+def export_orders(
+    request: Request,
+    current_user: dict = Depends(require_policy("orders.export")),
+    format: Literal["ndjson", "csv"] = "ndjson",
+    from_date: Optional[date] = Query(None, description="First order date (inclusive)"),
+    to_date: Optional[date] = Query(None, description="Last order date (inclusive)"),
+    statuses: Optional[List[model.OrderStatus]] = Query(None, alias="status", description="Repeat to match several"),
+):
+    """Export orders (oldest first) as NDJSON or CSV, streamed from a server-side cursor.
+
+    Memory stays constant whatever the export size; the response is gzip-compressed
+    while streaming when the client sends Accept-Encoding: gzip.
+    """
+    query = (
+        select(
+            model.Orders.order_id,
+            model.Orders.order_date,
+            model.Orders.status,
+            model.Orders.customer_id,
+            model.Customers.customer_name,
+            model.Orders.deliver_address,
+            model.Orders.deliver_city_id,
+            model.Orders.warehouse_id,
+            model.Orders.full_price,
+        )
+        .join(model.Customers, model.Orders.customer_id == model.Customers.customer_id)
+        .order_by(model.Orders.order_date, model.Orders.order_id)
+    )
+    if from_date:
+        query = query.where(model.Orders.order_date >= from_date)
+    if to_date:
+        query = query.where(model.Orders.order_date < to_date + timedelta(days=1))
+    if statuses:
+        query = query.where(model.Orders.status.in_(statuses))
+    # StoreManagers only export orders of the warehouses they manage
+    query = apply_scope(query, "orders.export", current_user, model.Orders.warehouse_id)
+
+    rows = stream_rows(query)
+    filename = f"orders-{date.today().isoformat()}.{format}"
+    if format == "csv":
+        return csv_response(rows, EXPORT_FIELDS, compress=accepts_gzip(request), filename=filename)
+    return ndjson_response(rows, serialize=lambda row: dict(row._mapping), compress=accepts_gzip(request),
+                           filename=filename)
 
 @router.get("/my-orders", response_model=List[schemas.order], status_code=status.HTTP_200_OK)
-def get_customer_orders(db: db_dependency, current_user: dict = Depends(get_current_customer)):
+def get_customer_orders(
+    db: db_dependency,
+    response: Response,
+    current_user: dict = Depends(get_current_customer),
+    page: PageParams = Depends(page_params),
+):
     """Get orders for the currently logged-in customer"""
     customer_id = current_user.get("user_id")
     
-    orders = db.query(model.Orders).filter(
+    query = db.query(model.Orders).filter(
         model.Orders.customer_id == customer_id
-    ).all()
+    )
+    total = count_total(db, query) if page.include_total else None
+    orders, next_cursor = split_page(
+        paginate(query, page, model.Orders.order_date, model.Orders.order_id).all(), page
+    )
+    response.headers.update(page_headers(next_cursor, total))
     
     # Convert enum status to string value
     for order in orders:
@@ -61,40 +143,23 @@ def get_customer_orders(db: db_dependency, current_user: dict = Depends(get_curr
 
 
 @router.get("/", response_model=List[schemas.order], status_code=status.HTTP_200_OK)
-def get_all_Orders(db: db_dependency,  current_user: dict = Depends(get_current_user)):
-    role = current_user.get("role")
-    user_id = current_user.get("user_id")
-    
-    if not check_role_permission(role, ["StoreManager", "Management"]):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="StoreManager, Management or SystemAdmin role required"
-        )
-    
-    # If StoreManager, filter orders by their assigned warehouse
-    if role == "StoreManager":
-        # Find stores where this user is the contact_person (store manager)
-        assigned_stores = db.query(model.Stores).filter(
-            model.Stores.contact_person == user_id
-        ).all()
-        
-        if not assigned_stores:
-            # Store manager not assigned to any warehouse
-            return []
-        
-        # Get store IDs
-        store_ids = [store.store_id for store in assigned_stores]
-        
-        # Get orders assigned to these warehouses
-        orders_ = db.query(model.Orders).filter(
-            model.Orders.warehouse_id.in_(store_ids)
-        ).all()
-    else:
-        # Management and SystemAdmin can see all orders
-        orders_ = db.query(model.Orders).all()
-    
-    if orders_ is None:
-        raise HTTPException(status_code=404, detail=f"Order history not found")
+def get_all_Orders(
+    db: db_dependency,
+    response: Response,
+    current_user: dict = Depends(require_policy("orders.list")),
+    page: PageParams = Depends(page_params),
+):
+    # StoreManagers only see orders assigned to the warehouses they manage; the scope is
+    # applied as a subquery filter so this stays a single round trip.
+    # Management and SystemAdmin can see all orders
+    query = apply_scope(
+        db.query(model.Orders), "orders.list", current_user, model.Orders.warehouse_id
+    )
+    total = count_total(db, query) if page.include_total else None
+    orders_, next_cursor = split_page(
+        paginate(query, page, model.Orders.order_date, model.Orders.order_id).all(), page
+    )
+    response.headers.update(page_headers(next_cursor, total))
     
     # Convert enum status to string value
     for order in orders_:
@@ -104,7 +169,12 @@ def get_all_Orders(db: db_dependency,  current_user: dict = Depends(get_current_
     return orders_
     
 @router.get("/last-mile-delivery", status_code=status.HTTP_200_OK)
-def get_last_mile_delivery(db: db_dependency, current_user: dict = Depends(get_current_user)):
+def get_last_mile_delivery(
+    db: db_dependency,
+    response: Response,
+    current_user: dict = Depends(get_current_user),
+    page: PageParams = Depends(page_params),
+):
     """Get last mile delivery information based on user role"""
     role = current_user.get("role")
     user_id = current_user.get("user_id")
@@ -119,14 +189,9 @@ def get_last_mile_delivery(db: db_dependency, current_user: dict = Depends(get_c
     if role == "Customer":
         # Customers can only see their own orders
         query = query.filter(model.Orders.customer_id == user_id)
-    elif role in ["Management", "SystemAdmin"]:
-        # Management and SystemAdmin can see all orders
-        pass
     else:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Access restricted to Customers, Management, or SystemAdmin"
-        )
+        # Management and SystemAdmin can see all orders
+        authorize("orders.last_mile", current_user)
     
     # Get only orders that are out for delivery or delivered recently
     query = query.filter(
@@ -140,7 +205,12 @@ def get_last_mile_delivery(db: db_dependency, current_user: dict = Depends(get_c
         ])
     )
     
-    orders = query.all()
+    total = count_total(db, query) if page.include_total else None
+    orders, next_cursor = split_page(
+        paginate(query, page, model.Orders.order_date, model.Orders.order_id).all(), page,
+        key=lambda row: (row[0].order_date, row[0].order_id),
+    )
+    response.headers.update(page_headers(next_cursor, total))
     results = []
     for order, customer in orders:
         # Convert enum status to string value
@@ -160,14 +230,7 @@ def get_last_mile_delivery(db: db_dependency, current_user: dict = Depends(get_c
     return results
 
 @router.get("/{order_id}", response_model=schemas.order, status_code=status.HTTP_200_OK)
-def get_order(order_id: str, db: db_dependency, current_user: dict = Depends(get_current_user)):
-   
-    role = current_user.get("role")
-    if not check_role_permission(role, ["StoreManager", "Management"]):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="StoreManager, Management or SystemAdmin role required"
-        )
+def get_order(order_id: str, db: db_dependency, current_user: dict = Depends(require_policy("orders.read"))):
     order = db.query(model.Orders).filter(model.Orders.order_id == order_id).first()
     if not order:
         raise HTTPException(status_code=404, detail=f"Order {order_id} not found")
@@ -209,29 +272,39 @@ def create_order_with_items(
         raise HTTPException(status_code=404, detail=f"Customer not found")
     
     # Validate city exists
-    city = db.query(model.Cities).filter(model.Cities.city_id == order_data.deliver_city_id).first()
-    if not city:
+    if not reference_cache.exists(db, "cities", order_data.deliver_city_id):
         raise HTTPException(status_code=404, detail=f"City not found")
     
-    # Validate all products exist
+    # Validate all products exist: cached products are checked in memory, the
+    # rest in a single IN query
     if not order_data.items or len(order_data.items) == 0:
         raise HTTPException(status_code=400, detail="Order must have at least one item")
     
+    products = reference_cache.get_many(db, "products", [item.product_type_id for item in order_data.items])
+    
+    # Build the item rows and the order total in the same pass; store_id stays
+    # empty until the order is assigned to a warehouse.
+    order_id = model.generate_uuid()
+    item_rows = []
+    total_price = 0
     for item in order_data.items:
-        product = db.query(model.Products).filter(
-            model.Products.product_type_id == item.product_type_id
-        ).first()
-        if not product:
+        if str(item.product_type_id) not in products:
             raise HTTPException(
                 status_code=404, 
                 detail=f"Product {item.product_type_id} not found"
             )
-    
-    # Calculate total price
-    total_price = sum(item.quantity * item.unit_price for item in order_data.items)
+        total_price += item.quantity * item.unit_price
+        item_rows.append({
+            "order_id": order_id,
+            "store_id": None,
+            "product_type_id": item.product_type_id,
+            "quantity": item.quantity,
+            "item_price": item.unit_price,
+        })
     
     # Create the order
     new_order = model.Orders(
+        order_id=order_id,
         customer_id=customer_id,
         order_date=order_date_obj,
         deliver_address=order_data.deliver_address,
@@ -241,12 +314,11 @@ def create_order_with_items(
     )
     
     db.add(new_order)
-    db.flush()  # Flush to get the order_id before committing
+    record_status_change(db, order_id, None, model.OrderStatus.PLACED)
+    db.flush()  # the items reference the order row
     
-    # Note: OrderItems will require store_id. For now, we'll skip creating order items
-    # as the store assignment happens later in the workflow.
-    # You may want to add order items creation here if you have a default store
-    # or if customers can select stores.
+    # Items are written in one multi-row INSERT
+    bulk_insert(db, model.OrderItems, item_rows)
     
     db.commit()
     db.refresh(new_order)
@@ -258,12 +330,22 @@ def create_order_with_items(
     return new_order
 
 
-@router.post("/", response_model=schemas.order, status_code=status.HTTP_201_CREATED)
-def create_order(order: schemas.create_new_order, db: db_dependency, current_user: dict = Depends(get_current_customer)):
-    role = current_user.get("role")
-    if role not in ["Customer"]:
-        raise HTTPException(status_code=403, detail="You do not have permission to create an order")
+@router.post("/import", status_code=status.HTTP_200_OK)
+def import_orders(
+    db: db_dependency,
+    file: UploadFile = File(..., description="CSV (one line item per row) or NDJSON (one order per line)"),
+    format: Optional[Literal["csv", "ndjson"]] = Query(None, description="Defaults to the file extension"),
+    current_user: dict = Depends(require_policy("orders.import")),
+):
+    """
+    Bulk-create orders from an uploaded file (see app/utils/order_import.py for the formats).
+    Valid orders are committed in chunks; invalid ones are skipped and listed by file line.
+    """
+    return import_orders_file(db, file.file, import_format(file.filename, format))
+
 
+@router.post("/", response_model=schemas.order, status_code=status.HTTP_201_CREATED)
+def create_order(order: schemas.create_new_order, db: db_dependency, current_user: dict = Depends(require_policy("orders.place"))):
     #validate date 
     sl_tz = pytz.timezone("Asia/Colombo")
     now = datetime.now(sl_tz)
@@ -280,6 +362,7 @@ def create_order(order: schemas.create_new_order, db: db_dependency, current_use
         raise HTTPException(status_code=404, detail=f"Customer {order.customer_id} not found")
 
     new_order = model.Orders(
+        order_id=model.generate_uuid(),
         customer_id=order.customer_id,
         order_date=order.order_date,
         deliver_address=order.deliver_address,
@@ -287,6 +370,7 @@ def create_order(order: schemas.create_new_order, db: db_dependency, current_use
         full_price=order.full_price
     )
     db.add(new_order) 
+    record_status_change(db, new_order.order_id, None, model.OrderStatus.PLACED)
     db.commit()
     db.refresh(new_order)
     return new_order
@@ -294,17 +378,14 @@ def create_order(order: schemas.create_new_order, db: db_dependency, current_use
 
 
 @router.put("/{order_id}", response_model=schemas.order, status_code=status.HTTP_200_OK)
-def update_order(order_id: str, order_update: schemas.update_order, db: db_dependency, current_user: dict = Depends(get_current_user)):
-    role = current_user.get("role")
-    if not check_role_permission(role, ["Management"]):
-        raise HTTPException(status_code=403, detail="Management or SystemAdmin role required")
-
+def update_order(order_id: str, order_update: schemas.update_order, db: db_dependency, current_user: dict = Depends(require_policy("orders.write"))):
     order = db.query(model.Orders).filter(model.Orders.order_id == order_id).first()
     if not order:
         raise HTTPException(status_code=404, detail=f"Order {order_id} not found")
 
     update_data = order_update.model_dump(exclude_unset=True)
     if "status" in update_data:
+        check_transition(order.status, update_data["status"])
         update_data["status"] = update_data["status"].value
     if "order_date" in update_data:
         # Only validate date if it's actually being changed
@@ -321,21 +402,59 @@ def update_order(order_id: str, order_update: schemas.update_order, db: db_depen
             if new_date_obj < now + timedelta(days=7):
                 raise HTTPException(status_code=400, detail="order_date must be at least 7 days from today")
     update_data["order_id"] = order_id
-    for key, value in update_data.items():
-        setattr(order, key, value)
 
-    db.commit()
+    def write(db: Session):
+        for key, value in update_data.items():
+            if key == "status":
+                transition(order, value)  # records the change in the status history
+            else:
+                setattr(order, key, value)
+        return order
+
+    run_in_transaction(db, write, route="orders.update_order")
     db.refresh(order)
     return order
 
 
 
-@router.delete("/{order_id}", status_code=status.HTTP_200_OK)
-def delete_order(order_id: str, db: db_dependency, current_user: dict = Depends(get_current_user)):
-    role = current_user.get("role")
-    if not check_role_permission(role, ["Management"]):
-        raise HTTPException(status_code=403, detail="Management or SystemAdmin role required")
+@router.post("/bulk-status", status_code=status.HTTP_200_OK)
+def bulk_update_order_status(
+    status_update: schemas.BulkOrderStatusUpdate,
+    db: db_dependency,
+    current_user: dict = Depends(require_policy("orders.transition")),
+):
+    """
+    Move all orders in one scope (order_ids, warehouse, route, truck or train schedule) to a
+    new status with a single UPDATE. Orders whose current status can't move to it are left
+    alone and counted under "skipped".
+    """
+    scopes = {
+        "order_ids": order_ids_scope,
+        "warehouse_id": warehouse_scope,
+        "route_id": route_scope,
+        "truck_schedule_id": truck_schedule_scope,
+        "train_schedule_id": train_schedule_scope,
+    }
+    given = [name for name in scopes if getattr(status_update, name)]
+    if len(given) != 1:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Give exactly one of {', '.join(scopes)}"
+        )
+    scope = scopes[given[0]](getattr(status_update, given[0]))
+    warehouse_filter = scope_filter("orders.transition", current_user, model.Orders.warehouse_id)
+    if warehouse_filter is not None:
+        scope = and_(scope, warehouse_filter)
+
+    return run_in_transaction(
+        db,
+        lambda db: bulk_transition(db, status_update.status, scope, status_update.from_statuses),
+        route="orders.bulk_update_order_status",
+    )
 
+
+@router.delete("/{order_id}", status_code=status.HTTP_200_OK)
+def delete_order(order_id: str, db: db_dependency, current_user: dict = Depends(require_policy("orders.write"))):
     order = db.query(model.Orders).filter(model.Orders.order_id == order_id).first()
     if not order:
         raise HTTPException(status_code=404, detail=f"Order {order_id} not found")
@@ -346,15 +465,8 @@ def delete_order(order_id: str, db: db_dependency, current_user: dict = Depends(
 
 
 @router.patch("/{order_id}/assign-warehouse", response_model=schemas.order, status_code=status.HTTP_200_OK)
-def assign_order_to_warehouse(order_id: str, warehouse_id: str, db: db_dependency, current_user: dict = Depends(get_current_user)):
+def assign_order_to_warehouse(order_id: str, warehouse_id: str, db: db_dependency, current_user: dict = Depends(require_policy("orders.write"))):
     """Assign an order to a warehouse (Management or SystemAdmin role required)"""
-    role = current_user.get("role")
-    if not check_role_permission(role, ["Management"]):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Management or SystemAdmin role required"
-        )
-    
     # Verify order exists
     order = db.query(model.Orders).filter(model.Orders.order_id == order_id).first()
     if not order:
@@ -365,32 +477,38 @@ def assign_order_to_warehouse(order_id: str, warehouse_id: str, db: db_dependenc
     if not warehouse:
         raise HTTPException(status_code=404, detail=f"Warehouse {warehouse_id} not found")
     
-    # Assign warehouse to order
+    # Assign warehouse to order and its items
     order.warehouse_id = warehouse_id
+    db.query(model.OrderItems).filter(
+        model.OrderItems.order_id == order_id,
+        model.OrderItems.store_id.is_(None)
+    ).update({model.OrderItems.store_id: warehouse_id}, synchronize_session=False)
     
     # If order was PLACED, update status to IN_WAREHOUSE
     if order.status == model.OrderStatus.PLACED:
-        order.status = model.OrderStatus.IN_WAREHOUSE
+        transition(order, model.OrderStatus.IN_WAREHOUSE)
     
     db.commit()
     db.refresh(order)
     return order
 
 
+@router.get("/{order_id}/status-history", status_code=status.HTTP_200_OK)
+def get_order_status_history(order_id: str, db: db_dependency, current_user: dict = Depends(require_policy("orders.read"))):
+    """Status changes of an order, oldest first, with the time spent in each status"""
+    timeline = order_timeline(db, order_id)
+    if not timeline and db.get(model.Orders, order_id) is None:
+        raise HTTPException(status_code=404, detail=f"Order {order_id} not found")
+    return {"order_id": order_id, "history": timeline}
+
+
 @router.get("/{order_id}/space", status_code=status.HTTP_200_OK)
 def get_order_space(
     order_id: str,
     db: db_dependency,
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(require_policy("orders.space"))
 ):
     """Calculate the space consumption for an order"""
-    role = current_user.get("role")
-    if not check_role_permission(role, ["StoreManager", "Management"]):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Insufficient permissions"
-        )
-    
     # Import capacity calculator
     from app.utils.capacity_calculator import calculate_order_space
     
@@ -1,26 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Security
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Annotated, List
-from app.core.database import get_db
+from app.core.database import get_async_db
 from app.core import model, schemas
-from app.core.auth import get_current_user, get_current_customer, check_role_permission
+from app.core.auth import get_current_customer
+from app.core.policies import require_policy
+from app.core.reference_cache import reference_cache
 
 router = APIRouter(prefix="/products")
-db_dependency = Annotated[Session, Depends(get_db)]
-
-def check_management_role(current_user: dict):
-    if current_user.get("role") != "Management":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Only Management can perform this operation"
-        )
-
-def check_product_access(current_user: dict):
-    if current_user.get("role") not in ["Management", "StoreManager"]:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Requires Management or StoreManager role"
-        )
+db_dependency = Annotated[AsyncSession, Depends(get_async_db)]
 
 @router.get("/catalog", response_model=List[schemas.ProductResponse], status_code=status.HTTP_200_OK)
 async def get_products_catalog(
@@ -28,7 +17,7 @@ async def get_products_catalog(
     current_user: dict = Depends(get_current_customer)
 ):
     """Get all products catalog for customers"""
-    products = db.query(model.Products).all()
+    products = (await db.scalars(select(model.Products))).all()
     if not products:
         return []  # Return empty list instead of 404 for better UX
     return products
@@ -36,16 +25,10 @@ async def get_products_catalog(
 @router.get("/", response_model=List[schemas.ProductResponse], status_code=status.HTTP_200_OK)
 async def get_all_products(
     db: db_dependency,
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(require_policy("products.read"))
 ):
     """Get all products"""
-    role = current_user.get("role")
-    if not check_role_permission(role, ["Management", "StoreManager"]):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Management, StoreManager or SystemAdmin role required"
-        )
-    products = db.query(model.Products).all()
+    products = (await db.scalars(select(model.Products))).all()
     if not products:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -57,18 +40,12 @@ async def get_all_products(
 async def get_product(
     product_id: str,
     db: db_dependency,
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(require_policy("products.read"))
 ):
     """Get details of a specific product"""
-    role = current_user.get("role")
-    if not check_role_permission(role, ["Management", "StoreManager"]):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Management, StoreManager or SystemAdmin role required"
-        )
-    product = db.query(model.Products).filter(
+    product = await db.scalar(select(model.Products).where(
         model.Products.product_type_id == product_id
-    ).first()
+    ))
     
     if not product:
         raise HTTPException(
@@ -82,20 +59,13 @@ async def get_product(
 async def create_product(
     product: schemas.ProductCreate,
     db: db_dependency,
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(require_policy("products.create"))
 ):
     """Create a new product (requires StoreManager, Management or SystemAdmin role)"""
-    role = current_user.get("role")
-    if not check_role_permission(role, ["Management", "StoreManager"]):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Management, StoreManager or SystemAdmin role required"
-        )
-    
     # Check if product with same name exists
-    existing_product = db.query(model.Products).filter(
+    existing_product = await db.scalar(select(model.Products).where(
         model.Products.product_name == product.product_name
-    ).first()
+    ))
     
     if existing_product:
         raise HTTPException(
@@ -118,12 +88,13 @@ async def create_product(
         )
         
         db.add(new_product)
-        db.commit()
-        db.refresh(new_product)
+        await db.commit()
+        reference_cache.invalidate("products")
+        await db.refresh(new_product)
         return new_product
         
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
@@ -134,21 +105,13 @@ async def update_product(
     product_id: str,
     product_update: schemas.ProductUpdate,
     db: db_dependency,
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(require_policy("products.write"))
 ):
     """Update product details (requires Management or SystemAdmin role)"""
-    role = current_user.get("role")
-    if not check_role_permission(role, ["Management"]):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Management or SystemAdmin role required"
-        )
-    
-    
     # Check if product exists
-    product = db.query(model.Products).filter(
+    product = await db.scalar(select(model.Products).where(
         model.Products.product_type_id == product_id
-    ).first()
+    ))
     
     if not product:
         raise HTTPException(
@@ -160,10 +123,10 @@ async def update_product(
         # Update product name if provided
         if product_update.product_name is not None:
             # Check if another product has the same name
-            existing_product = db.query(model.Products).filter(
+            existing_product = await db.scalar(select(model.Products).where(
                 model.Products.product_name == product_update.product_name,
                 model.Products.product_type_id != product_id
-            ).first()
+            ))
             
             if existing_product:
                 raise HTTPException(
@@ -182,12 +145,13 @@ async def update_product(
                 )
             product.space_consumption_rate = product_update.space_consumption_rate
         
-        db.commit()
-        db.refresh(product)
+        await db.commit()
+        reference_cache.invalidate("products")
+        await db.refresh(product)
         return product
         
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
@@ -197,21 +161,13 @@ async def update_product(
 async def delete_product(
     product_id: str,
     db: db_dependency,
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(require_policy("products.write"))
 ):
     """Delete a product (requires Management or SystemAdmin role)"""
-    role = current_user.get("role")
-    if not check_role_permission(role, ["Management"]):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Management or SystemAdmin role required"
-        )
-    
-    
     # Check if product exists
-    product = db.query(model.Products).filter(
+    product = await db.scalar(select(model.Products).where(
         model.Products.product_type_id == product_id
-    ).first()
+    ))
     
     if not product:
         raise HTTPException(
@@ -220,9 +176,9 @@ async def delete_product(
         )
     
     # Check if product is used in any order items
-    order_items = db.query(model.OrderItems).filter(
+    order_items = await db.scalar(select(model.OrderItems).where(
         model.OrderItems.product_type_id == product_id
-    ).first()
+    ))
     
     if order_items:
         raise HTTPException(
@@ -231,12 +187,13 @@ async def delete_product(
         )
     
     try:
-        db.delete(product)
-        db.commit()
+        await db.delete(product)
+        await db.commit()
+        reference_cache.invalidate("products")
         return {"detail": f"Product {product_id} deleted successfully"}
         
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
@@ -1,37 +1,24 @@
 from fastapi import APIRouter, Depends, status, HTTPException
-from app.core.database import get_db, engine
+from app.core.database import get_db
 import app.core.model as model
 from typing import Annotated, List
 from sqlalchemy.orm import Session
 from app.core import model, schemas
-from app.core.auth import get_current_user, check_role_permission
+from app.core.policies import require_policy
 
 
 router = APIRouter(prefix="/railway_stations")
-model.Base.metadata.create_all(bind=engine)
 db_dependency = Annotated[Session, Depends(get_db)]
 
 
 
 @router.get("/",status_code=status.HTTP_200_OK,response_model=List[schemas.RailwayStation])
-def get_all_railway_stations(db: db_dependency,current_user: dict = Depends(get_current_user) ):
-    role = current_user.get("role")
-    if not check_role_permission(role, ["Management", "Assistant"]):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Management, Assistant or SystemAdmin role required"
-        )
+def get_all_railway_stations(db: db_dependency,current_user: dict = Depends(require_policy("railway_stations.read")) ):
     stations = db.query(model.RailwayStations).all()
     return stations
 
 @router.get("/railway_stations{station_id}",status_code=status.HTTP_200_OK)
-def get_all_railway_station_by_station_id(db: db_dependency, station_id : str, current_user: dict = Depends(get_current_user)):
-    role = current_user.get("role")
-    if not check_role_permission(role, ["Management", "Assistant"]):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Management, Assistant or SystemAdmin role required"
-        )
+def get_all_railway_station_by_station_id(db: db_dependency, station_id : str, current_user: dict = Depends(require_policy("railway_stations.read"))):
     station = db.query(model.RailwayStations).filter(model.RailwayStations.station_id == station_id).first()
 
     if station is None:
@@ -1,7 +1,12 @@
 # app/api/reports.py
 from fastapi import APIRouter, Query, Depends, Security,  HTTPException, status
-from typing import List
-from app.core.auth import get_current_user, require_management, check_role_permission
+from sqlalchemy.orm import Session
+from typing import Annotated, List, Optional
+from datetime import date, datetime, time, timedelta
+from app.core.auth import require_management
+from app.core.database import get_db
+from app.core.policies import require_policy
+from app.utils.lead_times import lead_times, dwell_times
 from app.utils.reports_procs import (
     quarterly_sales, top_items_by_quarter, sales_by_city,
     sales_by_route, driver_work_hours, assistant_work_hours,
@@ -9,93 +14,64 @@ from app.utils.reports_procs import (
 )
 
 router = APIRouter(prefix="/reports")
+db_dependency = Annotated[Session, Depends(get_db)]
+
+
+def _date_range(start_date: date, end_date: date):
+    # both dates inclusive; history timestamps are UTC
+    if end_date < start_date:
+        raise HTTPException(status_code=400, detail="end_date must not be before start_date")
+    return datetime.combine(start_date, time.min), datetime.combine(end_date + timedelta(days=1), time.min)
 
 @router.get("/sales/quarterly")
 def get_quarterly_sales(year: int = Query(...), quarter: int = Query(..., ge=1, le=4),
-                        current_user: dict = Depends(get_current_user)):
-    role = current_user.get("role")
-    if not check_role_permission(role, ["Management"]):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Management or SystemAdmin role required"
-        )
-    
+                        current_user: dict = Depends(require_policy("reports.read"))):
     return quarterly_sales(year, quarter)
 
 @router.get("/sales/top-items")
 def get_top_items(year: int = Query(...), quarter: int = Query(..., ge=1, le=4),
-                  limit: int = Query(20), current_user: dict = Depends(get_current_user)):
-    role = current_user.get("role")
-    if not check_role_permission(role, ["Management"]):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Management or SystemAdmin role required"
-        )
+                  limit: int = Query(20), current_user: dict = Depends(require_policy("reports.read"))):
     return top_items_by_quarter(year, quarter, limit)
 
 @router.get("/sales/by-city")
 def get_sales_by_city(start_date: str = Query(...), end_date: str = Query(...),
-                      current_user: dict = Depends(get_current_user)):
-    role = current_user.get("role")
-    if not check_role_permission(role, ["Management"]):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Management or SystemAdmin role required"
-        )
+                      current_user: dict = Depends(require_policy("reports.read"))):
     return sales_by_city(start_date, end_date)
 
 @router.get("/sales/by-route")
 def get_sales_by_route(start_date: str = Query(...), end_date: str = Query(...),
-                       current_user: dict = Depends(get_current_user)):
-    role = current_user.get("role")
-    if not check_role_permission(role, ["Management"]):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Management or SystemAdmin role required"
-        )
+                       current_user: dict = Depends(require_policy("reports.read"))):
     return sales_by_route(start_date, end_date)
 
 @router.get("/work-hours/drivers")
 def get_driver_hours(start_date: str = Query(...), end_date: str = Query(...),
-                     current_user: dict = Depends(get_current_user)):
-    role = current_user.get("role")
-    if not check_role_permission(role, ["Management"]):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Management or SystemAdmin role required"
-        )
-    
+                     current_user: dict = Depends(require_policy("reports.read"))):
     return driver_work_hours(start_date, end_date)
 
 @router.get("/work-hours/assistants")
 def get_assistant_hours(start_date: str = Query(...), end_date: str = Query(...),
-                        current_user: dict = Depends(get_current_user)):
-    role = current_user.get("role")
-    if not check_role_permission(role, ["Management"]):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Management or SystemAdmin role required"
-        )
+                        current_user: dict = Depends(require_policy("reports.read"))):
     return assistant_work_hours(start_date, end_date)
 
 @router.get("/truck-usage")
 def get_truck_usage(year: int = Query(...), month: int = Query(..., ge=1, le=12),
-                    current_user: dict = Depends(get_current_user)):
-    role = current_user.get("role")
-    if not check_role_permission(role, ["Management"]):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Management or SystemAdmin role required"
-        )
+                    current_user: dict = Depends(require_policy("reports.read"))):
     return truck_usage_month(year, month)
 
 @router.get("/customers/{customer_id}/orders")
 def get_customer_orders(customer_id: str, start_date: str = Query(...), end_date: str = Query(...),
-                        current_user: dict = Depends(get_current_user)):
-    role = current_user.get("role")
-    if not check_role_permission(role, ["Management"]):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Management or SystemAdmin role required"
-        )
-    return customer_order_history(customer_id, start_date, end_date)
\ No newline at end of file
+                        current_user: dict = Depends(require_policy("reports.read"))):
+    return customer_order_history(customer_id, start_date, end_date)
+
+@router.get("/lead-times")
+def get_lead_times(db: db_dependency, start_date: date = Query(...), end_date: date = Query(...),
+                   current_user: dict = Depends(require_policy("reports.read"))):
+    """Placed-to-delivered lead time (avg, p50, p90, max seconds) per warehouse, for orders delivered in the range"""
+    return lead_times(db, *_date_range(start_date, end_date))
+
+@router.get("/order-dwell-times")
+def get_order_dwell_times(db: db_dependency, start_date: date = Query(...), end_date: date = Query(...),
+                          warehouse_id: Optional[str] = Query(None),
+                          current_user: dict = Depends(require_policy("reports.read"))):
+    """Time orders spent in each status (avg, p50, p90 seconds), for status changes in the range"""
+    return dwell_times(db, *_date_range(start_date, end_date), warehouse_id)
@@ -5,7 +5,8 @@ from uuid import UUID, uuid4
 from datetime import datetime, timedelta
 from app.core.database import get_db
 from app.core import model, schemas
-from app.core.auth import get_current_user, check_role_permission
+from app.core.policies import require_policy
+from app.core.reference_cache import reference_cache
 
 
 router = APIRouter(prefix="/routes")
@@ -13,13 +14,7 @@ db_dependency = Annotated[Session, Depends(get_db)]
 
 
 @router.get("/", response_model=List[schemas.route], status_code=status.HTTP_200_OK)
-def get_all_routes(db: db_dependency, current_user: dict = Depends(get_current_user)):
-    role = current_user.get("role")
-    if not check_role_permission(role, ["Assistant", "Management", "SystemAdmin"]):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Assistant, Management or SystemAdmin role required"
-        )
+def get_all_routes(db: db_dependency, current_user: dict = Depends(require_policy("routes.read"))):
     routes = db.query(model.Routes).all()
     if routes is None:
         raise HTTPException(
@@ -29,30 +24,17 @@ def get_all_routes(db: db_dependency, current_user: dict = Depends(get_current_u
     return routes
 
 @router.get("/{route_id}", response_model=schemas.route, status_code=status.HTTP_200_OK)
-def get_route_by_id(route_id: str, db: db_dependency, current_user: dict = Depends(get_current_user)):
-    role = current_user.get("role")
-    if not check_role_permission(role, ["Assistant", "Management", "SystemAdmin"]):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Assistant, Management or SystemAdmin role required"
-        )
+def get_route_by_id(route_id: str, db: db_dependency, current_user: dict = Depends(require_policy("routes.read"))):
     route = db.query(model.Routes).filter(model.Routes.route_id == route_id).first()
     if not route:
         raise HTTPException(status_code=404, detail=f"Route {route_id} not found")
     return route
 
 @router.post("/", response_model=schemas.route, status_code=status.HTTP_201_CREATED)
-def create_route(route: schemas.route_create, db: db_dependency, current_user: dict = Depends(get_current_user)):
-    role = current_user.get("role")
-    if not check_role_permission(role, ["Assistant", "Management", "SystemAdmin"]):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Assistant, Management or SystemAdmin role required"
-        )
-    
+def create_route(route: schemas.route_create, db: db_dependency, current_user: dict = Depends(require_policy("routes.write"))):
     # validate start/end stations exist
-    start_station = db.query(model.RailwayStations).filter(model.RailwayStations.city_id == route.start_city_id).first()
-    end_station = db.query(model.RailwayStations).filter(model.RailwayStations.city_id == route.end_city_id).first()
+    start_station = reference_cache.find(db, "railway_stations", "city_id", route.start_city_id)
+    end_station = reference_cache.find(db, "railway_stations", "city_id", route.end_city_id)
     if not start_station or not end_station:
         raise HTTPException(status_code=404, detail="Start or end station not found")
 
@@ -64,18 +46,12 @@ def create_route(route: schemas.route_create, db: db_dependency, current_user: d
     )
     db.add(new_route)
     db.commit()
+    reference_cache.invalidate("routes")
     db.refresh(new_route)
     return new_route
 
 @router.put("/{route_id}", response_model=schemas.route, status_code=status.HTTP_200_OK)
-def update_route(route_id: str, route_update: schemas.route_update, db: db_dependency, current_user: dict = Depends(get_current_user)):
-    role = current_user.get("role")
-    if not check_role_permission(role, ["Assistant", "Management", "SystemAdmin"]):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Assistant, Management or SystemAdmin role required"
-        )
-    
+def update_route(route_id: str, route_update: schemas.route_update, db: db_dependency, current_user: dict = Depends(require_policy("routes.write"))):
     route = db.query(model.Routes).filter(model.Routes.route_id == route_id).first()
     if not route:
         raise HTTPException(status_code=404, detail=f"Route {route_id} not found")
@@ -86,19 +62,12 @@ def update_route(route_id: str, route_update: schemas.route_update, db: db_depen
         setattr(route, key, value)
 
     db.commit()
+    reference_cache.invalidate("routes")
     db.refresh(route)
     return route
 
 @router.delete("/{route_id}", status_code=status.HTTP_200_OK)
-def delete_route(route_id: str, db: db_dependency, current_user: dict = Depends(get_current_user)):
-    role = current_user.get("role")
-    if not check_role_permission(role, ["Assistant", "Management", "SystemAdmin"]):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Assistant, Management or SystemAdmin role required"
-        )
-    
-
+def delete_route(route_id: str, db: db_dependency, current_user: dict = Depends(require_policy("routes.write"))):
     route = db.query(model.Routes).filter(model.Routes.route_id == route_id).first()
     print(route)
     
@@ -107,5 +76,6 @@ def delete_route(route_id: str, db: db_dependency, current_user: dict = Depends(
 
     db.delete(route)
     db.commit() 
+    reference_cache.invalidate("routes")
     return {"detail": f"Route {route_id} deleted successfully"} 
 
@@ -1,23 +1,19 @@
 from fastapi import APIRouter, Depends, status, HTTPException
-from app.core.database import get_db, engine
+from app.core.database import get_db
 import app.core.model as model
 from typing import Annotated, List
 from sqlalchemy.orm import Session
 from app.core import model, schemas
-from app.core.auth import get_current_user, check_role_permission
+from app.core.auth import principal_cache, AUTH_CLAIMS_TOKENS
+from app.core.policies import require_policy
+from app.core.token_versions import bump_token_versions, publish_token_versions
+from app.core.reference_cache import reference_cache
 
 router = APIRouter(prefix="/stores")
-model.Base.metadata.create_all(bind=engine)
 db_dependency = Annotated[Session, Depends(get_db)]
 
 @router.get("/", status_code=status.HTTP_200_OK, response_model=List[schemas.StoreWithCity])
-def get_all_stores(db: db_dependency, current_user: dict = Depends(get_current_user)):
-    role = current_user.get("role")
-    if not check_role_permission(role, ["WarehouseStaff", "Management"]):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="WarehouseStaff, Management or SystemAdmin role required"
-        )
+def get_all_stores(db: db_dependency, current_user: dict = Depends(require_policy("stores.read"))):
     stores = db.query(model.Stores).all()
     if stores is None:
         raise HTTPException(
@@ -56,14 +52,7 @@ def get_all_stores(db: db_dependency, current_user: dict = Depends(get_current_u
     return result
 
 @router.get("/stores{store_id}", status_code=status.HTTP_200_OK)
-def get_store_by_id(db: db_dependency, store_id: str,  current_user: dict = Depends(get_current_user) ):
-    role = current_user.get("role")
-    if not check_role_permission(role, ["WarehouseStaff", "Management"]):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="WarehouseStaff, Management or SystemAdmin role required"
-        )
-    
+def get_store_by_id(db: db_dependency, store_id: str,  current_user: dict = Depends(require_policy("stores.read")) ):
     store = db.query(model.Stores).filter(model.Stores.store_id == store_id).first()
     if store is None :
         raise HTTPException(
@@ -74,15 +63,8 @@ def get_store_by_id(db: db_dependency, store_id: str,  current_user: dict = Depe
 
 
 @router.post("/", status_code=status.HTTP_200_OK, response_model=schemas.store)
-def create_store(store: schemas.StoreCreate, db: db_dependency, current_user: dict = Depends(get_current_user)):
-    role = current_user.get("role")
-    if not check_role_permission(role, ["WarehouseStaff", "Management"]):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="WarehouseStaff, Management or SystemAdmin role required"
-        )
-    station = db.query(model.RailwayStations).filter(model.RailwayStations.station_id == store.station_id).first()
-    if not station:
+def create_store(store: schemas.StoreCreate, db: db_dependency, current_user: dict = Depends(require_policy("stores.write"))):
+    if not reference_cache.exists(db, "railway_stations", store.station_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Station with ID {store.station_id} does not exist."
@@ -95,19 +77,17 @@ def create_store(store: schemas.StoreCreate, db: db_dependency, current_user: di
         station_id=store.station_id
     )
     db.add(new_store)
+    # the manager's principal now carries this warehouse; claims tokens must be reissued
+    versions = bump_token_versions(db, [store.contact_person]) if AUTH_CLAIMS_TOKENS else {}
     db.commit()
+    principal_cache.invalidate(store.contact_person)
+    publish_token_versions(versions)
     db.refresh(new_store)
     return new_store
 
 
 @router.put("/{store_id}", status_code=status.HTTP_200_OK)
-def update_store(store_id: str , store_update: schemas.StoreUpdate, db: db_dependency, current_user: dict = Depends(get_current_user)):
-    role = current_user.get("role")
-    if not check_role_permission(role, ["WarehouseStaff", "Management"]):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="WarehouseStaff, Management or SystemAdmin role required"
-        )
+def update_store(store_id: str , store_update: schemas.StoreUpdate, db: db_dependency, current_user: dict = Depends(require_policy("stores.write"))):
     store = db.query(model.Stores).filter(model.Stores.store_id == store_id).first()
     if not store:
         raise HTTPException(
@@ -118,27 +98,28 @@ def update_store(store_id: str , store_update: schemas.StoreUpdate, db: db_depen
     if "station_id" in update_data:
         station_id_str = str(update_data["station_id"])
         
-        station = db.query(model.RailwayStations).filter(model.RailwayStations.station_id == station_id_str).first()
-        if not station:
+        if not reference_cache.exists(db, "railway_stations", station_id_str):
             raise HTTPException(status_code=404, detail=f"Station {station_id_str} not found")
         update_data["station_id"] = station_id_str
     
+    managers = {store.contact_person, update_data.get("contact_person", store.contact_person)}
+    claims_changed = any(
+        key in update_data and update_data[key] != getattr(store, key)
+        for key in ("contact_person", "station_id", "name")
+    )
     for key, value in update_data.items():
         setattr(store, key, value)
 
+    # reassignment or a station/name change alters the managers' warehouse info
+    versions = bump_token_versions(db, managers) if AUTH_CLAIMS_TOKENS and claims_changed else {}
     db.commit()
+    principal_cache.invalidate(*managers)
+    publish_token_versions(versions)
     db.refresh(store)
     return store
 
 @router.delete("/{store_id}", status_code=status.HTTP_200_OK)
-def delete_store(store_id: str, db: db_dependency, current_user: dict = Depends(get_current_user)):
-
-    role = current_user.get("role")
-    if not check_role_permission(role, ["WarehouseStaff", "Management"]):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="WarehouseStaff, Management or SystemAdmin role required"
-        )
+def delete_store(store_id: str, db: db_dependency, current_user: dict = Depends(require_policy("stores.write"))):
     store = db.query(model.Stores).filter(model.Stores.store_id == store_id).first()
     if not store:
         raise HTTPException(
@@ -146,6 +127,10 @@ def delete_store(store_id: str, db: db_dependency, current_user: dict = Depends(
             detail=f"Store with ID {store_id} not found."
         )
     
+    manager = store.contact_person
+    versions = bump_token_versions(db, [manager]) if AUTH_CLAIMS_TOKENS else {}
     db.delete(store)
     db.commit()
+    principal_cache.invalidate(manager)
+    publish_token_versions(versions)
     return {"detail": f"Store with ID {store_id} has been deleted successfully."}
@@ -6,7 +6,7 @@ from datetime import datetime, timedelta, date , time
 from app.core.database import get_db
 from app.core import model, schemas
 import pytz
-from app.core.auth import get_current_user, check_role_permission
+from app.core.policies import require_policy
 
 router = APIRouter(prefix="/trainSchedules")
 db_dependency = Annotated[Session, Depends(get_db)]
@@ -19,13 +19,7 @@ db_dependency = Annotated[Session, Depends(get_db)]
 
 
 @router.get("/", response_model=List[schemas.Train_Schedules], status_code=status.HTTP_200_OK)
-def get_all_train_Schedules(db: db_dependency, current_user: dict = Depends(get_current_user)):
-    role = current_user.get("role")
-    if not check_role_permission(role, ["StoreManager", "Management"]):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="StoreManager, Management or SystemAdmin role required"
-        )
+def get_all_train_Schedules(db: db_dependency, current_user: dict = Depends(require_policy("train_schedules.list"))):
     schedules  = db.query(model.TrainSchedules).all()
     schedules_list = []
     for schedule in schedules:
@@ -45,14 +39,7 @@ def get_all_train_Schedules(db: db_dependency, current_user: dict = Depends(get_
 
 
 @router.get("/{scheduled_id}", response_model=schemas.Train_Schedules, status_code=status.HTTP_200_OK)
-def get_train_schedule_by_scheduled_id(scheduled_id : str, db: db_dependency, current_user: dict = Depends(get_current_user)):
-    role = current_user.get("role")
-    if not check_role_permission(role, ["StoreManager", "Management", "Assistant"]):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="StoreManager, Management, Assistant or SystemAdmin role required"
-        )
-    
+def get_train_schedule_by_scheduled_id(scheduled_id : str, db: db_dependency, current_user: dict = Depends(require_policy("train_schedules.read"))):
     schedules = db.query(model.TrainSchedules).filter(model.TrainSchedules.schedule_id == scheduled_id).first()
     schedules.status = schedules.status.value
     if not schedules:
@@ -61,13 +48,7 @@ def get_train_schedule_by_scheduled_id(scheduled_id : str, db: db_dependency, cu
     return schedules
 
 @router.post("/", response_model=schemas.Train_Schedules, status_code=status.HTTP_200_OK)
-def create_new_train_schedule( new_train_schedule: schemas.create_new_trainSchedule, db: db_dependency, current_user: dict = Depends(get_current_user)):
-    role = current_user.get("role")
-    if not check_role_permission(role, ["StoreManager", "Management"]):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="StoreManager, Management or SystemAdmin role required"
-        )
+def create_new_train_schedule( new_train_schedule: schemas.create_new_trainSchedule, db: db_dependency, current_user: dict = Depends(require_policy("train_schedules.create"))):
     #validate date 
     sl_tz = pytz.timezone("Asia/Colombo")
     now = datetime.now(sl_tz)
@@ -98,13 +79,7 @@ def create_new_train_schedule( new_train_schedule: schemas.create_new_trainSched
 
 
 @router.put("/{schedule_id}", response_model=schemas.Train_Schedules, status_code=status.HTTP_200_OK)
-def update_train_schedule(schedule_id: str, update_data: schemas.update_trainSchedules, db: db_dependency, current_user: dict = Depends(get_current_user) ):
-    role = current_user.get("role")
-    if not check_role_permission(role, ["Management"]):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Management or SystemAdmin role required"
-        )
+def update_train_schedule(schedule_id: str, update_data: schemas.update_trainSchedules, db: db_dependency, current_user: dict = Depends(require_policy("train_schedules.update")) ):
     train_schedule = db.query(model.TrainSchedules).filter(model.TrainSchedules.schedule_id == schedule_id).first()
     if not train_schedule:
         raise HTTPException(status_code=404, detail=f"Schedule {schedule_id} not found")
@@ -134,16 +109,7 @@ def update_train_schedule(schedule_id: str, update_data: schemas.update_trainSch
 
     
 @router.delete("/{schedule_id}", status_code=status.HTTP_200_OK)
-def delete_train_schedule(schedule_id: str, db: db_dependency, current_user: dict = Depends(get_current_user)):
-
-    role = current_user.get("role")
-    if role not in ["StoreManager", "Management"]:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="You do not have permission to delete schedules"
-        )
-
-    
+def delete_train_schedule(schedule_id: str, db: db_dependency, current_user: dict = Depends(require_policy("train_schedules.delete"))):
     train_schedule = db.query(model.TrainSchedules).filter(
         model.TrainSchedules.schedule_id == schedule_id
     ).first()
@@ -9,7 +9,8 @@ import pytz
 from sqlalchemy.orm import Session
 from app.core.database import get_db
 
-from app.core.auth import get_current_user, check_role_permission
+from app.core.policies import require_policy
+from app.core.reference_cache import reference_cache
 
 
 
@@ -18,15 +19,7 @@ db_dependency = Annotated[Session, Depends(get_db)]
 
 
 @router.get("/", response_model=List[schemas.Truck_Schedule], status_code=status.HTTP_200_OK)
-def get_all_truck_schedules(db: db_dependency, current_user: dict = Depends(get_current_user)):
-    role = current_user.get("role")
-   
-    if not check_role_permission(role, ["Assistant", "Management", "Driver", "WarehouseStaff", "SystemAdmin"]):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Assistant, Management, Driver, WarehouseStaff or SystemAdmin role required"
-        )
-
+def get_all_truck_schedules(db: db_dependency, current_user: dict = Depends(require_policy("truck_schedules.read"))):
     truck_schedules = db.query(model.TruckSchedules).all()
 
     if not truck_schedules:
@@ -38,16 +31,7 @@ def get_all_truck_schedules(db: db_dependency, current_user: dict = Depends(get_
     return truck_schedules
 
 @router.get("/{schedule_id}", response_model=schemas.Truck_Schedule, status_code=status.HTTP_200_OK)
-def get_truck_schedule_by_id( schedule_id: str,db: db_dependency, current_user: dict = Depends(get_current_user)):
-    
-    role = current_user.get("role")
-    if not check_role_permission(role, ["Assistant", "Management", "Driver", "WarehouseStaff", "SystemAdmin"]):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Assistant, Management, Driver, WarehouseStaff or SystemAdmin role required"
-        )
-
-    
+def get_truck_schedule_by_id( schedule_id: str,db: db_dependency, current_user: dict = Depends(require_policy("truck_schedules.read"))):
     truck_schedule = db.query(model.TruckSchedules).filter(model.TruckSchedules.schedule_id == schedule_id).first()
     if not truck_schedule:
         raise HTTPException(
@@ -59,14 +43,7 @@ def get_truck_schedule_by_id( schedule_id: str,db: db_dependency, current_user:
 
 
 @router.post("/", response_model=schemas.Truck_Schedule, status_code=status.HTTP_201_CREATED)
-def create_truck_schedule(new_truck_schedule: schemas.Truck_Schedule, db: db_dependency, current_user: dict = Depends(get_current_user)):
-    # Role check
-    if not check_role_permission(current_user.get("role"), ["Assistant", "Management", "SystemAdmin"]):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Assistant, Management or SystemAdmin role required"
-        )
-
+def create_truck_schedule(new_truck_schedule: schemas.Truck_Schedule, db: db_dependency, current_user: dict = Depends(require_policy("truck_schedules.create"))):
     # Basic validations
     if not new_truck_schedule.departure_time:
         raise HTTPException(
@@ -92,23 +69,19 @@ def create_truck_schedule(new_truck_schedule: schemas.Truck_Schedule, db: db_dep
 
     # Validate foreign keys exist
     if new_truck_schedule.route_id:
-        route = db.query(model.Routes).filter(model.Routes.route_id == new_truck_schedule.route_id).first()
-        if not route:
+        if not reference_cache.exists(db, "routes", new_truck_schedule.route_id):
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Route with ID {new_truck_schedule.route_id} not found")
 
     if new_truck_schedule.truck_id:
-        truck = db.query(model.Trucks).filter(model.Trucks.truck_id == new_truck_schedule.truck_id).first()
-        if not truck:
+        if not reference_cache.exists(db, "trucks", new_truck_schedule.truck_id):
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Truck with ID {new_truck_schedule.truck_id} not found")
 
     if new_truck_schedule.driver_id:
-        driver = db.query(model.Drivers).filter(model.Drivers.driver_id == new_truck_schedule.driver_id).first()
-        if not driver:
+        if not reference_cache.exists(db, "drivers", new_truck_schedule.driver_id):
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Driver with ID {new_truck_schedule.driver_id} not found")
 
     if new_truck_schedule.assistant_id:
-        assistant = db.query(model.Assistants).filter(model.Assistants.assistant_id == new_truck_schedule.assistant_id).first()
-        if not assistant:
+        if not reference_cache.exists(db, "assistants", new_truck_schedule.assistant_id):
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Assistant with ID {new_truck_schedule.assistant_id} not found")
 
     # # Driver and assistant cannot be the same person
@@ -208,14 +181,7 @@ def create_truck_schedule(new_truck_schedule: schemas.Truck_Schedule, db: db_dep
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 @router.put("/{schedule_id}", response_model=schemas.Truck_Schedule, status_code=status.HTTP_200_OK)
-def update_truck_schedule(schedule_id: str, update_data: schemas.Truck_Schedule_Update, db: db_dependency, current_user: dict = Depends(get_current_user)):
-
-    if not check_role_permission(current_user.get("role"), ["Assistant", "Management", "SystemAdmin"]):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Only Management, Assistant or SystemAdmin can update truck schedules"
-        )
-
+def update_truck_schedule(schedule_id: str, update_data: schemas.Truck_Schedule_Update, db: db_dependency, current_user: dict = Depends(require_policy("truck_schedules.update"))):
     # Check if schedule exists
     truck_schedule = db.query(model.TruckSchedules).filter(model.TruckSchedules.schedule_id == schedule_id).first()
     if not truck_schedule:
@@ -226,32 +192,28 @@ def update_truck_schedule(schedule_id: str, update_data: schemas.Truck_Schedule_
     
     # Validate foreign keys
     if update_data.route_id:
-        route = db.query(model.Routes).filter(model.Routes.route_id == update_data.route_id).first()
-        if not route:
+        if not reference_cache.exists(db, "routes", update_data.route_id):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Route with ID {update_data.route_id} not found"
             )
     
     if update_data.truck_id:
-        truck = db.query(model.Trucks).filter(model.Trucks.truck_id == update_data.truck_id).first()
-        if not truck:
+        if not reference_cache.exists(db, "trucks", update_data.truck_id):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Truck with ID {update_data.truck_id} not found"
             )
     
     if update_data.driver_id:
-        driver = db.query(model.Drivers).filter(model.Drivers.driver_id == update_data.driver_id).first()
-        if not driver:
+        if not reference_cache.exists(db, "drivers", update_data.driver_id):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Driver with ID {update_data.driver_id} not found"
             )
     
     if update_data.assistant_id:
-        assistant = db.query(model.Assistants).filter(model.Assistants.assistant_id == update_data.assistant_id).first()
-        if not assistant:
+        if not reference_cache.exists(db, "assistants", update_data.assistant_id):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Assistant with ID {update_data.assistant_id} not found"
@@ -306,14 +268,7 @@ def update_truck_schedule(schedule_id: str, update_data: schemas.Truck_Schedule_
 
 
 @router.delete("/{schedule_id}", status_code=status.HTTP_200_OK)
-def delete_truck_schedule(schedule_id: str, db: db_dependency, current_user: dict = Depends(get_current_user)):
-    # Check role
-    if not check_role_permission(current_user.get("role"), ["Assistant", "Management", "SystemAdmin"]):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Only Management, Assistant or SystemAdmin can delete truck schedules"
-        )
-    
+def delete_truck_schedule(schedule_id: str, db: db_dependency, current_user: dict = Depends(require_policy("truck_schedules.delete"))):
     # Fetch the schedule
     truck_schedule = db.query(model.TruckSchedules).filter(model.TruckSchedules.schedule_id == schedule_id).first()
     if not truck_schedule:
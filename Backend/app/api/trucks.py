@@ -1,45 +1,28 @@
 from fastapi import APIRouter, Depends, status, HTTPException
-from app.core.database import get_db, engine
+from app.core.database import get_db
 import app.core.model as model
 from typing import Annotated, List
 from sqlalchemy.orm import Session
 from app.core import model, schemas
-from app.core.auth import get_current_user, check_role_permission
+from app.core.policies import require_policy
+from app.core.reference_cache import reference_cache
 
 
 router = APIRouter(prefix="/trucks")
-model.Base.metadata.create_all(bind=engine)
 db_dependency = Annotated[Session, Depends(get_db)]
 
 
 @router.get("/",status_code=status.HTTP_200_OK,response_model=List[schemas.Trucks])
-def get_all_trucks(db: db_dependency,  current_user: dict = Depends(get_current_user)):
+def get_all_trucks(db: db_dependency,  current_user: dict = Depends(require_policy("trucks.read"))):
     """Get all trucks (SystemAdmin, Management, Assistant can view)"""
-    role = current_user.get("role")
-   
-    # Allow SystemAdmin, Management, and Assistant roles
-    if not check_role_permission(role, ["Assistant", "Management", "StoreManager", "Driver"]):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="You don't have permission to view trucks"
-        )
-    
     trucks = db.query(model.Trucks).all()
     
     # Return empty list instead of 404 if no trucks found
     return trucks if trucks else []
 
 @router.get("/available",status_code=status.HTTP_200_OK,response_model=List[schemas.Trucks])
-def get_available_trucks(db: db_dependency, current_user: dict = Depends(get_current_user)):
+def get_available_trucks(db: db_dependency, current_user: dict = Depends(require_policy("trucks.read"))):
     """Get all available (is_active=True) trucks"""
-    role = current_user.get("role")
-   
-    if not check_role_permission(role, ["Assistant", "Management", "StoreManager", "Driver"]):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="You don't have permission to view trucks"
-        )
-    
     trucks = db.query(model.Trucks).filter(model.Trucks.is_active == True).all()
     
     # Return empty list instead of 404 if no available trucks found
@@ -49,15 +32,8 @@ def update_truck(
     truck_id: str,
     truck_update: schemas.Trucks,
     db: db_dependency,
-    current_user: dict = Depends(get_current_user),
+    current_user: dict = Depends(require_policy("trucks.write")),
     ):
-    # Authorization
-    if not check_role_permission(current_user.get("role"), ["Assistant", "Management"]):
-        raise HTTPException(
-        status_code=status.HTTP_403_FORBIDDEN,
-        detail="Assistant, Management or SystemAdmin role required"
-        )
-
     # Fetch existing truck
     truck = db.query(model.Trucks).filter(model.Trucks.truck_id == truck_id).first()
     if not truck:
@@ -86,20 +62,14 @@ def update_truck(
     if updated:
         db.add(truck)
         db.commit()
+        reference_cache.invalidate("trucks")
         db.refresh(truck)
 
     return truck
 
 
 @router.delete("/{truck_id}", status_code=status.HTTP_200_OK)
-def delete_truck(truck_id: str, db: db_dependency, current_user: dict = Depends(get_current_user)):
-    # Check role
-    if not check_role_permission(current_user.get("role"), ["Assistant", "Management"]):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Assistant, Management or SystemAdmin role required"
-        )
-    
+def delete_truck(truck_id: str, db: db_dependency, current_user: dict = Depends(require_policy("trucks.write"))):
     # Fetch the schedule
     truck = db.query(model.Trucks).filter(model.Trucks.truck_id == truck_id).first()
     if not truck: 
@@ -111,5 +81,6 @@ def delete_truck(truck_id: str, db: db_dependency, current_user: dict = Depends(
     # Delete and commit
     db.delete(truck)
     db.commit()
+    reference_cache.invalidate("trucks")
     
     return {"detail": f"Truck {truck_id} deleted successfully"}
\ No newline at end of file
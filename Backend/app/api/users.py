@@ -1,25 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Security
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Security
 from fastapi.security import OAuth2PasswordRequestForm
 from datetime import timedelta
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload
 from typing import Annotated, List
-from app.core.database import get_db, engine
+from app.core.database import get_db, get_async_db
 from app.core import model, schemas
 
 from pydantic import BaseModel
 from fastapi import Security
 
 from app.core.auth import (
-    verify_password,
+    verify_and_update_password_async,
     create_access_token,
-    get_password_hash,
+    get_password_hash_async,
     ACCESS_TOKEN_EXPIRE_MINUTES,
     require_management,
     get_current_user,
+    principal_cache,
+    principal_claims,
 )
+from app.core.login_throttle import login_throttle, client_ip
+from app.core.token_versions import token_versions, bump_token_version
 
 router = APIRouter(prefix="/users")
-model.Base.metadata.create_all(bind=engine)
 db_dependency = Annotated[Session, Depends(get_db)]
 
 class TextIn(BaseModel):
@@ -28,28 +33,39 @@ class TextIn(BaseModel):
 @router.post("/strtopass")
 async def str_to_pass(payload: TextIn):
     """Convert given string to its hashed password form (Management role required)"""
-    hashed = get_password_hash(payload.text)
+    hashed = await get_password_hash_async(payload.text)
     return {"hash": hashed}
 
 
 @router.post("/login")
-async def login(db: Session = Depends(get_db), form_data: OAuth2PasswordRequestForm = Depends()):
+async def login(request: Request, db: AsyncSession = Depends(get_async_db), form_data: OAuth2PasswordRequestForm = Depends()):
     """Authenticate user and return JWT token"""
-    user = db.query(model.Users).filter(model.Users.user_name == form_data.username).first()
+    # Rejects locked-out usernames/IPs with 429 before any lookup or password hashing
+    attempt = ("users", form_data.username, client_ip(request))
+    login_throttle.check(*attempt)
 
-    if not user or not verify_password(form_data.password, user.password_hash):
+    user = await db.scalar(select(model.Users).where(model.Users.user_name == form_data.username))
+
+    valid, new_hash = False, None
+    if user:
+        valid, new_hash = await verify_and_update_password_async(form_data.password, user.password_hash)
+    if not valid:
+        login_throttle.failure(*attempt)
         raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED, 
+            status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    token = create_access_token(data={"sub": user.user_id, "role": user.role}, expires_delta=access_token_expires)
+    login_throttle.success(*attempt)
+
+    # Upgrade legacy SHA-256 digests to pbkdf2_sha256 now that we know the password
+    if new_hash:
+        user.password_hash = new_hash
+        await db.commit()
 
     # Base response
     response = {
-        "access_token": token,
         "token_type": "bearer",
         "user_id": user.user_id, 
         "user_name": user.user_name,  # Changed from 'username' to match frontend expectations
@@ -58,9 +74,12 @@ async def login(db: Session = Depends(get_db), form_data: OAuth2PasswordRequestF
     
     # For Store Managers, include warehouse assignment
     if user.role == "StoreManager":
-        assigned_store = db.query(model.Stores).filter(
-            model.Stores.contact_person == user.user_id
-        ).first()
+        assigned_store = await db.scalar(
+            select(model.Stores)
+            .options(joinedload(model.Stores.station).joinedload(model.RailwayStations.city))
+            .where(model.Stores.contact_person == user.user_id)
+            .limit(1)
+        )
         
         if assigned_store:
             response["warehouse_id"] = assigned_store.store_id
@@ -71,6 +90,9 @@ async def login(db: Session = Depends(get_db), form_data: OAuth2PasswordRequestF
                 city_name = assigned_store.station.city.city_name
                 response["warehouse_name"] = f"{city_name} Warehouse"
     
+    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    claims = principal_claims(user, response.get("warehouse_id"), response.get("warehouse_name"))
+    response["access_token"] = create_access_token(data=claims, expires_delta=access_token_expires)
     return response
 
 
@@ -83,7 +105,7 @@ async def create_user(user: schemas.UserCreate, db: db_dependency, current_user:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Username already exists")
 
     # Hash the password
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await get_password_hash_async(user.password)
 
     # Create new user
     new_user = model.Users(user_name=user.user_name, password_hash=hashed_password, role=user.role)
@@ -142,13 +164,21 @@ async def update_user(user_id: str, user_update: schemas.UserUpdate, db: db_depe
         user.user_name = user_update.user_name
     
     if user_update.password is not None:
-        user.password_hash = get_password_hash(user_update.password)
+        user.password_hash = await get_password_hash_async(user_update.password)
     
     if user_update.role is not None:
         user.role = user_update.role
+
+    # a new password or role revokes tokens issued before the change
+    version = None
+    if user_update.password is not None or user_update.role is not None:
+        version = bump_token_version(user)
     
     try:
         db.commit()
+        principal_cache.invalidate(user_id)
+        if version is not None:
+            token_versions.set(user_id, version)
         db.refresh(user)
         return user
     except Exception as e:
@@ -166,7 +196,23 @@ async def delete_user(user_id: str, db: db_dependency, current_user: dict = Secu
     try:
         db.delete(user)
         db.commit()
+        principal_cache.invalidate(user_id)
+        token_versions.discard(user_id)
         return None
     except Exception as e:
         db.rollback()
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.post("/{user_id}/revoke-tokens", status_code=status.HTTP_200_OK)
+async def revoke_user_tokens(user_id: str, db: db_dependency, current_user: dict = Security(require_management)):
+    """Revoke every access token issued to a user (Management role required)"""
+    user = db.query(model.Users).filter(model.Users.user_id == user_id).first()
+    if not user:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+
+    version = bump_token_version(user)
+    db.commit()
+    principal_cache.invalidate(user_id)
+    token_versions.set(user_id, version)
+    return {"detail": f"Tokens for user {user_id} revoked", "token_version": version}
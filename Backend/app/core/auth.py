@@ -1,15 +1,21 @@
 import os
+import time
+import asyncio
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Union, Dict
+from typing import Union, Dict, Optional, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from app.core.database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_async_db
 from app.core import model  # uses your model.Users
+from app.core.cache import TTLCache
+from app.core.token_versions import token_versions
 from passlib.exc import UnknownHashError
-import hashlib
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -20,43 +26,66 @@ SECRET_KEY = os.getenv("SECRET_KEY", "dev-secret-change-me")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
 
-# Password hashing and OAuth2 scheme
-pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
+# Principal cache: the user dict built by get_current_user, keyed by user_id, so
+# authenticated requests skip the Users/Stores lookups. users.py and stores.py
+# invalidate entries on writes; the TTL bounds staleness across worker processes.
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "10000"))
+PRINCIPAL_CACHE_TTL = float(os.getenv("PRINCIPAL_CACHE_TTL", "60"))
+principal_cache = TTLCache("principals", PRINCIPAL_CACHE_SIZE, PRINCIPAL_CACHE_TTL)
+
+# Opt-in claims-carrying tokens: user logins sign the principal (role, name, warehouse)
+# and the user's token_version into the token, and get_current_user trusts those claims
+# after checking the version (see app/core/token_versions.py). Role or warehouse
+# changes take effect at the next login; bump the token version to force one.
+AUTH_CLAIMS_TOKENS = os.getenv("AUTH_CLAIMS_TOKENS", "False").lower() == "true"
+
+# Decoded-token cache: verified JWT payloads keyed by a SHA-256 digest of the token,
+# so clients polling with the same bearer token skip signature verification. Entries
+# never outlive the token's `exp`. Only successfully verified tokens are cached.
+AUTH_TOKEN_CACHE = os.getenv("AUTH_TOKEN_CACHE", "True").lower() == "true"
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+TOKEN_CACHE_TTL = float(os.getenv("TOKEN_CACHE_TTL", "300"))
+token_cache = TTLCache("tokens", TOKEN_CACHE_SIZE if AUTH_TOKEN_CACHE else 0, TOKEN_CACHE_TTL)
+
+# Password hashing and OAuth2 scheme. Legacy rows hold unsalted SHA-256 hex digests;
+# hex_sha256 verifies them and, being deprecated, makes verify_and_update return a
+# pbkdf2_sha256 replacement so they are upgraded at the next successful login.
+pwd_context = CryptContext(schemes=["pbkdf2_sha256", "hex_sha256"], deprecated=["hex_sha256"])
 oauth2_scheme_user = OAuth2PasswordBearer(tokenUrl="/users/login", scheme_name="users_auth")
 oauth2_scheme_customer = OAuth2PasswordBearer(tokenUrl="/customers/login", scheme_name="customer_auth")
 
+# Hashing is CPU-bound (pbkdf2 runs 29000 rounds by default). The async helpers run it
+# on this bounded pool so a login doesn't stall the event loop; hashlib releases the
+# GIL while hashing, so threads run in parallel.
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+_password_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify a password; also returns a new hash when the stored one uses a deprecated scheme"""
+    try:
+        return pwd_context.verify_and_update(plain_password, hashed_password)
+    except (UnknownHashError, ValueError, TypeError):
+        return False, None
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a plain password against a hashed password"""
-    try:
-        return pwd_context.verify(plain_password, hashed_password)
-    except UnknownHashError:
-        # Fallback for legacy raw SHA256 hex digests stored in DB
-        try:
-            candidate = hashlib.sha256(plain_password.encode("utf-8")).hexdigest()
-            return candidate == (hashed_password or "")
-        except Exception:
-            return False
-
-# def verify_password(plain_password: str, hashed_password: str) -> bool:
-#     """
-#     Primary: try passlib verify (supports pbkdf2_sha256).
-#     Fallback: legacy unsalted SHA256 hex digests (in DB).
-#     """
-#     try:
-#         return pwd_context.verify(plain_password, hashed_password)
-#     except UnknownHashError:
-#         # Legacy: raw SHA-256 hex digest
-#         try:
-#             candidate = hashlib.sha256(plain_password.encode("utf-8")).hexdigest()
-#             return candidate == (hashed_password or "")
-#         except Exception:
-#             return False
+    return verify_and_update_password(plain_password, hashed_password)[0]
         
 def get_password_hash(password: str) -> str:
     """Generate a hash from a plain password"""
     
     return pwd_context.hash(password)
 
+async def verify_and_update_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """verify_and_update_password on the password worker pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_password_executor, verify_and_update_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """get_password_hash on the password worker pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_password_executor, get_password_hash, password)
+
 def create_access_token(data: dict, expires_delta: Union[timedelta, None] = None) -> str:
     """Create a JWT access token"""
     to_encode = data.copy() 
@@ -68,14 +97,68 @@ def create_access_token(data: dict, expires_delta: Union[timedelta, None] = None
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM) 
     return encoded_jwt
 
-def _get_user_by_id(db: Session, user_id: str):
-    return db.query(model.Users).filter(model.Users.user_id == user_id).first() 
+def decode_access_token(token: str) -> Dict:
+    """Verify and decode a JWT (raises JWTError), served from token_cache when possible.
+
+    The returned payload may be shared between requests; don't modify it.
+    """
+    digest = hashlib.sha256(token.encode("utf-8")).digest()
+    payload = token_cache.get(digest)
+    if payload is not None:
+        return payload
 
-def _get_customer_by_id(db: Session, customer_id: str):
-    return db.query(model.Customers).filter(model.Customers.customer_id == customer_id).first()
+    payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    ttl = TOKEN_CACHE_TTL
+    if isinstance(payload.get("exp"), (int, float)):
+        ttl = min(ttl, payload["exp"] - time.time())
+    if ttl > 0:
+        token_cache.set(digest, payload, ttl)
+    return payload
+
+def principal_claims(user, warehouse_id: str = None, warehouse_name: str = None) -> Dict:
+    """Token claims for a user login; includes the principal when AUTH_CLAIMS_TOKENS is on"""
+    claims = {"sub": user.user_id, "role": user.role}
+    if AUTH_CLAIMS_TOKENS:
+        claims["name"] = user.user_name
+        claims["ver"] = user.token_version or 0
+        if warehouse_id:
+            claims["wid"] = warehouse_id
+            claims["wname"] = warehouse_name
+    return claims
+
+def _principal_from_claims(payload: Dict) -> Dict:
+    user_data = {
+        "user_id": payload["sub"],
+        "username": payload.get("name"),
+        "role": payload.get("role"),
+        "name": payload.get("name"),
+    }
+    if payload.get("wid"):
+        user_data["warehouseId"] = payload["wid"]
+        user_data["warehouseName"] = payload.get("wname")
+    return user_data
+
+async def _get_user_by_id(db: AsyncSession, user_id: str):
+    result = await db.execute(select(model.Users).where(model.Users.user_id == user_id))
+    return result.scalars().first()
+
+async def _get_customer_by_id(db: AsyncSession, customer_id: str):
+    result = await db.execute(select(model.Customers).where(model.Customers.customer_id == customer_id))
+    return result.scalars().first()
+
+async def _get_assigned_store(db: AsyncSession, user_id: str):
+    """Store managed by the user together with its city name (single round trip)"""
+    result = await db.execute(
+        select(model.Stores, model.Cities.city_name)
+        .outerjoin(model.RailwayStations, model.Stores.station_id == model.RailwayStations.station_id)
+        .outerjoin(model.Cities, model.RailwayStations.city_id == model.Cities.city_id)
+        .where(model.Stores.contact_person == user_id)
+        .limit(1)
+    )
+    return result.first()
     
 
-async def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_scheme_user)) -> Dict:
+async def get_current_user(db: AsyncSession = Depends(get_async_db), token: str = Depends(oauth2_scheme_user)) -> Dict:
     """Get the current authenticated user from the JWT token"""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -83,14 +166,23 @@ async def get_current_user(db: Session = Depends(get_db), token: str = Depends(o
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = decode_access_token(token)
         user_id: str = payload.get("sub")
         if user_id is None:
             raise credentials_exception
     except JWTError:
         raise credentials_exception
 
-    user = _get_user_by_id(db, user_id)
+    if AUTH_CLAIMS_TOKENS and "ver" in payload:
+        if not await token_versions.is_current(db, user_id, payload["ver"]):
+            raise credentials_exception
+        return _principal_from_claims(payload)
+
+    cached = principal_cache.get(user_id)
+    if cached is not None:
+        return dict(cached)
+
+    user = await _get_user_by_id(db, user_id)
     if user is None:
         raise credentials_exception
     
@@ -105,23 +197,22 @@ async def get_current_user(db: Session = Depends(get_db), token: str = Depends(o
     # For Store Managers, include warehouse assignment
     if user.role == "StoreManager":
         # Find the store where this user is the contact_person (store manager)
-        assigned_store = db.query(model.Stores).filter(
-            model.Stores.contact_person == user.user_id
-        ).first()
+        row = await _get_assigned_store(db, user.user_id)
         
-        if assigned_store:
+        if row:
+            assigned_store, city_name = row
             user_data["warehouseId"] = assigned_store.store_id
             user_data["warehouseName"] = assigned_store.name
             
             # Optionally get city name for better display
-            if assigned_store.station and assigned_store.station.city:
-                city_name = assigned_store.station.city.city_name
+            if city_name:
                 user_data["warehouseName"] = f"{city_name} Warehouse"
     
-    return user_data
+    principal_cache.set(user_id, user_data)
+    return dict(user_data)
 
 # get customer 
-async def get_current_customer(db: Session = Depends(get_db), token: str = Depends(oauth2_scheme_customer)) -> Dict:
+async def get_current_customer(db: AsyncSession = Depends(get_async_db), token: str = Depends(oauth2_scheme_customer)) -> Dict:
     """Get the current authenticated user from the JWT token"""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED, 
@@ -129,14 +220,14 @@ async def get_current_customer(db: Session = Depends(get_db), token: str = Depen
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = decode_access_token(token)
         customer_id: str = payload.get("sub")
         if customer_id is None:
             raise credentials_exception
     except JWTError:
         raise credentials_exception
 
-    user = _get_customer_by_id(db, customer_id)
+    user = await _get_customer_by_id(db, customer_id)
     if user is None:
         raise credentials_exception
     # print(user.role)
@@ -151,6 +242,14 @@ def require_management(current_user: Dict = Depends(get_current_user)) -> Dict:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Management or SystemAdmin role required")
     return current_user
 
+def require_system_admin(current_user: Dict = Depends(get_current_user)) -> Dict:
+    """Dependency that ensures the current user has role 'SystemAdmin'"""
+    if not current_user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+    if (current_user.get("role") or "").strip() != "SystemAdmin":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="SystemAdmin role required")
+    return current_user
+
 def is_admin_or_management(role: str) -> bool:
     """Check if role is SystemAdmin or Management (has full privileges)"""
     return role in ["SystemAdmin", "Management"]
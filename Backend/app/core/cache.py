@@ -0,0 +1,78 @@
+"""
+Bounded in-process cache with per-entry TTL and LRU eviction.
+
+Entries expire `ttl` seconds after they were stored. When the cache holds `maxsize`
+entries, the least recently used one is evicted. Values are per worker process;
+writers invalidate keys explicitly, and the TTL bounds staleness for changes made by
+other processes. Callers should store immutable values or copy on read.
+"""
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+from app.core.metrics import Counters
+
+_MISSING = object()
+
+
+class TTLCache:
+    def __init__(self, name: str, maxsize: int, ttl: float):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = Counters("hits", "misses", "expirations", "evictions", "invalidations")
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is not _MISSING:
+                value, expires_at = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.counters.incr("hits")
+                    return value
+                del self._entries[key]
+                self.counters.incr("expirations")
+        self.counters.incr("misses")
+        return default
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        if self.maxsize <= 0:
+            return
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.counters.incr("evictions")
+
+    def invalidate(self, *keys: Hashable) -> None:
+        with self._lock:
+            for key in keys:
+                if self._entries.pop(key, _MISSING) is not _MISSING:
+                    self.counters.incr("invalidations")
+
+    def clear(self) -> None:
+        with self._lock:
+            count = len(self._entries)
+            self._entries.clear()
+        self.counters.incr("invalidations", count)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict:
+        snapshot = self.counters.snapshot()
+        lookups = snapshot["hits"] + snapshot["misses"]
+        return {
+            **snapshot,
+            "size": len(self),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "hit_ratio": round(snapshot["hits"] / lookups, 4) if lookups else None,
+        }
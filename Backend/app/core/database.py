@@ -1,8 +1,15 @@
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.orm import sessionmaker, declarative_base, Session
+from fastapi import Request
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 import os
+import time
+import hashlib
+import threading
 from urllib.parse import quote_plus
 from dotenv import load_dotenv
+from app.core.pool_metrics import instrumented_pool_class, register_pool_events
+from app.core.slow_query_log import install_slow_query_log
 
 # Load environment variables from .env file
 load_dotenv()
@@ -17,17 +24,158 @@ DB_NAME = os.getenv("MYSQL_DATABASE", "kandypack_db")
 # URL-encode the password to handle special characters
 DB_PASSWORD_ENCODED = quote_plus(DB_PASSWORD)
 
-# Create the database URL
+# Create the database URLs (sync driver for scripts, async driver for the API)
 DB_URL = f"mysql+pymysql://{DB_USER}:{DB_PASSWORD_ENCODED}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+ASYNC_DB_URL = f"mysql+aiomysql://{DB_USER}:{DB_PASSWORD_ENCODED}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
-engine = create_engine(DB_URL)
-Session_local = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+# Optional read replica. When MYSQL_REPLICA_HOST is unset every read goes to the primary.
+REPLICA_HOST = os.getenv("MYSQL_REPLICA_HOST")
+REPLICA_PORT = os.getenv("MYSQL_REPLICA_PORT", DB_PORT)
+REPLICA_USER = os.getenv("MYSQL_REPLICA_USER", DB_USER)
+REPLICA_PASSWORD_ENCODED = quote_plus(os.getenv("MYSQL_REPLICA_PASSWORD", DB_PASSWORD))
+REPLICA_NAME = os.getenv("MYSQL_REPLICA_DATABASE", DB_NAME)
+REPLICA_DB_URL = f"mysql+pymysql://{REPLICA_USER}:{REPLICA_PASSWORD_ENCODED}@{REPLICA_HOST}:{REPLICA_PORT}/{REPLICA_NAME}"
+REPLICA_ASYNC_DB_URL = f"mysql+aiomysql://{REPLICA_USER}:{REPLICA_PASSWORD_ENCODED}@{REPLICA_HOST}:{REPLICA_PORT}/{REPLICA_NAME}"
+
+# Opt-in: after a client writes, keep its reads on the primary for this many seconds
+# so it doesn't read stale data from a lagging replica. 0 disables the window.
+DB_READ_YOUR_WRITES_SECONDS = float(os.getenv("DB_READ_YOUR_WRITES_SECONDS", "0"))
+
+# Connection pool settings. Recycle must stay below MySQL's wait_timeout (default 8h)
+# so idle connections are replaced before the server drops them; pre-ping catches the rest.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "True").lower() == "true"
+
+POOL_OPTIONS = {
+    "pool_size": DB_POOL_SIZE,
+    "max_overflow": DB_MAX_OVERFLOW,
+    "pool_timeout": DB_POOL_TIMEOUT,
+    "pool_recycle": DB_POOL_RECYCLE,
+    "pool_pre_ping": DB_POOL_PRE_PING,
+}
+
+engine = create_engine(DB_URL, poolclass=instrumented_pool_class("primary"), **POOL_OPTIONS)
+register_pool_events(engine, "primary")
+
+# Async engine: used by `async def` handlers so queries don't block the event loop
+async_engine = create_async_engine(
+    ASYNC_DB_URL, poolclass=instrumented_pool_class("primary_async", async_pool=True), **POOL_OPTIONS
+)
+register_pool_events(async_engine.sync_engine, "primary_async")
+
+if REPLICA_HOST:
+    replica_engine = create_engine(REPLICA_DB_URL, poolclass=instrumented_pool_class("replica"), **POOL_OPTIONS)
+    register_pool_events(replica_engine, "replica")
+    replica_async_engine = create_async_engine(
+        REPLICA_ASYNC_DB_URL, poolclass=instrumented_pool_class("replica_async", async_pool=True), **POOL_OPTIONS
+    )
+    register_pool_events(replica_async_engine.sync_engine, "replica_async")
+else:
+    replica_engine = engine
+    replica_async_engine = async_engine
+
+# Slow statement log; EXPLAIN always runs through a sync engine on the same server
+install_slow_query_log(engine, "primary")
+install_slow_query_log(async_engine.sync_engine, "primary_async", explain_engine=engine)
+if replica_engine is not engine:
+    install_slow_query_log(replica_engine, "replica")
+    install_slow_query_log(replica_async_engine.sync_engine, "replica_async", explain_engine=replica_engine)
+
+
+def _is_write(clause) -> bool:
+    # Anything that isn't a plain SELECT (DML, SELECT ... FOR UPDATE, raw text()) goes to the primary
+    if clause is None or not getattr(clause, "is_select", False):
+        return True
+    return getattr(clause, "_for_update_arg", None) is not None
+
+
+class RoutingSession(Session):
+    """Session that sends reads to the replica when flagged read-only and everything else to the primary.
+
+    A session is read-only when `session.info["read_only"]` is set (see get_db). Once it has
+    written anything it sticks to the primary so it can read its own writes.
+    """
+    primary_bind = engine
+    replica_bind = replica_engine
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self._flushing or _is_write(clause):
+            self.info["wrote"] = True
+            return self.primary_bind
+        if self.info.get("read_only") and not self.info.get("wrote"):
+            return self.replica_bind
+        return self.primary_bind
+
+
+class AsyncRoutingSession(RoutingSession):
+    # AsyncSession drives a sync Session internally, so it routes to the sync side of the async engines
+    primary_bind = async_engine.sync_engine
+    replica_bind = replica_async_engine.sync_engine
+
+
+Session_local = sessionmaker(bind=engine, class_=RoutingSession, autoflush=False, autocommit=False)
 Base = declarative_base()
 
+AsyncSession_local = async_sessionmaker(
+    bind=async_engine, sync_session_class=AsyncRoutingSession, autoflush=False, expire_on_commit=False
+)
+
+# client key -> monotonic time of its last write (read-your-writes window, per worker process)
+_recent_writes = {}
+_recent_writes_lock = threading.Lock()
+
+
+def _client_key(request: Request) -> str:
+    auth_header = request.headers.get("authorization")
+    if auth_header:
+        return hashlib.sha256(auth_header.encode("utf-8")).hexdigest()
+    return request.client.host if request.client else ""
+
+
+def _mark_write(key: str) -> None:
+    now = time.monotonic()
+    with _recent_writes_lock:
+        _recent_writes[key] = now
+        if len(_recent_writes) > 10000:
+            for stale_key in [k for k, t in _recent_writes.items() if now - t > DB_READ_YOUR_WRITES_SECONDS]:
+                del _recent_writes[stale_key]
+
+
+def _wrote_recently(key: str) -> bool:
+    written_at = _recent_writes.get(key)
+    return written_at is not None and time.monotonic() - written_at < DB_READ_YOUR_WRITES_SECONDS
 
-def get_db():
+
+def _use_replica(request: Request) -> bool:
+    if replica_engine is engine or request.method not in ("GET", "HEAD"):
+        return False
+    if DB_READ_YOUR_WRITES_SECONDS > 0 and _wrote_recently(_client_key(request)):
+        return False
+    return True
+
+
+def _after_request(request: Request, session: Session) -> None:
+    if DB_READ_YOUR_WRITES_SECONDS > 0 and session.info.get("wrote"):
+        _mark_write(_client_key(request))
+
+
+def get_db(request: Request):
     db = Session_local()
+    db.info["read_only"] = _use_replica(request)
     try:
-        yield db 
+        yield db
     finally:
+        _after_request(request, db)
         db.close()
+
+
+async def get_async_db(request: Request):
+    async with AsyncSession_local() as db:
+        db.sync_session.info["read_only"] = _use_replica(request)
+        try:
+            yield db
+        finally:
+            _after_request(request, db.sync_session)
@@ -0,0 +1,265 @@
+"""
+Idempotency-Key support for create endpoints that clients retry after timeouts.
+
+For the routes in IDEMPOTENT_ROUTES, a request carrying an `Idempotency-Key` header
+reserves that key before the handler runs, together with a fingerprint of the
+request (SHA-256 of method, path, query string and body). When the handler returns
+a 2xx response, its status, content type and body are stored under the key for
+IDEMPOTENCY_TTL seconds. A later request with the same key:
+  - same fingerprint, response stored   -> the stored response is replayed with
+    `Idempotent-Replayed: true`; the handler (and so the order/allocation tables)
+    is not touched
+  - same fingerprint, first still running -> 409, retry later (the first request
+    refreshes its reservation every IDEMPOTENCY_PENDING_TTL / 3 seconds for as long
+    as it runs, so the pending TTL only bounds how long a key stays held after its
+    worker died mid-request)
+  - different fingerprint                -> 422, a key names exactly one request
+Any other outcome of the first request (4xx/5xx, an exception, a response larger
+than IDEMPOTENCY_MAX_RESPONSE_BYTES) releases the key, so a retry runs normally.
+
+The fingerprint needs the whole body in memory, so file uploads (multipart requests)
+are passed through without idempotency rather than buffered; the routes below take
+JSON bodies.
+
+Keys are scoped to the caller (the bearer token's subject) and the route, so two
+clients can't see each other's responses. Requests without a valid bearer token are
+passed through and fail authentication in the handler as usual.
+
+Records live in an IdempotencyStore. The default MemoryIdempotencyStore is per
+worker process (at most IDEMPOTENCY_MAX_KEYS keys, least recently used evicted), so
+a retry routed to a different worker is not deduplicated. To share keys across
+workers, implement IdempotencyStore on a shared backend (e.g. Redis SET NX with
+expiry) and either assign it to `idempotency.store` at startup or name its class in
+IDEMPOTENCY_STORE ("package.module:ClassName").
+"""
+import os
+import asyncio
+import hashlib
+import threading
+import importlib
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from fastapi import Request, Response, status
+from fastapi.responses import JSONResponse
+from jose import JWTError
+
+from app.core.auth import decode_access_token
+from app.core.cache import TTLCache
+from app.core.metrics import Counters
+
+IDEMPOTENCY = os.getenv("IDEMPOTENCY", "True").lower() == "true"
+IDEMPOTENCY_TTL = float(os.getenv("IDEMPOTENCY_TTL", "86400"))
+IDEMPOTENCY_PENDING_TTL = float(os.getenv("IDEMPOTENCY_PENDING_TTL", "60"))  # how long a key stays reserved once no longer refreshed
+IDEMPOTENCY_MAX_KEYS = int(os.getenv("IDEMPOTENCY_MAX_KEYS", "10000"))
+IDEMPOTENCY_MAX_RESPONSE_BYTES = int(os.getenv("IDEMPOTENCY_MAX_RESPONSE_BYTES", "65536"))
+IDEMPOTENCY_STORE = os.getenv("IDEMPOTENCY_STORE")
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+
+# (method, path without trailing slash)
+IDEMPOTENT_ROUTES = {
+    ("POST", "/orders/create-with-items"),
+    ("POST", "/allocations"),
+}
+
+
+@dataclass(frozen=True)
+class IdempotencyRecord:
+    fingerprint: bytes
+    status_code: Optional[int] = None  # None while the first request is still running
+    media_type: Optional[str] = None
+    body: bytes = b""
+
+    @property
+    def pending(self) -> bool:
+        return self.status_code is None
+
+
+class IdempotencyStore(ABC):
+    """Storage for idempotency records; every record expires after its ttl"""
+
+    @abstractmethod
+    def reserve(self, key: str, fingerprint: bytes, ttl: float) -> Optional[IdempotencyRecord]:
+        """Claim `key` for a new request. Returns None if claimed, else the record already holding the key."""
+
+    @abstractmethod
+    def refresh(self, key: str, fingerprint: bytes, ttl: float) -> None:
+        """Extend the reservation of a running request; leaves a record of another request alone"""
+
+    @abstractmethod
+    def complete(self, key: str, record: IdempotencyRecord, ttl: float) -> None:
+        ...
+
+    @abstractmethod
+    def release(self, key: str) -> None:
+        ...
+
+    @abstractmethod
+    def clear(self) -> None:
+        ...
+
+    @abstractmethod
+    def size(self) -> int:
+        ...
+
+
+class MemoryIdempotencyStore(IdempotencyStore):
+    """Per-process store on a TTLCache (LRU once `max_keys` keys are held)"""
+
+    def __init__(self, max_keys: int = IDEMPOTENCY_MAX_KEYS):
+        self.cache = TTLCache("idempotency", max_keys, IDEMPOTENCY_TTL)
+        self._lock = threading.Lock()  # makes reserve's check-and-set atomic
+
+    def reserve(self, key: str, fingerprint: bytes, ttl: float) -> Optional[IdempotencyRecord]:
+        with self._lock:
+            existing = self.cache.get(key)
+            if existing is None:
+                self.cache.set(key, IdempotencyRecord(fingerprint), ttl)
+            return existing
+
+    def refresh(self, key: str, fingerprint: bytes, ttl: float) -> None:
+        with self._lock:
+            existing = self.cache.get(key)
+            if existing is None or (existing.pending and existing.fingerprint == fingerprint):
+                self.cache.set(key, IdempotencyRecord(fingerprint), ttl)
+
+    def complete(self, key: str, record: IdempotencyRecord, ttl: float) -> None:
+        self.cache.set(key, record, ttl)
+
+    def release(self, key: str) -> None:
+        self.cache.invalidate(key)
+
+    def clear(self) -> None:
+        self.cache.clear()
+
+    def size(self) -> int:
+        return len(self.cache)
+
+
+def request_fingerprint(method: str, path: str, query: str, body: bytes) -> bytes:
+    digest = hashlib.sha256()
+    for part in (method.encode(), path.encode(), query.encode(), body):
+        digest.update(len(part).to_bytes(8, "big"))
+        digest.update(part)
+    return digest.digest()
+
+
+def _token_subject(request: Request) -> Optional[str]:
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return decode_access_token(token).get("sub")
+    except JWTError:
+        return None
+
+
+class Idempotency:
+    def __init__(self, store: IdempotencyStore, enabled: bool = IDEMPOTENCY,
+                 ttl: float = IDEMPOTENCY_TTL, pending_ttl: float = IDEMPOTENCY_PENDING_TTL,
+                 max_response_bytes: int = IDEMPOTENCY_MAX_RESPONSE_BYTES):
+        self.store = store
+        self.enabled = enabled
+        self.ttl = ttl
+        self.pending_ttl = pending_ttl
+        self.max_response_bytes = max_response_bytes
+        self.counters = Counters("requests", "stored", "replayed", "in_progress", "mismatched", "released")
+
+    async def middleware(self, request: Request, call_next):
+        """HTTP middleware: reserve the key, replay a stored response or store the new one"""
+        path = request.url.path.rstrip("/")
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if key is None or not self.enabled or (request.method, path) not in IDEMPOTENT_ROUTES:
+            return await call_next(request)
+        if request.headers.get("content-type", "").lower().startswith("multipart/"):
+            return await call_next(request)  # don't buffer uploads to fingerprint them
+        if not 0 < len(key) <= IDEMPOTENCY_KEY_MAX_LENGTH:
+            return JSONResponse(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                content={"detail": f"{IDEMPOTENCY_HEADER} must be 1 to {IDEMPOTENCY_KEY_MAX_LENGTH} characters"},
+            )
+        subject = _token_subject(request)
+        if subject is None:
+            return await call_next(request)
+
+        self.counters.incr("requests")
+        fingerprint = request_fingerprint(request.method, path, request.url.query, await request.body())
+        store_key = f"{subject}:{request.method} {path}:{key}"
+        existing = self.store.reserve(store_key, fingerprint, self.pending_ttl)
+        if existing is not None:
+            return self._existing_response(existing, fingerprint)
+
+        holder = asyncio.create_task(self._hold(store_key, fingerprint))
+        try:
+            response = await call_next(request)
+            if not 200 <= response.status_code < 300:
+                self._release(store_key)
+                return response
+            body = b"".join([chunk async for chunk in response.body_iterator])
+        except BaseException:
+            self._release(store_key)
+            raise
+        finally:
+            holder.cancel()
+
+        if len(body) > self.max_response_bytes:
+            self._release(store_key)
+        else:
+            record = IdempotencyRecord(fingerprint, response.status_code, response.headers.get("content-type"), body)
+            self.store.complete(store_key, record, self.ttl)
+            self.counters.incr("stored")
+        return Response(content=body, status_code=response.status_code, headers=dict(response.headers))
+
+    async def _hold(self, store_key: str, fingerprint: bytes) -> None:
+        # keep the key reserved while the handler runs, however long it takes
+        while True:
+            await asyncio.sleep(self.pending_ttl / 3)
+            self.store.refresh(store_key, fingerprint, self.pending_ttl)
+
+    def _existing_response(self, record: IdempotencyRecord, fingerprint: bytes) -> Response:
+        if record.fingerprint != fingerprint:
+            self.counters.incr("mismatched")
+            return JSONResponse(
+                status_code=422,  # Unprocessable Content
+                content={"detail": f"{IDEMPOTENCY_HEADER} was already used for a different request"},
+            )
+        if record.pending:
+            self.counters.incr("in_progress")
+            return JSONResponse(
+                status_code=status.HTTP_409_CONFLICT,
+                content={"detail": f"A request with this {IDEMPOTENCY_HEADER} is still being processed"},
+                headers={"Retry-After": "1"},
+            )
+        self.counters.incr("replayed")
+        return Response(content=record.body, status_code=record.status_code, media_type=record.media_type,
+                        headers={REPLAYED_HEADER: "true"})
+
+    def _release(self, store_key: str) -> None:
+        self.store.release(store_key)
+        self.counters.incr("released")
+
+    def stats(self) -> Dict:
+        return {
+            **self.counters.snapshot(),
+            "enabled": self.enabled,
+            "store": type(self.store).__name__,
+            "keys": self.store.size(),
+            "ttl_seconds": self.ttl,
+            "pending_ttl_seconds": self.pending_ttl,
+            "max_response_bytes": self.max_response_bytes,
+            "routes": sorted(f"{method} {path}" for method, path in IDEMPOTENT_ROUTES),
+        }
+
+
+def _configured_store() -> IdempotencyStore:
+    if not IDEMPOTENCY_STORE:
+        return MemoryIdempotencyStore()
+    module_name, _, class_name = IDEMPOTENCY_STORE.partition(":")
+    return getattr(importlib.import_module(module_name), class_name)()
+
+
+idempotency = Idempotency(_configured_store())
@@ -0,0 +1,216 @@
+"""
+Login throttling against brute-force and credential-stuffing traffic.
+
+Every failed login costs a full pbkdf2 verification, so failures are counted in a
+sliding window per username (per login scope: "users" or "customers") and per client
+IP. When a key reaches its limit it is locked out; while locked, login attempts are
+rejected with 429 and a Retry-After header *before* the account is looked up or any
+password is hashed. Each further lockout of the same key doubles its duration
+(LOGIN_LOCKOUT_SECONDS, 2x, 4x, ... up to LOGIN_LOCKOUT_MAX_SECONDS); the doubling
+starts over once a key has stayed quiet for a whole window after its last lockout.
+A successful login clears the username's failures (the IP keeps its count).
+
+State lives in a ThrottleStore. The default MemoryThrottleStore is per worker
+process, so each worker enforces the limits separately. To share them across
+workers, implement ThrottleStore on a shared backend (e.g. Redis sorted sets and
+keys with expiry) and either assign it to `login_throttle.store` at startup or name
+its class in LOGIN_THROTTLE_STORE ("package.module:ClassName").
+"""
+import os
+import math
+import time
+import threading
+import importlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from typing import Dict, Tuple
+
+from fastapi import HTTPException, Request, status
+
+from app.core.metrics import Counters
+
+LOGIN_THROTTLE = os.getenv("LOGIN_THROTTLE", "True").lower() == "true"
+LOGIN_THROTTLE_WINDOW = float(os.getenv("LOGIN_THROTTLE_WINDOW", "300"))
+LOGIN_MAX_FAILURES_PER_USER = int(os.getenv("LOGIN_MAX_FAILURES_PER_USER", "5"))
+LOGIN_MAX_FAILURES_PER_IP = int(os.getenv("LOGIN_MAX_FAILURES_PER_IP", "20"))
+LOGIN_LOCKOUT_SECONDS = float(os.getenv("LOGIN_LOCKOUT_SECONDS", "30"))
+LOGIN_LOCKOUT_MAX_SECONDS = float(os.getenv("LOGIN_LOCKOUT_MAX_SECONDS", "3600"))
+LOGIN_THROTTLE_MAX_KEYS = int(os.getenv("LOGIN_THROTTLE_MAX_KEYS", "100000"))
+LOGIN_THROTTLE_STORE = os.getenv("LOGIN_THROTTLE_STORE")
+
+UNKNOWN_CLIENT = "unknown"
+
+
+class ThrottleStore(ABC):
+    """Storage for failure windows and lockouts. Timestamps are wall-clock seconds."""
+
+    @abstractmethod
+    def add_failure(self, key: str, now: float, window: float) -> int:
+        """Record a failure at `now`; return the failures for `key` within the last `window` seconds"""
+
+    @abstractmethod
+    def get_lock(self, key: str) -> Tuple[float, int]:
+        """(locked_until, strikes) for `key`; (0.0, 0) if it was never locked"""
+
+    @abstractmethod
+    def set_lock(self, key: str, until: float, strikes: int) -> None:
+        ...
+
+    @abstractmethod
+    def reset(self, key: str) -> None:
+        """Forget the failures and lockout of `key`"""
+
+    @abstractmethod
+    def clear(self) -> None:
+        ...
+
+    @abstractmethod
+    def size(self) -> int:
+        ...
+
+
+class MemoryThrottleStore(ThrottleStore):
+    """Per-process store; keeps at most `max_keys` keys, evicting the least recently used"""
+
+    def __init__(self, max_keys: int = LOGIN_THROTTLE_MAX_KEYS):
+        self.max_keys = max_keys
+        self._entries: "OrderedDict[str, list]" = OrderedDict()  # key -> [failure times, locked_until, strikes]
+        self._lock = threading.Lock()
+
+    def _entry(self, key: str) -> list:
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = [deque(), 0.0, 0]
+            while len(self._entries) > self.max_keys:
+                self._entries.popitem(last=False)
+        else:
+            self._entries.move_to_end(key)
+        return entry
+
+    def add_failure(self, key: str, now: float, window: float) -> int:
+        with self._lock:
+            failures = self._entry(key)[0]
+            failures.append(now)
+            while failures and failures[0] <= now - window:
+                failures.popleft()
+            return len(failures)
+
+    def get_lock(self, key: str) -> Tuple[float, int]:
+        with self._lock:
+            entry = self._entries.get(key)
+            return (entry[1], entry[2]) if entry else (0.0, 0)
+
+    def set_lock(self, key: str, until: float, strikes: int) -> None:
+        with self._lock:
+            entry = self._entry(key)
+            entry[1], entry[2] = until, strikes
+
+    def reset(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def size(self) -> int:
+        return len(self._entries)
+
+
+class LoginThrottle:
+    def __init__(self, store: ThrottleStore, enabled: bool = LOGIN_THROTTLE,
+                 window: float = LOGIN_THROTTLE_WINDOW,
+                 max_user_failures: int = LOGIN_MAX_FAILURES_PER_USER,
+                 max_ip_failures: int = LOGIN_MAX_FAILURES_PER_IP,
+                 lockout: float = LOGIN_LOCKOUT_SECONDS,
+                 lockout_max: float = LOGIN_LOCKOUT_MAX_SECONDS):
+        self.store = store
+        self.enabled = enabled
+        self.window = window
+        self.limits = {"user": max_user_failures, "ip": max_ip_failures}
+        self.lockout = lockout
+        self.lockout_max = lockout_max
+        self.counters = Counters("checks", "throttled_user", "throttled_ip", "failures",
+                                 "lockouts_user", "lockouts_ip", "successes")
+
+    @staticmethod
+    def _keys(scope: str, username: str, ip: str) -> Dict[str, str]:
+        keys = {"user": f"user:{scope}:{(username or '').strip().lower()}"}
+        if ip and ip != UNKNOWN_CLIENT:  # one shared "unknown" key would lock everyone out
+            keys["ip"] = f"ip:{ip}"
+        return keys
+
+    def lockout_duration(self, strikes: int) -> float:
+        """Lockout length for a key's (strikes + 1)-th consecutive lockout"""
+        return min(self.lockout * 2 ** min(strikes, 32), self.lockout_max)
+
+    def check(self, scope: str, username: str, ip: str) -> None:
+        """Raise 429 if the username or the IP is locked out. Call before any hashing."""
+        if not self.enabled:
+            return
+        self.counters.incr("checks")
+        now = time.time()
+        for kind, key in self._keys(scope, username, ip).items():
+            until, _ = self.store.get_lock(key)
+            if until > now:
+                self.counters.incr(f"throttled_{kind}")
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail="Too many failed login attempts, please try again later",
+                    headers={"Retry-After": str(math.ceil(until - now))},
+                )
+
+    def failure(self, scope: str, username: str, ip: str) -> None:
+        """Count a failed attempt; lock out any key that reached its limit"""
+        if not self.enabled:
+            return
+        self.counters.incr("failures")
+        now = time.time()
+        for kind, key in self._keys(scope, username, ip).items():
+            if self.store.add_failure(key, now, self.window) < self.limits[kind]:
+                continue
+            until, strikes = self.store.get_lock(key)
+            if until > now:
+                continue  # a concurrent attempt already locked it
+            if now - until > self.window:
+                strikes = 0
+            self.store.set_lock(key, now + self.lockout_duration(strikes), strikes + 1)
+            self.counters.incr(f"lockouts_{kind}")
+
+    def success(self, scope: str, username: str, ip: str) -> None:
+        if not self.enabled:
+            return
+        self.counters.incr("successes")
+        self.store.reset(self._keys(scope, username, ip)["user"])
+
+    def unlock(self, scope: str, username: str) -> None:
+        self.store.reset(self._keys(scope, username, "")["user"])
+
+    def stats(self) -> Dict:
+        return {
+            **self.counters.snapshot(),
+            "enabled": self.enabled,
+            "store": type(self.store).__name__,
+            "keys": self.store.size(),
+            "window_seconds": self.window,
+            "max_failures_per_user": self.limits["user"],
+            "max_failures_per_ip": self.limits["ip"],
+            "lockout_seconds": self.lockout,
+            "lockout_max_seconds": self.lockout_max,
+        }
+
+
+def _configured_store() -> ThrottleStore:
+    if not LOGIN_THROTTLE_STORE:
+        return MemoryThrottleStore()
+    module_name, _, class_name = LOGIN_THROTTLE_STORE.partition(":")
+    return getattr(importlib.import_module(module_name), class_name)()
+
+
+def client_ip(request: Request) -> str:
+    """Client address as seen by the server. Behind a proxy this is the proxy's address unless
+    uvicorn trusts it for X-Forwarded-For (FORWARDED_ALLOW_IPS, see start.sh)."""
+    return request.client.host if request.client else UNKNOWN_CLIENT
+
+
+login_throttle = LoginThrottle(_configured_store())
@@ -0,0 +1,196 @@
+"""
+Versioned schema migrations.
+
+Migration scripts live in Backend/migrations/versions and are named
+NNNN_description.py. Each one exposes `upgrade(conn)`, which receives a SQLAlchemy
+Connection inside a transaction. Applied versions are recorded in the
+`schema_migrations` table.
+
+0001 creates the original schema from frozen DDL; every later migration applies
+its change on top of it. Databases set up by hand may already have some of those
+changes, so schema changes after 0001 use the *_if_missing helpers below.
+
+Apply with `python migrate.py upgrade`. At startup the API only runs
+check_schema_version(), a single SELECT against schema_migrations.
+"""
+import os
+import re
+import hashlib
+import logging
+import importlib.util
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+logger = logging.getLogger("kandypack.migrations")
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+VERSIONS_DIR = os.path.join(BACKEND_DIR, "migrations", "versions")
+VERSIONS_TABLE = "schema_migrations"
+_FILENAME = re.compile(r"^(\d{4})_(\w+)\.py$")
+
+
+@dataclass
+class Migration:
+    version: int
+    name: str
+    path: str
+
+    @property
+    def checksum(self) -> str:
+        with open(self.path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+
+    def load(self):
+        spec = importlib.util.spec_from_file_location(f"kandypack_migration_{self.version:04d}", self.path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        if not hasattr(module, "upgrade"):
+            raise RuntimeError(f"Migration {os.path.basename(self.path)} has no upgrade(conn) function")
+        return module
+
+
+def discover_migrations(directory: str = VERSIONS_DIR) -> List[Migration]:
+    migrations = []
+    for filename in sorted(os.listdir(directory)):
+        match = _FILENAME.match(filename)
+        if match:
+            migrations.append(Migration(int(match.group(1)), match.group(2), os.path.join(directory, filename)))
+    versions = [m.version for m in migrations]
+    if len(versions) != len(set(versions)):
+        raise RuntimeError(f"Duplicate migration versions in {directory}")
+    return migrations
+
+
+def latest_version(directory: str = VERSIONS_DIR) -> int:
+    migrations = discover_migrations(directory)
+    return migrations[-1].version if migrations else 0
+
+
+def ensure_versions_table(conn: Connection) -> None:
+    conn.execute(text(f"""
+        CREATE TABLE IF NOT EXISTS {VERSIONS_TABLE} (
+            version INT PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            checksum CHAR(64) NOT NULL,
+            applied_at DATETIME NOT NULL
+        ) ENGINE=InnoDB
+    """))
+
+
+def applied_migrations(conn: Connection) -> Dict[int, Dict]:
+    rows = conn.execute(text(f"SELECT version, name, checksum, applied_at FROM {VERSIONS_TABLE}")).mappings()
+    return {row["version"]: dict(row) for row in rows}
+
+
+def _record(conn: Connection, migration: Migration) -> None:
+    conn.execute(
+        text(f"INSERT INTO {VERSIONS_TABLE} (version, name, checksum, applied_at) VALUES (:v, :n, :c, :t)"),
+        {"v": migration.version, "n": migration.name, "c": migration.checksum, "t": datetime.now()},
+    )
+
+
+def upgrade(engine: Engine, target: Optional[int] = None) -> List[Migration]:
+    """Apply pending migrations up to `target` (default: latest), in order. Returns what was applied."""
+    with engine.begin() as conn:
+        ensure_versions_table(conn)
+        applied = applied_migrations(conn)
+
+    done = []
+    for migration in discover_migrations():
+        if migration.version in applied:
+            continue
+        if target is not None and migration.version > target:
+            break
+        module = migration.load()
+        logger.info("Applying migration %04d_%s", migration.version, migration.name)
+        with engine.begin() as conn:
+            module.upgrade(conn)
+            _record(conn, migration)
+        done.append(migration)
+    return done
+
+
+def stamp(engine: Engine, version: int) -> None:
+    """Mark every migration up to `version` as applied without running it"""
+    with engine.begin() as conn:
+        ensure_versions_table(conn)
+        applied = applied_migrations(conn)
+        for migration in discover_migrations():
+            if migration.version <= version and migration.version not in applied:
+                _record(conn, migration)
+
+
+def migration_status(engine: Engine) -> List[Dict]:
+    with engine.begin() as conn:
+        ensure_versions_table(conn)
+        applied = applied_migrations(conn)
+    status = []
+    for migration in discover_migrations():
+        record = applied.get(migration.version)
+        status.append({
+            "version": migration.version,
+            "name": migration.name,
+            "applied_at": record["applied_at"] if record else None,
+            "modified": bool(record) and record["checksum"] != migration.checksum,
+        })
+    return status
+
+
+def check_schema_version(engine: Engine) -> int:
+    """Startup check: one query for the current version, compared with the scripts on disk.
+
+    Returns the database version (0 if the versions table is missing). Logs a warning
+    when the database is behind; it never migrates by itself.
+    """
+    expected = latest_version()
+    try:
+        with engine.connect() as conn:
+            current = conn.execute(text(f"SELECT MAX(version) FROM {VERSIONS_TABLE}")).scalar() or 0
+    except Exception as e:
+        logger.warning("Could not read schema version (%s). Run `python migrate.py upgrade`.", e.__class__.__name__)
+        return 0
+    if current < expected:
+        logger.warning("Database schema is at version %s, expected %s. Run `python migrate.py upgrade`.", current, expected)
+    return current
+
+
+# Helpers for migration scripts -------------------------------------------------
+
+def column_exists(conn: Connection, table: str, column: str) -> bool:
+    return bool(conn.execute(text("""
+        SELECT COUNT(*) FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :t AND COLUMN_NAME = :c
+    """), {"t": table, "c": column}).scalar())
+
+
+def index_exists(conn: Connection, table: str, index_name: str) -> bool:
+    return bool(conn.execute(text("""
+        SELECT COUNT(*) FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :t AND INDEX_NAME = :i
+    """), {"t": table, "i": index_name}).scalar())
+
+
+def table_exists(conn: Connection, table: str) -> bool:
+    return bool(conn.execute(text("""
+        SELECT COUNT(*) FROM information_schema.TABLES
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :t
+    """), {"t": table}).scalar())
+
+
+def create_index_if_missing(conn: Connection, table: str, index_name: str, columns: List[str]) -> bool:
+    if index_exists(conn, table, index_name):
+        return False
+    column_list = ", ".join(f"`{c}`" for c in columns)
+    conn.execute(text(f"CREATE INDEX `{index_name}` ON `{table}` ({column_list})"))
+    return True
+
+
+def add_column_if_missing(conn: Connection, table: str, column: str, definition: str) -> bool:
+    if column_exists(conn, table, column):
+        return False
+    conn.execute(text(f"ALTER TABLE `{table}` ADD COLUMN `{column}` {definition}"))
+    return True
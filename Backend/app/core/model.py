@@ -1,14 +1,15 @@
-from sqlalchemy import Column, Boolean, Integer, String, ForeignKey, event, DateTime, Float, Date, Time, CheckConstraint, Enum, UniqueConstraint
+from sqlalchemy import Column, Boolean, Integer, String, ForeignKey, event, DateTime, Float, Date, Time, CheckConstraint, Enum, UniqueConstraint, Index
+from sqlalchemy.dialects import mysql
 from app.core.database import Base
 from datetime import datetime, timezone, date, time 
 from sqlalchemy.orm import relationship, validates
-import uuid 
+from app.core.uuid_type import UUIDType, uuid7
 import enum
 
 
-# generate uuid 
+# generate uuid (time-ordered, so new rows append to the clustered index)
 def generate_uuid():
-    return str(uuid.uuid4())
+    return str(uuid7())
 
 class OrderStatus(enum.Enum):
     PLACED = "PLACED"
@@ -27,15 +28,16 @@ class ScheduleStatus(str, enum.Enum):
 
 class Users(Base):
     __tablename__ = "users"
-    user_id = Column(String(36), primary_key= True, index = True, default= generate_uuid)
+    user_id = Column(UUIDType, primary_key= True, index = True, default= generate_uuid)
     user_name = Column(String(50), unique=True, nullable= False)
     password_hash = Column(String(255), nullable= False)
     role = Column(String(50), nullable= False)
     created_at = Column(DateTime, default= lambda : datetime.now(timezone.utc))
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")  # bumped to revoke issued tokens
 
 class Customers(Base):
     __tablename__ = "customers"
-    customer_id = Column(String(36), primary_key=True, index = True, default=generate_uuid)
+    customer_id = Column(UUIDType, primary_key=True, index = True, default=generate_uuid)
     customer_user_name = Column(String(50), unique=True, nullable= False)
     customer_name = Column(String(100), nullable= False)
     phone_number = Column(String(30),unique=True, nullable= False)
@@ -49,18 +51,18 @@ class Customers(Base):
 
 class Orders(Base):
     __tablename__ = "orders"
-    order_id = Column(String(36), primary_key=True, index = True, default= generate_uuid)
-    customer_id = Column(String(36), ForeignKey("customers.customer_id"))
+    order_id = Column(UUIDType, primary_key=True, index = True, default= generate_uuid)
+    customer_id = Column(UUIDType, ForeignKey("customers.customer_id"))
     order_date = Column(DateTime, default = lambda : datetime.now(timezone.utc))
     deliver_address = Column(String(200), nullable=False)
     status = Column(Enum(OrderStatus), default=OrderStatus.PLACED, nullable=False)
-    deliver_city_id = Column(String(36), ForeignKey("cities.city_id"), nullable=False)
+    deliver_city_id = Column(UUIDType, ForeignKey("cities.city_id"), nullable=False)
     full_price = Column(Float, nullable=False)
-    warehouse_id = Column(String(36), ForeignKey("stores.store_id"), nullable=True)
+    warehouse_id = Column(UUIDType, ForeignKey("stores.store_id"), nullable=True)
     # the relationship 
     customer = relationship("Customers", back_populates="orders")
     warehouse = relationship("Stores")
-    items = relationship("OrderItems", back_populates="order")
+    items = relationship("OrderItems", back_populates="order", cascade="all, delete-orphan")
     rail_allocations = relationship("RailAllocations", back_populates="order")
     truck_allocations = relationship("TruckAllocations", back_populates="order")
     __table_args__ = (
@@ -68,12 +70,12 @@ class Orders(Base):
     )
 class Stores(Base):
     __tablename__ = "stores"
-    store_id = Column(String(36),primary_key=True,index=True, default= generate_uuid )
+    store_id = Column(UUIDType,primary_key=True,index=True, default= generate_uuid )
     name = Column(String(100), nullable=False)
     telephone_number = Column(String(15), nullable=False)
     address = Column(String(255), nullable=False)
-    contact_person = Column(String(36),ForeignKey("users.user_id"),index=True, default= generate_uuid )
-    station_id = Column(String(36), ForeignKey("railway_stations.station_id"), nullable=False)
+    contact_person = Column(UUIDType,ForeignKey("users.user_id"),index=True, default= generate_uuid )
+    station_id = Column(UUIDType, ForeignKey("railway_stations.station_id"), nullable=False)
     station = relationship("RailwayStations")
     __table_args__ = (
         CheckConstraint("telephone_number  REGEXP '^\\+?[0-9\-]+$'", name="valid_store_phone"),
@@ -82,26 +84,26 @@ class Stores(Base):
 
 class Cities(Base):
     __tablename__ = "cities"
-    city_id = Column(String(36), primary_key=True, index=True, default=generate_uuid)
+    city_id = Column(UUIDType, primary_key=True, index=True, default=generate_uuid)
     city_name = Column(String(100), unique=True, nullable=False)
     province = Column(String(100), nullable=False)
     stations = relationship("RailwayStations", back_populates="city")
 
 class RailwayStations(Base):
     __tablename__ = "railway_stations"
-    station_id = Column(String(36), primary_key=True, index=True, default=generate_uuid)
+    station_id = Column(UUIDType, primary_key=True, index=True, default=generate_uuid)
     station_name = Column(String(100), unique=False, nullable=False)
-    city_id = Column(String(36), ForeignKey("cities.city_id"), nullable=False)
+    city_id = Column(UUIDType, ForeignKey("cities.city_id"), nullable=False)
     # relationship
     city = relationship("Cities", back_populates="stations")
     stores = relationship("Stores", back_populates="station")
 
 class Routes(Base):
     __tablename__ = "routes"
-    route_id = Column(String(36), primary_key=True, index=True, default=generate_uuid)
-    store_id = Column(String(36), ForeignKey("stores.store_id"), nullable=False)
-    start_city_id = Column(String(36), ForeignKey("cities.city_id"), nullable=False)
-    end_city_id = Column(String(36), ForeignKey("cities.city_id"), nullable=False)
+    route_id = Column(UUIDType, primary_key=True, index=True, default=generate_uuid)
+    store_id = Column(UUIDType, ForeignKey("stores.store_id"), nullable=False)
+    start_city_id = Column(UUIDType, ForeignKey("cities.city_id"), nullable=False)
+    end_city_id = Column(UUIDType, ForeignKey("cities.city_id"), nullable=False)
     distance = Column(Integer, nullable=False)
     # relationship
     store = relationship("Stores")
@@ -114,9 +116,9 @@ class Routes(Base):
 
 class RouteOrders(Base):
     __tablename__ = "route_orders"
-    route_order_id = Column(String(36), primary_key=True, index=True, default=generate_uuid)
-    route_id = Column(String(36), ForeignKey("routes.route_id"), nullable=False)
-    order_id = Column(String(36), ForeignKey("orders.order_id"), nullable=False)
+    route_order_id = Column(UUIDType, primary_key=True, index=True, default=generate_uuid)
+    route_id = Column(UUIDType, ForeignKey("routes.route_id"), nullable=False)
+    order_id = Column(UUIDType, ForeignKey("orders.order_id"), nullable=False)
     route = relationship("Routes")
     order = relationship("Orders")
     __table_args__ = (
@@ -126,7 +128,7 @@ class RouteOrders(Base):
 
 class Products(Base):
     __tablename__ = "products"
-    product_type_id = Column(String(36), primary_key=True, index=True, default=generate_uuid)
+    product_type_id = Column(UUIDType, primary_key=True, index=True, default=generate_uuid)
     product_name = Column(String(100), nullable=False)
     space_consumption_rate = Column(Float, nullable=False)
     __table_args__ = (
@@ -135,10 +137,10 @@ class Products(Base):
 
 class OrderItems(Base):
     __tablename__ = "order_items"
-    item_id = Column(String(36), primary_key=True, index=True, default=generate_uuid)
-    order_id = Column(String(36), ForeignKey("orders.order_id"), nullable=False)
-    store_id = Column(String(36), ForeignKey("stores.store_id"), nullable=False)
-    product_type_id = Column(String(36), ForeignKey("products.product_type_id"), nullable=False)
+    item_id = Column(UUIDType, primary_key=True, index=True, default=generate_uuid)
+    order_id = Column(UUIDType, ForeignKey("orders.order_id"), nullable=False)
+    store_id = Column(UUIDType, ForeignKey("stores.store_id"), nullable=True)  # set when the order is assigned to a warehouse
+    product_type_id = Column(UUIDType, ForeignKey("products.product_type_id"), nullable=False)
     quantity = Column(Integer, nullable=False)
     item_price = Column(Float, nullable=False)
     order = relationship("Orders", back_populates="items")
@@ -151,7 +153,7 @@ class OrderItems(Base):
 
 class Trains(Base):
     __tablename__ = "trains"
-    train_id = Column(String(36), primary_key=True, index=True, default=generate_uuid)
+    train_id = Column(UUIDType, primary_key=True, index=True, default=generate_uuid)
     train_name = Column(String(100), nullable=False)
     capacity = Column(Integer, nullable=False)
     __table_args__ = (
@@ -160,10 +162,10 @@ class Trains(Base):
 
 class TrainSchedules(Base):
     __tablename__ = "train_schedules"
-    schedule_id = Column(String(36), primary_key=True, index=True, default=generate_uuid)
-    train_id = Column(String(36), ForeignKey("trains.train_id"), nullable=False)
-    source_station_id = Column(String(36), ForeignKey("railway_stations.station_id"), nullable=False)
-    destination_station_id = Column(String(36), ForeignKey("railway_stations.station_id"), nullable=False)
+    schedule_id = Column(UUIDType, primary_key=True, index=True, default=generate_uuid)
+    train_id = Column(UUIDType, ForeignKey("trains.train_id"), nullable=False)
+    source_station_id = Column(UUIDType, ForeignKey("railway_stations.station_id"), nullable=False)
+    destination_station_id = Column(UUIDType, ForeignKey("railway_stations.station_id"), nullable=False)
     scheduled_date = Column(Date, nullable=False)
     departure_time = Column(Time, nullable=False)
     arrival_time = Column(Time, nullable=False)
@@ -180,9 +182,9 @@ class TrainSchedules(Base):
 
 class RailAllocations(Base):
     __tablename__ = "rail_allocations"
-    allocation_id = Column(String(36), primary_key=True, index=True, default=generate_uuid)
-    order_id = Column(String(36), ForeignKey("orders.order_id"), nullable=False)
-    schedule_id = Column(String(36), ForeignKey("train_schedules.schedule_id"), nullable=False)
+    allocation_id = Column(UUIDType, primary_key=True, index=True, default=generate_uuid)
+    order_id = Column(UUIDType, ForeignKey("orders.order_id"), nullable=False)
+    schedule_id = Column(UUIDType, ForeignKey("train_schedules.schedule_id"), nullable=False)
     shipment_date = Column(Date, nullable=False)
     allocated_space = Column(Float, nullable=False)
     status = Column(Enum(ScheduleStatus), default=ScheduleStatus.PLANNED, nullable=False)
@@ -201,17 +203,17 @@ class RailAllocations(Base):
 
 class Drivers(Base):
     __tablename__ = "drivers"
-    driver_id = Column(String(36), primary_key=True, index=True, default=generate_uuid)
+    driver_id = Column(UUIDType, primary_key=True, index=True, default=generate_uuid)
     name = Column(String(100), nullable=False)
     weekly_working_hours = Column(Integer, default=0, nullable=False)
-    user_id = Column(String(36), ForeignKey("users.user_id"), nullable=False)
+    user_id = Column(UUIDType, ForeignKey("users.user_id"), nullable=False)
     user = relationship("Users")
     __table_args__ = (
         CheckConstraint("weekly_working_hours >= 0 AND weekly_working_hours <= 40", name="driver_hours_limit"),
     )
 class Trucks(Base):
     __tablename__ = "trucks"
-    truck_id = Column(String(36), primary_key=True, index=True, default=generate_uuid)
+    truck_id = Column(UUIDType, primary_key=True, index=True, default=generate_uuid)
     license_num = Column(String(50), unique=True, nullable=False)
     capacity = Column(Integer, nullable=False)
     is_active = Column(Boolean, default=True, nullable=False)
@@ -221,10 +223,10 @@ class Trucks(Base):
 
 class Assistants(Base):
     __tablename__ = "assistants"
-    assistant_id = Column(String(36), primary_key=True, index=True, default=generate_uuid)
+    assistant_id = Column(UUIDType, primary_key=True, index=True, default=generate_uuid)
     name = Column(String(100), nullable=False)
     weekly_working_hours = Column(Integer, default=0, nullable=False)
-    user_id = Column(String(36), ForeignKey("users.user_id"), nullable=False)
+    user_id = Column(UUIDType, ForeignKey("users.user_id"), nullable=False)
     user = relationship("Users")
     __table_args__ = (
         CheckConstraint("weekly_working_hours >= 0 AND weekly_working_hours <= 60", name="assistant_hours_limit"),
@@ -232,11 +234,11 @@ class Assistants(Base):
     
 class TruckSchedules(Base):
     __tablename__ = "truck_schedules"
-    schedule_id = Column(String(36), primary_key=True, index=True, default=generate_uuid)
-    route_id = Column(String(36), ForeignKey("routes.route_id"), nullable=False)
-    truck_id = Column(String(36), ForeignKey("trucks.truck_id"), nullable=False)
-    driver_id = Column(String(36), ForeignKey("drivers.driver_id"), nullable=False)
-    assistant_id = Column(String(36), ForeignKey("assistants.assistant_id"), nullable=False)
+    schedule_id = Column(UUIDType, primary_key=True, index=True, default=generate_uuid)
+    route_id = Column(UUIDType, ForeignKey("routes.route_id"), nullable=False)
+    truck_id = Column(UUIDType, ForeignKey("trucks.truck_id"), nullable=False)
+    driver_id = Column(UUIDType, ForeignKey("drivers.driver_id"), nullable=False)
+    assistant_id = Column(UUIDType, ForeignKey("assistants.assistant_id"), nullable=False)
     scheduled_date = Column(Date, nullable=False)
     departure_time = Column(Time, nullable=False)
     duration = Column(Integer, nullable=False)
@@ -253,9 +255,9 @@ class TruckSchedules(Base):
 
 class TruckAllocations(Base):
     __tablename__ = "truck_allocations"
-    allocation_id = Column(String(36), primary_key=True, index=True, default=generate_uuid)
-    order_id = Column(String(36), ForeignKey("orders.order_id"), nullable=False)
-    schedule_id = Column(String(36), ForeignKey("truck_schedules.schedule_id"), nullable=False)
+    allocation_id = Column(UUIDType, primary_key=True, index=True, default=generate_uuid)
+    order_id = Column(UUIDType, ForeignKey("orders.order_id"), nullable=False)
+    schedule_id = Column(UUIDType, ForeignKey("truck_schedules.schedule_id"), nullable=False)
     shipment_date = Column(Date, nullable=False)
     status = Column(Enum(ScheduleStatus), default=ScheduleStatus.PLANNED, nullable=False)
     order = relationship("Orders", back_populates="truck_allocations")
@@ -266,11 +268,21 @@ class TruckAllocations(Base):
         if value < date.today():
             raise ValueError("Shipment date cannot be in the past.")
         return  value
-    
-
-
-
-
-
 
 
+class OrderStatusHistory(Base):
+    # Append-only log of order status changes, written in batches by app.core.status_history
+    __tablename__ = "order_status_history"
+    history_id = Column(UUIDType, primary_key=True, default=generate_uuid)
+    order_id = Column(UUIDType, nullable=False)  # no foreign key: history outlives deleted orders
+    from_status = Column(Enum(OrderStatus), nullable=True)  # NULL for the order's creation
+    to_status = Column(Enum(OrderStatus), nullable=False)
+    warehouse_id = Column(UUIDType, nullable=True)  # the order's warehouse when the status changed
+    changed_at = Column(DateTime().with_variant(mysql.DATETIME(fsp=6), "mysql"), nullable=False)
+    __table_args__ = (
+        # an order's timeline (dwell = time until its next change)
+        Index("idx_status_history_order", "order_id", "changed_at"),
+        # stage/lead-time reports over a time window
+        Index("idx_status_history_status", "to_status", "changed_at"),
+        Index("idx_status_history_warehouse", "warehouse_id", "changed_at"),
+    )
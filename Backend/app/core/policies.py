@@ -0,0 +1,190 @@
+"""
+Declarative role-based access policies.
+
+Every protected route names its policy in POLICIES instead of repeating a
+check_role_permission block:
+
+    @router.get("/")
+    def get_all_Orders(db: db_dependency, current_user: dict = Depends(require_policy("orders.list"))):
+        query = apply_scope(db.query(model.Orders), "orders.list", current_user, model.Orders.warehouse_id)
+
+A policy lists the roles allowed in addition to SystemAdmin (who is always allowed,
+as in check_role_permission), the 403 detail, which principal it applies to (staff
+users or customers) and an optional row scope. The table is compiled once at import
+into frozensets, and require_policy() looks its policy up when the router module is
+imported. A typo in a policy name therefore fails at startup, not on the first
+request.
+
+Scopes are pushed into the route's query as SQL:
+  "warehouse"  StoreManagers only see rows whose warehouse column is one of the stores
+               they manage (an IN (subquery) filter, so the list is one round trip)
+"""
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Tuple
+
+from fastapi import Depends, HTTPException, status
+from sqlalchemy import select
+
+import app.core.model as model
+from app.core.auth import get_current_user, get_current_customer
+
+SYSTEM_ADMIN = "SystemAdmin"
+ROLES = frozenset({SYSTEM_ADMIN, "Management", "StoreManager", "WarehouseStaff", "Driver", "Assistant", "Customer"})
+SCOPES = frozenset({"warehouse"})
+
+MANAGEMENT = ("Management",)
+STORE_MANAGEMENT = ("StoreManager", "Management")
+LOGISTICS = ("Assistant", "Management")
+WAREHOUSE = ("WarehouseStaff", "Management")
+
+
+@dataclass(frozen=True)
+class Policy:
+    roles: Tuple[str, ...]
+    detail: Optional[str] = None  # defaults to "<roles> or SystemAdmin role required"
+    principal: str = "user"  # "user" (staff token) or "customer"
+    scope: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class CompiledPolicy:
+    name: str
+    allowed: frozenset
+    detail: str
+    principal: str
+    scope: Optional[str]
+
+    def allows(self, role: Optional[str]) -> bool:
+        return role in self.allowed
+
+
+POLICIES: Dict[str, Policy] = {
+    # allocations
+    "allocations.list": Policy(LOGISTICS, "You cannot access Routes"),
+    "allocations.read": Policy(LOGISTICS, "You cannot access Routes"),
+    "allocations.create": Policy(LOGISTICS, "You cannot access Routes"),
+    "allocations.update": Policy(LOGISTICS, "You cannot access Allocations"),
+    "allocations.delete": Policy(LOGISTICS, "You cannot access Routes"),
+    "allocations.capacity": Policy(LOGISTICS, "You cannot access capacity information"),
+    "allocations.schedule_orders": Policy(LOGISTICS, "You cannot access allocations"),
+    # assistants
+    "assistants.read": Policy(MANAGEMENT),
+    "assistants.write": Policy(MANAGEMENT),
+    # cities
+    "cities.read": Policy(STORE_MANAGEMENT),
+    # customers (staff-side management of customer accounts)
+    "customers.read": Policy(MANAGEMENT),
+    "customers.write": Policy(MANAGEMENT),
+    # drivers
+    "drivers.read": Policy(LOGISTICS),
+    "drivers.update": Policy(LOGISTICS),
+    "drivers.manage": Policy(MANAGEMENT),
+    # orders
+    "orders.history": Policy(STORE_MANAGEMENT),
+    "orders.list": Policy(STORE_MANAGEMENT, scope="warehouse"),
+    "orders.export": Policy(STORE_MANAGEMENT, scope="warehouse"),
+    "orders.read": Policy(STORE_MANAGEMENT),
+    "orders.space": Policy(STORE_MANAGEMENT, "Insufficient permissions"),
+    "orders.write": Policy(MANAGEMENT),
+    "orders.import": Policy(MANAGEMENT),
+    "orders.transition": Policy(("StoreManager", "Assistant", "Management"), scope="warehouse"),
+    "orders.last_mile": Policy(MANAGEMENT, "Access restricted to Customers, Management, or SystemAdmin"),
+    "orders.place": Policy(("Customer",), "You do not have permission to create an order", principal="customer"),
+    # products
+    "products.read": Policy(("Management", "StoreManager")),
+    "products.create": Policy(("Management", "StoreManager")),
+    "products.write": Policy(MANAGEMENT),
+    # railway stations
+    "railway_stations.read": Policy(("Management", "Assistant")),
+    # reports
+    "reports.read": Policy(MANAGEMENT),
+    # routes
+    "routes.read": Policy(LOGISTICS),
+    "routes.write": Policy(LOGISTICS),
+    # stores
+    "stores.read": Policy(WAREHOUSE),
+    "stores.write": Policy(WAREHOUSE),
+    # train schedules
+    "train_schedules.list": Policy(STORE_MANAGEMENT),
+    "train_schedules.read": Policy(("StoreManager", "Management", "Assistant")),
+    "train_schedules.create": Policy(STORE_MANAGEMENT),
+    "train_schedules.update": Policy(MANAGEMENT),
+    "train_schedules.delete": Policy(STORE_MANAGEMENT, "You do not have permission to delete schedules"),
+    # trains
+    "trains.read": Policy(WAREHOUSE),
+    # truck schedules
+    "truck_schedules.read": Policy(("Assistant", "Management", "Driver", "WarehouseStaff")),
+    "truck_schedules.create": Policy(LOGISTICS),
+    "truck_schedules.update": Policy(LOGISTICS, "Only Management, Assistant or SystemAdmin can update truck schedules"),
+    "truck_schedules.delete": Policy(LOGISTICS, "Only Management, Assistant or SystemAdmin can delete truck schedules"),
+    # trucks
+    "trucks.read": Policy(("Assistant", "Management", "StoreManager", "Driver"), "You don't have permission to view trucks"),
+    "trucks.write": Policy(LOGISTICS),
+}
+
+
+def compile_policies(policies: Dict[str, Policy]) -> Dict[str, CompiledPolicy]:
+    compiled = {}
+    for name, policy in policies.items():
+        unknown = set(policy.roles) - ROLES
+        if unknown:
+            raise ValueError(f"Policy {name} names unknown roles: {sorted(unknown)}")
+        if policy.scope is not None and policy.scope not in SCOPES:
+            raise ValueError(f"Policy {name} has unknown scope {policy.scope!r}")
+        if policy.principal not in ("user", "customer"):
+            raise ValueError(f"Policy {name} has unknown principal {policy.principal!r}")
+        roles = [role for role in policy.roles if role != SYSTEM_ADMIN]
+        detail = policy.detail or f"{', '.join(roles)} or {SYSTEM_ADMIN} role required"
+        compiled[name] = CompiledPolicy(name, frozenset(roles) | {SYSTEM_ADMIN}, detail, policy.principal, policy.scope)
+    return compiled
+
+
+COMPILED_POLICIES = compile_policies(POLICIES)
+
+
+def get_policy(name: str) -> CompiledPolicy:
+    try:
+        return COMPILED_POLICIES[name]
+    except KeyError:
+        raise KeyError(f"No access policy named {name!r}") from None
+
+
+def authorize(name: str, current_user: Dict) -> Dict:
+    """Raise 403 unless the principal's role satisfies policy `name`"""
+    policy = get_policy(name)
+    if not policy.allows(current_user.get("role")):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=policy.detail)
+    return current_user
+
+
+def require_policy(name: str) -> Callable:
+    """Route dependency: resolves the principal and enforces policy `name`; returns the principal"""
+    policy = get_policy(name)
+    principal = get_current_customer if policy.principal == "customer" else get_current_user
+
+    async def dependency(current_user: Dict = Depends(principal)) -> Dict:
+        if not policy.allows(current_user.get("role")):
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=policy.detail)
+        return current_user
+
+    dependency.__name__ = f"require_policy_{name.replace('.', '_')}"
+    return dependency
+
+
+def managed_store_ids(user_id: str):
+    """Subquery of the store ids a StoreManager is contact person for"""
+    return select(model.Stores.store_id).where(model.Stores.contact_person == user_id)
+
+
+def scope_filter(name: str, current_user: Dict, column):
+    """SQL filter restricting `column` to the principal's scope under policy `name`, or None"""
+    policy = get_policy(name)
+    if policy.scope == "warehouse" and current_user.get("role") == "StoreManager":
+        return column.in_(managed_store_ids(current_user.get("user_id")))
+    return None
+
+
+def apply_scope(query, name: str, current_user: Dict, column):
+    """query.filter(scope_filter(...)) when the policy scopes this principal; works for Query and Select"""
+    condition = scope_filter(name, current_user, column)
+    return query if condition is None else query.filter(condition)
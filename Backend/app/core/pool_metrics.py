@@ -0,0 +1,92 @@
+"""
+Connection pool instrumentation.
+
+Checkout/checkin/connect/invalidate counts come from SQLAlchemy pool events.
+Checkout wait time is measured by a thin QueuePool subclass, because no pool
+event fires before a caller starts waiting for a connection.
+"""
+import time
+from typing import Dict
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+
+from app.core.metrics import Counters, Histogram
+
+# Checkout wait buckets in milliseconds
+WAIT_BUCKETS_MS = [1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+
+class PoolMetrics:
+    def __init__(self, name: str):
+        self.name = name
+        self.counters = Counters("checkouts", "checkins", "connects", "invalidations", "timeouts")
+        self.checkout_wait_ms = Histogram(WAIT_BUCKETS_MS)
+
+
+# name -> metrics, filled by instrumented_pool_class()
+POOL_METRICS: Dict[str, PoolMetrics] = {}
+
+
+class _TimedCheckoutMixin:
+    metrics: PoolMetrics = None
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.counters.incr("timeouts")
+            raise
+        finally:
+            self.metrics.checkout_wait_ms.observe((time.perf_counter() - start) * 1000)
+
+
+def instrumented_pool_class(name: str, async_pool: bool = False):
+    """Return a QueuePool subclass bound to the metrics registered under `name`.
+
+    The metrics live on the class so they survive pool.recreate() (engine.dispose()).
+    """
+    metrics = POOL_METRICS.setdefault(name, PoolMetrics(name))
+    base = AsyncAdaptedQueuePool if async_pool else QueuePool
+    return type(f"Instrumented{base.__name__}", (_TimedCheckoutMixin, base), {"metrics": metrics})
+
+
+def register_pool_events(engine: Engine, name: str) -> None:
+    """Count pool lifecycle events for the given (sync) engine"""
+    metrics = POOL_METRICS.setdefault(name, PoolMetrics(name))
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        metrics.counters.incr("connects")
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        metrics.counters.incr("checkouts")
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        metrics.counters.incr("checkins")
+
+    @event.listens_for(engine, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        metrics.counters.incr("invalidations")
+
+
+def pool_status(engine: Engine, name: str) -> Dict:
+    """Live gauges from the pool plus the event-derived counters and wait histogram"""
+    pool = engine.pool
+    metrics = POOL_METRICS.get(name)
+    status = {
+        "pool_class": type(pool).__name__,
+        "size": pool.size() if hasattr(pool, "size") else None,
+        "checked_out": pool.checkedout() if hasattr(pool, "checkedout") else None,
+        "checked_in": pool.checkedin() if hasattr(pool, "checkedin") else None,
+        "overflow": pool.overflow() if hasattr(pool, "overflow") else None,
+    }
+    if metrics:
+        status["events"] = metrics.counters.snapshot()
+        status["checkout_wait_ms"] = metrics.checkout_wait_ms.snapshot()
+    return status
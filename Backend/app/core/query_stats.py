@@ -0,0 +1,141 @@
+"""
+Per-request SQL instrumentation.
+
+Every statement executed on any engine is counted and timed against the request
+that issued it (tracked with a contextvar set by the HTTP middleware). At the end
+of the request:
+  - in DEBUG mode, X-DB-Queries / X-DB-Time-ms response headers are added
+  - statement shapes repeated DB_N_PLUS_ONE_THRESHOLD+ times are logged as probable N+1 patterns
+
+Setting DB_STATEMENT_CAPTURE_FILE additionally appends every statement, with its
+parameters and route, to that file as NDJSON for scripts/index_advisor.py. Bound
+values are written as-is, so only enable it against non-production data.
+"""
+import os
+import re
+import json
+import time
+import logging
+import threading
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger("kandypack.db")
+
+DEBUG = os.getenv("DEBUG", "True").lower() == "true"
+N_PLUS_ONE_THRESHOLD = int(os.getenv("DB_N_PLUS_ONE_THRESHOLD", "5"))
+STATEMENT_CAPTURE_FILE = os.getenv("DB_STATEMENT_CAPTURE_FILE")
+
+_WHITESPACE = re.compile(r"\s+")
+# IN lists expand to a different number of placeholders per call; collapse them to one shape
+_PLACEHOLDER_LIST = re.compile(r"\((?:\s*(?:%s|%\(\w+\)s|\?)\s*,)+\s*(?:%s|%\(\w+\)s|\?)\s*\)")
+_STRING_LITERAL = re.compile(r"'(?:[^'\\]|\\.)*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+
+
+def normalize_sql(statement: str) -> str:
+    """Reduce a statement to its shape: collapse whitespace, IN lists and inline literals"""
+    shape = _WHITESPACE.sub(" ", statement).strip()
+    shape = _STRING_LITERAL.sub("?", shape)
+    shape = _NUMBER_LITERAL.sub("?", shape)
+    return _PLACEHOLDER_LIST.sub("(...)", shape)
+
+
+class RequestQueryStats:
+    def __init__(self, method: str, path: str):
+        self.method = method
+        self.path = path
+        self.count = 0
+        self.time_ms = 0.0
+        self.shapes = Counter()
+
+    @property
+    def route(self) -> str:
+        return f"{self.method} {self.path}"
+
+    def record(self, statement: str, elapsed_ms: float) -> None:
+        self.count += 1
+        self.time_ms += elapsed_ms
+        self.shapes[normalize_sql(statement)] += 1
+
+    def repeated_shapes(self, threshold: int = N_PLUS_ONE_THRESHOLD):
+        return [(shape, n) for shape, n in self.shapes.most_common() if n >= threshold]
+
+
+_current_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar("request_query_stats", default=None)
+
+
+def current_stats() -> Optional[RequestQueryStats]:
+    return _current_stats.get()
+
+
+_capture_lock = threading.Lock()
+
+
+def _encode_parameter(value):
+    if isinstance(value, (bytes, bytearray)):
+        return {"__hex__": bytes(value).hex()}
+    return str(value)
+
+
+def _capture_statement(statement: str, parameters, stats: Optional[RequestQueryStats]) -> None:
+    line = json.dumps({
+        "statement": statement,
+        "parameters": parameters,
+        "route": stats.route if stats else None,
+    }, default=_encode_parameter)
+    with _capture_lock:
+        with open(STATEMENT_CAPTURE_FILE, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start_times = conn.info.get("query_start_time")
+    if not start_times:
+        return
+    elapsed_ms = (time.perf_counter() - start_times.pop()) * 1000
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(statement, elapsed_ms)
+    if STATEMENT_CAPTURE_FILE and not executemany and not statement.lstrip().upper().startswith("EXPLAIN"):
+        _capture_statement(statement, parameters, stats)
+
+
+async def track_request_queries(request: Request, call_next):
+    """HTTP middleware: attach per-request query stats and report them when the response is ready"""
+    stats = RequestQueryStats(request.method, request.url.path)
+    token = _current_stats.set(stats)
+    try:
+        response = await call_next(request)
+    finally:
+        _current_stats.reset(token)
+
+    route = request.scope.get("route")
+    if route is not None and hasattr(route, "path"):
+        stats.path = route.path
+
+    if DEBUG:
+        response.headers["X-DB-Queries"] = str(stats.count)
+        response.headers["X-DB-Time-ms"] = f"{stats.time_ms:.2f}"
+
+    repeated = stats.repeated_shapes()
+    if repeated:
+        logger.warning(json.dumps({
+            "event": "probable_n_plus_one",
+            "route": stats.route,
+            "total_queries": stats.count,
+            "db_time_ms": round(stats.time_ms, 2),
+            "repeated": [{"statement": shape, "count": n} for shape, n in repeated],
+        }))
+    return response
@@ -0,0 +1,174 @@
+"""
+In-process cache of small, rarely changing reference tables.
+
+Write paths validate foreign keys (route, truck, driver, assistant, city, station,
+product) against these tables on every request. The cache keeps a snapshot of each
+table keyed by primary key so those checks are served from memory:
+  - warmed at startup (see the lifespan in app/main.py)
+  - invalidated by the routers that write to the table
+  - reloaded after REFERENCE_CACHE_TTL seconds, so writes made by other worker
+    processes show up
+A key that isn't cached falls back to the database (and is cached if found), so a
+row inserted by another worker is never rejected.
+
+Cached rows are plain dicts of column values, safe to share between requests.
+"""
+import os
+import time
+import threading
+from typing import Dict, Optional
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session
+
+import app.core.model as model
+from app.core.metrics import Counters
+
+REFERENCE_CACHE_TTL = float(os.getenv("REFERENCE_CACHE_TTL", "300"))
+
+REFERENCE_TABLES = {
+    "cities": model.Cities,
+    "railway_stations": model.RailwayStations,
+    "trains": model.Trains,
+    "trucks": model.Trucks,
+    "routes": model.Routes,
+    "products": model.Products,
+    "drivers": model.Drivers,
+    "assistants": model.Assistants,
+}
+
+
+def _snapshot(obj) -> Dict:
+    return {attr.key: getattr(obj, attr.key) for attr in inspect(obj).mapper.column_attrs}
+
+
+def _primary_key(model_cls):
+    return inspect(model_cls).primary_key[0]
+
+
+class ReferenceCache:
+    def __init__(self, tables: Dict, ttl: float):
+        self.tables = tables
+        self.ttl = ttl
+        self._rows: Dict[str, Dict[str, Dict]] = {}
+        self._loaded_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.counters = {name: Counters("hits", "misses", "loads", "invalidations") for name in tables}
+
+    def _load(self, db: Session, name: str) -> Dict[str, Dict]:
+        model_cls = self.tables[name]
+        pk = _primary_key(model_cls).key
+        rows = {}
+        for obj in db.query(model_cls).all():
+            row = _snapshot(obj)
+            rows[row[pk]] = row
+        with self._lock:
+            self._rows[name] = rows
+            self._loaded_at[name] = time.monotonic()
+        self.counters[name].incr("loads")
+        return rows
+
+    def _table(self, db: Session, name: str) -> Dict[str, Dict]:
+        with self._lock:
+            rows = self._rows.get(name)
+            loaded_at = self._loaded_at.get(name, 0)
+        if rows is None or (self.ttl > 0 and time.monotonic() - loaded_at > self.ttl):
+            rows = self._load(db, name)
+        return rows
+
+    def warm(self, db: Session) -> None:
+        for name in self.tables:
+            self._load(db, name)
+
+    def get(self, db: Session, name: str, key) -> Optional[Dict]:
+        """Row for primary key `key`, or None if it doesn't exist"""
+        if key is None:
+            return None
+        key = str(key)
+        rows = self._table(db, name)
+        row = rows.get(key)
+        if row is not None:
+            self.counters[name].incr("hits")
+            return row
+
+        self.counters[name].incr("misses")
+        obj = db.get(self.tables[name], key)
+        if obj is None:
+            return None
+        row = _snapshot(obj)
+        with self._lock:
+            rows[key] = row
+        return row
+
+    def exists(self, db: Session, name: str, key) -> bool:
+        return self.get(db, name, key) is not None
+
+    def get_many(self, db: Session, name: str, keys) -> Dict[str, Dict]:
+        """Rows for the primary keys in `keys` that exist, keyed by primary key.
+
+        Keys missing from the cache are looked up together in one IN query.
+        """
+        rows = self._table(db, name)
+        found, misses = {}, set()
+        for key in {str(key) for key in keys if key is not None}:
+            row = rows.get(key)
+            if row is None:
+                misses.add(key)
+            else:
+                found[key] = row
+        self.counters[name].incr("hits", len(found))
+        if not misses:
+            return found
+
+        self.counters[name].incr("misses", len(misses))
+        model_cls = self.tables[name]
+        pk = _primary_key(model_cls)
+        loaded = {}
+        for obj in db.query(model_cls).filter(pk.in_(misses)).all():
+            row = _snapshot(obj)
+            loaded[str(row[pk.key])] = row
+        with self._lock:
+            rows.update(loaded)
+        found.update(loaded)
+        return found
+
+    def find(self, db: Session, name: str, column: str, value) -> Optional[Dict]:
+        """First row whose `column` equals `value` (e.g. a station in a city)"""
+        rows = self._table(db, name)
+        for row in rows.values():
+            if row.get(column) == value:
+                self.counters[name].incr("hits")
+                return row
+
+        self.counters[name].incr("misses")
+        model_cls = self.tables[name]
+        obj = db.query(model_cls).filter(getattr(model_cls, column) == value).first()
+        if obj is None:
+            return None
+        row = _snapshot(obj)
+        with self._lock:
+            rows[row[_primary_key(model_cls).key]] = row
+        return row
+
+    def invalidate(self, name: str) -> None:
+        with self._lock:
+            self._rows.pop(name, None)
+            self._loaded_at.pop(name, None)
+        self.counters[name].incr("invalidations")
+
+    def stats(self) -> Dict:
+        with self._lock:
+            sizes = {name: len(rows) for name, rows in self._rows.items()}
+        stats = {}
+        for name, counters in self.counters.items():
+            snapshot = counters.snapshot()
+            lookups = snapshot["hits"] + snapshot["misses"]
+            stats[name] = {
+                **snapshot,
+                "rows": sizes.get(name),
+                "hit_ratio": round(snapshot["hits"] / lookups, 4) if lookups else None,
+            }
+        return {"ttl_seconds": self.ttl, "tables": stats}
+
+
+reference_cache = ReferenceCache(REFERENCE_TABLES, REFERENCE_CACHE_TTL)
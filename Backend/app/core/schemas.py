@@ -1,14 +1,10 @@
 from pydantic import BaseModel, ConfigDict
 from typing import Annotated
-from app.core.database import engine
 import app.core.model as model
 from datetime import datetime, timezone, date, time
 import enum
 
 
-
-model.Base.metadata.create_all(bind= engine)
-
 class OrderStatus(enum.Enum):
     PLACED = "PLACED"
     SCHEDULED_RAIL = "SCHEDULED_RAIL"
@@ -154,7 +150,7 @@ class ProductResponse(ProductBase):
 class order_itemsBase(BaseModel):
     item_id : str 
     order_id : str 
-    store_id : str 
+    store_id : str | None = None
     product_type_id : str 
     quantity : int 
     item_price: float
@@ -468,4 +464,21 @@ class CreateOrderWithItems(BaseModel):
     items: list[OrderItemCreate]
 
     model_config = {"from_attributes": True}
+
+
+# One order in a bulk import file (POST /orders/import)
+class ImportOrder(CreateOrderWithItems):
+    order_ref: str | None = None
+    customer_id: str
+
+
+# POST /orders/bulk-status: move every order in one scope to `status`
+class BulkOrderStatusUpdate(BaseModel):
+    status: OrderStatus
+    from_statuses: list[OrderStatus] | None = None  # only move orders currently in one of these
+    order_ids: list[str] | None = None
+    warehouse_id: str | None = None
+    route_id: str | None = None
+    truck_schedule_id: str | None = None
+    train_schedule_id: str | None = None
     
\ No newline at end of file
@@ -0,0 +1,141 @@
+"""
+Slow statement log with EXPLAIN capture.
+
+Statements slower than DB_SLOW_QUERY_MS are logged (normalized SQL, parameter
+shapes, originating route) and kept in an in-memory ring buffer of the last
+DB_SLOW_QUERY_LOG_SIZE entries, viewable through GET /admin/db/slow-queries.
+The EXPLAIN plan is captured on a background thread so the request that ran the
+slow statement is not delayed further.
+"""
+import os
+import json
+import time
+import logging
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.query_stats import normalize_sql, current_stats
+
+logger = logging.getLogger("kandypack.db")
+
+SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", "200"))
+SLOW_QUERY_LOG_SIZE = int(os.getenv("DB_SLOW_QUERY_LOG_SIZE", "100"))
+SLOW_QUERY_EXPLAIN = os.getenv("DB_SLOW_QUERY_EXPLAIN", "True").lower() == "true"
+
+# Don't let a burst of slow statements queue unbounded EXPLAIN work
+MAX_PENDING_EXPLAINS = 20
+_EXPLAINABLE = ("SELECT", "UPDATE", "DELETE")
+# execution option marking our own EXPLAIN statements so they are never logged themselves
+_EXPLAIN_OPTION = "slow_query_explain"
+
+_entries = deque(maxlen=SLOW_QUERY_LOG_SIZE)
+_entries_lock = threading.Lock()
+_explain_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="slow-query-explain")
+_pending_explains = 0
+_pending_lock = threading.Lock()
+
+
+def parameter_shape(parameters, executemany: bool = False):
+    """Describe bound parameters by type only, never by value"""
+    if executemany and parameters:
+        return {"executemany": len(parameters), "row": parameter_shape(parameters[0])}
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+
+def _json_safe(value):
+    if value is None or isinstance(value, (int, float, str, bool)):
+        return value
+    if isinstance(value, bytes):
+        return value.decode("utf-8", errors="replace")
+    return str(value)
+
+
+def _capture_explain(explain_engine: Engine, entry: Dict, statement: str, parameters) -> None:
+    global _pending_explains
+    try:
+        with explain_engine.connect() as conn:
+            conn = conn.execution_options(**{_EXPLAIN_OPTION: True})
+            rows = conn.exec_driver_sql("EXPLAIN " + statement, parameters).mappings().all()
+            entry["explain"] = [{key: _json_safe(value) for key, value in row.items()} for row in rows]
+    except Exception as e:
+        entry["explain_error"] = str(e)
+    finally:
+        with _pending_lock:
+            _pending_explains -= 1
+
+
+def _schedule_explain(explain_engine: Engine, entry: Dict, statement: str, parameters) -> None:
+    global _pending_explains
+    with _pending_lock:
+        if _pending_explains >= MAX_PENDING_EXPLAINS:
+            entry["explain_error"] = "skipped: too many pending EXPLAINs"
+            return
+        _pending_explains += 1
+    _explain_executor.submit(_capture_explain, explain_engine, entry, statement, parameters)
+
+
+def install_slow_query_log(engine: Engine, name: str, explain_engine: Optional[Engine] = None) -> None:
+    """Log statements on `engine` slower than the threshold.
+
+    `explain_engine` must be a sync engine on the same database; it runs the EXPLAIN.
+    For async engines pass the async engine's `.sync_engine` as `engine` and the
+    matching sync engine as `explain_engine`.
+    """
+    if SLOW_QUERY_MS <= 0:
+        return
+    explain_engine = explain_engine or engine
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("slow_query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        start_times = conn.info.get("slow_query_start_time")
+        if not start_times:
+            return
+        elapsed_ms = (time.perf_counter() - start_times.pop()) * 1000
+        if elapsed_ms < SLOW_QUERY_MS:
+            return
+        if context is not None and context.execution_options.get(_EXPLAIN_OPTION):
+            return
+
+        stats = current_stats()
+        entry = {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "engine": name,
+            "duration_ms": round(elapsed_ms, 2),
+            "statement": normalize_sql(statement),
+            "parameters": parameter_shape(parameters, executemany),
+            "route": stats.route if stats else None,
+            "rowcount": cursor.rowcount,
+            "explain": None,
+        }
+        with _entries_lock:
+            _entries.append(entry)
+        logger.warning(json.dumps({"event": "slow_query", **entry}))
+
+        if SLOW_QUERY_EXPLAIN and not executemany and statement.lstrip().upper().startswith(_EXPLAINABLE):
+            _schedule_explain(explain_engine, entry, statement, parameters)
+
+
+def recent_slow_queries(limit: int = SLOW_QUERY_LOG_SIZE) -> List[Dict]:
+    """Newest first"""
+    with _entries_lock:
+        entries = list(_entries)
+    return list(reversed(entries))[:limit]
+
+
+def clear_slow_queries() -> None:
+    with _entries_lock:
+        _entries.clear()
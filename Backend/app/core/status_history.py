@@ -0,0 +1,153 @@
+"""
+Order status history, written in the background.
+
+Every order status change is appended to order_status_history (from_status,
+to_status, the order's warehouse at the time, changed_at). The code that changes a
+status only calls
+
+    record_status_change(db, order_id, previous_status, new_status, warehouse_id)
+
+which adds the event to the session (db.info) without any SQL. When the session
+commits, its events are handed to the process-wide StatusHistoryWriter; when it rolls
+back they are dropped, so the history only ever holds committed changes and a
+transaction retried by run_in_transaction records its events once. The writer's
+thread inserts queued events every STATUS_HISTORY_FLUSH_SECONDS (sooner once
+STATUS_HISTORY_BATCH_SIZE are waiting) with one multi-row INSERT per batch on its
+own session, so the request that changed the status never waits for the history.
+
+The queue is per process and holds at most STATUS_HISTORY_MAX_PENDING events. If
+the database rejects a batch it is retried on the next flush; once the queue is full
+new events are dropped and counted (see GET /admin/status-history). Queued events are
+flushed at shutdown (lifespan in app/main.py); a worker that is killed loses them.
+History therefore trails the orders table by up to a flush interval.
+"""
+import os
+import logging
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+import app.core.model as model
+from app.core.database import Session_local
+from app.core.metrics import Counters
+from app.utils.bulk import bulk_insert
+
+logger = logging.getLogger("kandypack.db")
+
+STATUS_HISTORY = os.getenv("STATUS_HISTORY", "True").lower() == "true"
+STATUS_HISTORY_BATCH_SIZE = int(os.getenv("STATUS_HISTORY_BATCH_SIZE", "500"))
+STATUS_HISTORY_FLUSH_SECONDS = float(os.getenv("STATUS_HISTORY_FLUSH_SECONDS", "1"))
+STATUS_HISTORY_MAX_PENDING = int(os.getenv("STATUS_HISTORY_MAX_PENDING", "100000"))
+
+_SESSION_KEY = "status_history_events"
+
+
+def _status(value) -> Optional[model.OrderStatus]:
+    return None if value is None else model.OrderStatus(getattr(value, "value", value))
+
+
+class StatusHistoryWriter:
+    def __init__(self, session_factory=Session_local, enabled: bool = STATUS_HISTORY,
+                 batch_size: int = STATUS_HISTORY_BATCH_SIZE,
+                 flush_seconds: float = STATUS_HISTORY_FLUSH_SECONDS,
+                 max_pending: int = STATUS_HISTORY_MAX_PENDING):
+        self.session_factory = session_factory
+        self.enabled = enabled
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.max_pending = max_pending
+        self._pending = deque()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # one flush at a time (writer thread or shutdown)
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.counters = Counters("queued", "written", "batches", "dropped", "errors")
+
+    def enqueue(self, events: List[Dict]) -> None:
+        with self._lock:
+            accepted = events[:max(0, self.max_pending - len(self._pending))]
+            self._pending.extend(accepted)
+            pending = len(self._pending)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="status-history-writer", daemon=True)
+                self._thread.start()
+        self.counters.incr("queued", len(accepted))
+        if len(accepted) < len(events):
+            self.counters.incr("dropped", len(events) - len(accepted))
+            logger.warning(f"Status history queue full, dropped {len(events) - len(accepted)} events")
+        if pending >= self.batch_size:
+            self._wake.set()
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.flush_seconds)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self) -> int:
+        """Write every queued event; returns how many were written"""
+        written = 0
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    batch = [self._pending.popleft() for _ in range(min(self.batch_size, len(self._pending)))]
+                if not batch:
+                    return written
+                try:
+                    with self.session_factory() as db:
+                        bulk_insert(db, model.OrderStatusHistory, batch)
+                        db.commit()
+                except Exception:
+                    logger.exception("Writing order status history failed, retrying on the next flush")
+                    self.counters.incr("errors")
+                    with self._lock:
+                        self._pending.extendleft(reversed(batch))
+                    return written
+                written += len(batch)
+                self.counters.incr("written", len(batch))
+                self.counters.incr("batches")
+
+    def close(self) -> None:
+        self.flush()
+
+    def stats(self) -> Dict:
+        return {
+            **self.counters.snapshot(),
+            "enabled": self.enabled,
+            "pending": len(self._pending),
+            "batch_size": self.batch_size,
+            "flush_seconds": self.flush_seconds,
+            "max_pending": self.max_pending,
+        }
+
+
+status_history = StatusHistoryWriter()
+
+
+def record_status_change(db: Session, order_id, from_status, to_status, warehouse_id=None) -> None:
+    """Queue a status change on `db`; it is written once the session commits"""
+    if not status_history.enabled or _status(from_status) == _status(to_status):
+        return
+    db.info.setdefault(_SESSION_KEY, []).append({
+        "order_id": str(order_id),
+        "from_status": _status(from_status),
+        "to_status": _status(to_status),
+        "warehouse_id": str(warehouse_id) if warehouse_id else None,
+        "changed_at": datetime.now(timezone.utc).replace(tzinfo=None),
+    })
+
+
+@event.listens_for(Session, "after_commit")
+def _hand_over_events(session: Session) -> None:
+    events = session.info.pop(_SESSION_KEY, None)
+    if events:
+        status_history.enqueue(events)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _drop_events(session: Session, previous_transaction) -> None:
+    session.info.pop(_SESSION_KEY, None)
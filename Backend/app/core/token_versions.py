@@ -0,0 +1,108 @@
+"""
+Per-user token versions for claims-carrying access tokens.
+
+With AUTH_CLAIMS_TOKENS enabled, access tokens carry the principal (role, warehouse)
+and the user's `token_version` as the `ver` claim. get_current_user trusts those
+claims, so the only per-request check left is the token's version against the user's
+current one. Revoking a user's tokens means bumping users.token_version.
+
+The versions of all users (a small table) are held in memory:
+  - reloaded in one query every TOKEN_VERSION_TTL seconds, so bumps made by other
+    worker processes take effect within that window
+  - updated immediately for bumps made in this process (see bump_token_version)
+  - reloaded early when a token carries a version newer than the cached one (the
+    user logged in through another worker after a bump)
+"""
+import os
+import time
+import threading
+from typing import Dict, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+import app.core.model as model
+from app.core.metrics import Counters
+
+TOKEN_VERSION_TTL = float(os.getenv("TOKEN_VERSION_TTL", "30"))
+
+
+class TokenVersionMap:
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._versions: Dict[str, int] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self.counters = Counters("checks", "accepted", "rejected", "reloads")
+
+    def _stale(self) -> bool:
+        return self._loaded_at is None or time.monotonic() - self._loaded_at > self.ttl
+
+    async def _reload(self, db: AsyncSession) -> None:
+        result = await db.execute(select(model.Users.user_id, model.Users.token_version))
+        versions = {user_id: version or 0 for user_id, version in result.all()}
+        with self._lock:
+            self._versions = versions
+            self._loaded_at = time.monotonic()
+        self.counters.incr("reloads")
+
+    async def is_current(self, db: AsyncSession, user_id: str, version) -> bool:
+        """True if `version` is the user's current token version (False for unknown users)"""
+        self.counters.incr("checks")
+        reloaded = False
+        if self._stale():
+            await self._reload(db)
+            reloaded = True
+        current = self._versions.get(user_id)
+        if not reloaded and (current is None or version > current):
+            await self._reload(db)
+            current = self._versions.get(user_id)
+        accepted = current is not None and version == current
+        self.counters.incr("accepted" if accepted else "rejected")
+        return accepted
+
+    def set(self, user_id: str, version: int) -> None:
+        with self._lock:
+            self._versions[user_id] = version
+
+    def discard(self, user_id: str) -> None:
+        with self._lock:
+            self._versions.pop(user_id, None)
+
+    def expire(self) -> None:
+        """Force a reload on the next check"""
+        with self._lock:
+            self._loaded_at = None
+
+    def stats(self) -> Dict:
+        with self._lock:
+            size = len(self._versions)
+            age = None if self._loaded_at is None else round(time.monotonic() - self._loaded_at, 1)
+        return {**self.counters.snapshot(), "users": size, "age_seconds": age, "ttl_seconds": self.ttl}
+
+
+token_versions = TokenVersionMap(TOKEN_VERSION_TTL)
+
+
+def bump_token_version(user: model.Users) -> int:
+    """Increment the user's token version, revoking every token issued so far.
+
+    Returns the new version; publish it with token_versions.set() once committed.
+    """
+    user.token_version = (user.token_version or 0) + 1
+    return user.token_version
+
+
+def bump_token_versions(db: Session, user_ids) -> Dict[str, int]:
+    """bump_token_version for each existing user in `user_ids`; returns {user_id: new version}"""
+    user_ids = [user_id for user_id in set(user_ids) if user_id]
+    if not user_ids:
+        return {}
+    users = db.query(model.Users).filter(model.Users.user_id.in_(user_ids)).all()
+    return {user.user_id: bump_token_version(user) for user in users}
+
+
+def publish_token_versions(versions: Dict[str, int]) -> None:
+    for user_id, version in versions.items():
+        token_versions.set(user_id, version)
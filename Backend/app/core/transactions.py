@@ -0,0 +1,133 @@
+"""
+Unit of work with retries for transient lock conflicts.
+
+Under contention MySQL aborts one of the competing transactions with a deadlock
+(1213) or lock wait timeout (1205). Retrying the whole transaction is the
+recommended response. run_in_transaction() does that:
+
+    def write(db):
+        order = db.get(model.Orders, order_id)
+        order.status = ...
+        return order
+
+    order = run_in_transaction(db, write, route="orders.update_order")
+
+The body runs inside the caller's session and must not commit. run_in_transaction
+commits after the body returns. On a retryable error it rolls back, waits a
+jittered exponential backoff and runs the body again. The rollback discards the
+body's pending changes and expires loaded objects, so every attempt starts from
+the same state and reads fresh rows. Bodies should only touch the database
+through `db`; side effects outside the transaction would be repeated.
+
+Other errors roll back and propagate unchanged. When the attempts run out the
+request fails with 503 and a Retry-After header. Retry and abort counts are kept
+per route and exposed through /admin/db/transactions.
+"""
+import os
+import json
+import time
+import random
+import logging
+import threading
+from typing import Callable, Dict, TypeVar
+
+from fastapi import HTTPException, status
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from app.core.metrics import Counters
+
+logger = logging.getLogger("kandypack.db")
+
+DB_TX_MAX_ATTEMPTS = int(os.getenv("DB_TX_MAX_ATTEMPTS", "4"))
+DB_TX_BACKOFF_MS = float(os.getenv("DB_TX_BACKOFF_MS", "25"))
+DB_TX_BACKOFF_MAX_MS = float(os.getenv("DB_TX_BACKOFF_MAX_MS", "500"))
+
+# ER_LOCK_DEADLOCK, ER_LOCK_WAIT_TIMEOUT
+RETRYABLE_ERROR_CODES = {1213, 1205}
+
+T = TypeVar("T")
+
+_counters: Dict[str, Counters] = {}
+_counters_lock = threading.Lock()
+
+
+def _route_counters(route: str) -> Counters:
+    with _counters_lock:
+        counters = _counters.get(route)
+        if counters is None:
+            counters = _counters[route] = Counters("transactions", "commits", "retries", "aborts", "errors")
+        return counters
+
+
+def error_code(exc: BaseException):
+    """MySQL error number of a DBAPI error, or None"""
+    orig = getattr(exc, "orig", None)
+    args = getattr(orig, "args", None)
+    if args and isinstance(args[0], int):
+        return args[0]
+    return None
+
+
+def is_retryable(exc: BaseException) -> bool:
+    return isinstance(exc, DBAPIError) and error_code(exc) in RETRYABLE_ERROR_CODES
+
+
+def backoff_seconds(attempt: int) -> float:
+    """Full-jitter exponential backoff for the given (1-based) failed attempt"""
+    ceiling = min(DB_TX_BACKOFF_MAX_MS, DB_TX_BACKOFF_MS * (2 ** (attempt - 1)))
+    return random.uniform(0, ceiling) / 1000
+
+
+def run_in_transaction(db: Session, body: Callable[[Session], T], route: str,
+                       max_attempts: int = DB_TX_MAX_ATTEMPTS) -> T:
+    """Run `body(db)` and commit, retrying the whole transaction on deadlock/lock timeout"""
+    counters = _route_counters(route)
+    counters.incr("transactions")
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            result = body(db)
+            db.commit()
+            counters.incr("commits")
+            return result
+        except DBAPIError as exc:
+            db.rollback()
+            if not is_retryable(exc):
+                counters.incr("errors")
+                raise
+            if attempt >= max_attempts:
+                counters.incr("aborts")
+                logger.warning(json.dumps({"event": "transaction_aborted", "route": route,
+                                           "code": error_code(exc), "attempts": attempt}))
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="The database is busy with conflicting updates, please retry",
+                    headers={"Retry-After": "1"},
+                )
+            counters.incr("retries")
+            delay = backoff_seconds(attempt)
+            logger.info(json.dumps({"event": "transaction_retry", "route": route, "code": error_code(exc),
+                                    "attempt": attempt, "delay_ms": round(delay * 1000, 1)}))
+            time.sleep(delay)
+        except BaseException:
+            db.rollback()
+            counters.incr("errors")
+            raise
+
+
+def transaction_stats() -> Dict:
+    with _counters_lock:
+        routes = dict(_counters)
+    return {
+        "max_attempts": DB_TX_MAX_ATTEMPTS,
+        "retryable_error_codes": sorted(RETRYABLE_ERROR_CODES),
+        "routes": {route: counters.snapshot() for route, counters in sorted(routes.items())},
+    }
+
+
+def reset_transaction_stats() -> None:
+    with _counters_lock:
+        for counters in _counters.values():
+            counters.reset()
@@ -0,0 +1,108 @@
+"""
+Primary/foreign key UUIDs.
+
+New keys are time-ordered (UUIDv7 layout: 48-bit millisecond timestamp first), so
+InnoDB appends them to the end of the clustered index instead of splitting pages
+at random positions the way uuid4 keys do.
+
+Storage is selected with DB_UUID_STORAGE:
+  - "string" (default): CHAR(36), the layout created by schemas/createtables.sql
+  - "binary": BINARY(16), after running scripts/migrate_uuid_binary.py
+Either way the API sees canonical 36-character strings; conversion happens in UUIDType.
+
+Legacy ids that are not canonical UUIDs (some seed data) cannot be packed directly.
+They map to the first 16 bytes of their SHA-256, in Python here and in SQL in the
+migration tool, so foreign keys still line up and old ids keep resolving.
+"""
+import os
+import re
+import time
+import uuid
+import hashlib
+import secrets
+import threading
+
+from sqlalchemy.types import TypeDecorator, String, BINARY
+
+UUID_STORAGE = os.getenv("DB_UUID_STORAGE", "string").lower()
+BINARY_STORAGE = UUID_STORAGE == "binary"
+
+CANONICAL_UUID_PATTERN = "^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$"
+_CANONICAL_UUID = re.compile(CANONICAL_UUID_PATTERN)
+
+_v7_lock = threading.Lock()
+_v7_last_ms = 0
+_v7_counter = 0
+
+
+def uuid7() -> uuid.UUID:
+    """Time-ordered UUID (RFC 9562 version 7).
+
+    The 12 bits after the version are a counter seeded randomly each millisecond,
+    so ids generated by one process in the same millisecond still sort in order.
+    """
+    global _v7_last_ms, _v7_counter
+    with _v7_lock:
+        ms = time.time_ns() // 1_000_000
+        if ms > _v7_last_ms:
+            _v7_last_ms = ms
+            _v7_counter = secrets.randbits(11)
+        else:
+            _v7_counter += 1
+            if _v7_counter > 0xFFF:
+                # counter exhausted: borrow the next millisecond
+                _v7_last_ms += 1
+                _v7_counter = secrets.randbits(11)
+        ms, counter = _v7_last_ms, _v7_counter
+
+    value = (ms & 0xFFFFFFFFFFFF) << 80
+    value |= 0x7 << 76
+    value |= counter << 64
+    value |= 0b10 << 62
+    value |= secrets.randbits(62)
+    return uuid.UUID(int=value)
+
+
+def uuid_to_bin(value) -> bytes:
+    if isinstance(value, uuid.UUID):
+        return value.bytes
+    if isinstance(value, (bytes, bytearray)) and len(value) == 16:
+        return bytes(value)
+    value = str(value)
+    if _CANONICAL_UUID.match(value):
+        return uuid.UUID(value).bytes
+    return hashlib.sha256(value.encode("utf-8")).digest()[:16]
+
+
+def bin_to_uuid(value: bytes) -> str:
+    return str(uuid.UUID(bytes=bytes(value)))
+
+
+def to_db_value(value):
+    """Convert an id to its storage form, for raw SQL and stored procedure arguments"""
+    if value is None:
+        return None
+    return uuid_to_bin(value) if BINARY_STORAGE else str(value)
+
+
+def from_db_value(value):
+    if isinstance(value, (bytes, bytearray)) and len(value) == 16:
+        return bin_to_uuid(value)
+    return value
+
+
+class UUIDType(TypeDecorator):
+    """UUID column stored as CHAR(36) or BINARY(16) depending on DB_UUID_STORAGE"""
+    impl = String(36)
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if BINARY_STORAGE:
+            return dialect.type_descriptor(BINARY(16))
+        return dialect.type_descriptor(String(36))
+
+    def process_bind_param(self, value, dialect):
+        return to_db_value(value)
+
+    def process_result_value(self, value, dialect):
+        return from_db_value(value)
@@ -1,7 +1,14 @@
 from fastapi import FastAPI, HTTPException , Depends, status 
 from fastapi.middleware.cors import CORSMiddleware
-from app.core.database import engine, Base, get_db
+from fastapi.concurrency import run_in_threadpool
+from contextlib import asynccontextmanager
+from app.core.database import engine, get_db, Session_local
+from app.core.migrations import check_schema_version
+from app.core.reference_cache import reference_cache
 from app.api import api_router
+from app.core.query_stats import track_request_queries
+from app.core.idempotency import idempotency
+from app.core.status_history import status_history
 import app.core.model as model
 from typing import Annotated
 from sqlalchemy.orm import Session
@@ -20,13 +27,35 @@ ALLOWED_ORIGINS = os.getenv(
     "http://localhost:5173,http://localhost:3000,http://127.0.0.1:5173,http://127.0.0.1:3000"
 ).split(",")
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Schema changes are applied by `python migrate.py upgrade`; startup only checks the version
+    if check_schema_version(engine):
+        # only once the schema exists; otherwise the cache fills lazily on first use
+        await run_in_threadpool(_warm_reference_cache)
+    yield
+    # write the status history events still queued in this process
+    await run_in_threadpool(status_history.close)
+
+
+def _warm_reference_cache():
+    with Session_local() as db:
+        reference_cache.warm(db)
+
+
 app = FastAPI(
     title=APP_NAME,
     description="Backend API for KandyPack Supply Chain Management Platform",
     version=APP_VERSION,
-    debug=DEBUG
+    debug=DEBUG,
+    lifespan=lifespan
 )
 
+# Replay retried creates that carry an Idempotency-Key (registered before CORS so
+# replayed responses still get CORS headers)
+app.middleware("http")(idempotency.middleware)
+
 # Configure CORS to allow frontend access
 app.add_middleware(
     CORSMiddleware,
@@ -34,9 +63,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Allow all HTTP methods (GET, POST, PUT, DELETE, etc.)
     allow_headers=["*"],  # Allow all headers including Authorization
+    expose_headers=["X-DB-Queries", "X-DB-Time-ms", "X-Next-Cursor", "X-Total-Count", "Idempotent-Replayed"],
 )
 
-model.Base.metadata.create_all(bind=engine)
+# Count SQL statements per request (X-DB-* headers in debug mode, N+1 warnings in the log)
+app.middleware("http")(track_request_queries)
+
 db_dependancy = Annotated[Session, Depends(get_db)]
  
 app.include_router(api_router)
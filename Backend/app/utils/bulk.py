@@ -0,0 +1,73 @@
+"""
+Bulk insert/upsert helpers.
+
+Rows are passed as dicts keyed by model attribute name and written with one
+executemany per batch of DB_BULK_BATCH_SIZE rows. PyMySQL rewrites each batch into a
+single multi-row INSERT ... VALUES, so N rows cost N / batch_size round trips instead
+of N.
+
+MySQL has no INSERT ... RETURNING. Every table here uses client-generated UUID keys,
+so missing primary keys are filled in from the column default before the insert.
+That gives the caller the generated keys without reading them back.
+
+Statements run in the caller's session and transaction; commit as usual.
+"""
+import os
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from sqlalchemy import inspect, insert
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.orm import Session
+
+BULK_BATCH_SIZE = int(os.getenv("DB_BULK_BATCH_SIZE", "500"))
+
+
+def _batches(rows: Sequence[Dict], batch_size: int) -> Iterable[Sequence[Dict]]:
+    for start in range(0, len(rows), batch_size):
+        yield rows[start:start + batch_size]
+
+
+def _fill_primary_keys(model_cls, rows: List[Dict]) -> List:
+    pk_column = inspect(model_cls).primary_key[0]
+    default = pk_column.default
+    keys = []
+    for row in rows:
+        if row.get(pk_column.key) is None:
+            if default is None or not default.is_callable:
+                raise ValueError(f"{model_cls.__name__}.{pk_column.key} has no client-side default")
+            row[pk_column.key] = default.arg(None)
+        keys.append(row[pk_column.key])
+    return keys
+
+
+def bulk_insert(db: Session, model_cls, rows: Iterable[Dict], batch_size: int = BULK_BATCH_SIZE) -> List:
+    """Insert `rows` (same keys in every row) and return their primary keys in order"""
+    rows = [dict(row) for row in rows]
+    if not rows:
+        return []
+    keys = _fill_primary_keys(model_cls, rows)
+    statement = insert(model_cls.__table__)
+    for batch in _batches(rows, batch_size):
+        db.execute(statement, list(batch))
+    return keys
+
+
+def bulk_upsert(db: Session, model_cls, rows: Iterable[Dict], update_columns: Optional[Sequence[str]] = None,
+                batch_size: int = BULK_BATCH_SIZE) -> List:
+    """INSERT ... ON DUPLICATE KEY UPDATE for `rows`; returns their primary keys in order.
+
+    `update_columns` defaults to every non-key column present in the rows.
+    """
+    rows = [dict(row) for row in rows]
+    if not rows:
+        return []
+    keys = _fill_primary_keys(model_cls, rows)
+    table = model_cls.__table__
+    if update_columns is None:
+        primary = {c.name for c in table.primary_key.columns}
+        update_columns = [name for name in rows[0] if name not in primary]
+    statement = mysql_insert(table)
+    statement = statement.on_duplicate_key_update({name: statement.inserted[name] for name in update_columns})
+    for batch in _batches(rows, batch_size):
+        db.execute(statement, list(batch))
+    return keys
@@ -0,0 +1,151 @@
+"""
+Lead-time and dwell-time reports over the order status history.
+
+  lead time   seconds from an order's creation event (from_status NULL) to its
+              DELIVERED event, per warehouse the order was delivered from
+  dwell time  seconds an order spent in a status: from the event that moved it
+              there to the order's next event; still "open" if there is none yet
+
+Each report is one SELECT: the durations are computed per event with correlated
+lookups on idx_status_history_order (order_id, changed_at), ranked with
+CUME_DIST() per group and aggregated in the same statement, so the database returns
+one row per warehouse or stage instead of the events. Percentiles are nearest-rank
+(the smallest duration whose cumulative share reaches 50% / 90%).
+
+Orders created before the history table existed have no creation event and are left
+out of the lead times; their later transitions still count towards dwell times.
+"""
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import Float, and_, case, func, select
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy.sql.expression import FunctionElement
+
+import app.core.model as model
+
+History = model.OrderStatusHistory
+
+
+class seconds_between(FunctionElement):
+    """Seconds (with fractions) from the first datetime argument to the second"""
+    type = Float()
+    inherit_cache = True
+    name = "seconds_between"
+
+
+@compiles(seconds_between, "mysql")
+def _seconds_between_mysql(element, compiler, **kw):
+    start, end = list(element.clauses)
+    return f"TIMESTAMPDIFF(MICROSECOND, {compiler.process(start, **kw)}, {compiler.process(end, **kw)}) / 1000000"
+
+
+@compiles(seconds_between)
+def _seconds_between_default(element, compiler, **kw):
+    # SQLite (local runs and the smoke tests)
+    start, end = list(element.clauses)
+    return f"(julianday({compiler.process(end, **kw)}) - julianday({compiler.process(start, **kw)})) * 86400.0"
+
+
+def _percentile(ranked, share: float):
+    return func.min(case((ranked.c.rank >= share, ranked.c.seconds)))
+
+
+def _round(value) -> Optional[float]:
+    return None if value is None else round(float(value), 1)
+
+
+def lead_times(db: Session, start: datetime, end: datetime) -> List[Dict]:
+    """Placed-to-delivered lead times of orders delivered in [start, end), per warehouse"""
+    delivered, created = aliased(History), aliased(History)
+    placed_at = (
+        select(func.min(created.changed_at))
+        .where(created.order_id == delivered.order_id, created.from_status.is_(None))
+        .scalar_subquery()
+    )
+    durations = (
+        select(delivered.warehouse_id, seconds_between(placed_at, delivered.changed_at).label("seconds"))
+        .where(delivered.to_status == model.OrderStatus.DELIVERED,
+               delivered.changed_at >= start, delivered.changed_at < end)
+        .subquery()
+    )
+    ranked = (
+        select(durations.c.warehouse_id, durations.c.seconds,
+               func.cume_dist().over(partition_by=durations.c.warehouse_id,
+                                     order_by=durations.c.seconds).label("rank"))
+        .where(durations.c.seconds.is_not(None))
+        .subquery()
+    )
+    rows = db.execute(
+        select(ranked.c.warehouse_id, func.count().label("orders"), func.avg(ranked.c.seconds).label("avg"),
+               _percentile(ranked, 0.5).label("p50"), _percentile(ranked, 0.9).label("p90"),
+               func.max(ranked.c.seconds).label("max"))
+        .group_by(ranked.c.warehouse_id)
+        .order_by(ranked.c.warehouse_id)
+    ).all()
+    return [{
+        "warehouse_id": str(row.warehouse_id) if row.warehouse_id else None,
+        "orders": row.orders,
+        "avg_seconds": _round(row.avg),
+        "p50_seconds": _round(row.p50),
+        "p90_seconds": _round(row.p90),
+        "max_seconds": _round(row.max),
+    } for row in rows]
+
+
+def dwell_times(db: Session, start: datetime, end: datetime, warehouse_id: Optional[str] = None) -> List[Dict]:
+    """Time spent in each status, for the status changes made in [start, end)"""
+    entered, following = aliased(History), aliased(History)
+    left_at = (
+        select(func.min(following.changed_at))
+        .where(following.order_id == entered.order_id, following.changed_at > entered.changed_at)
+        .scalar_subquery()
+    )
+    conditions = [entered.to_status != model.OrderStatus.DELIVERED,
+                  entered.changed_at >= start, entered.changed_at < end]
+    if warehouse_id is not None:
+        conditions.append(entered.warehouse_id == warehouse_id)
+    durations = (
+        select(entered.to_status.label("stage"), seconds_between(entered.changed_at, left_at).label("seconds"))
+        .where(and_(*conditions))
+        .subquery()
+    )
+    # open stays (no next event) are ranked apart so they don't shift the percentiles
+    ranked = select(
+        durations.c.stage, durations.c.seconds,
+        func.cume_dist().over(partition_by=[durations.c.stage, durations.c.seconds.is_(None)],
+                              order_by=durations.c.seconds).label("rank"),
+    ).subquery()
+    rows = db.execute(
+        select(ranked.c.stage, func.count().label("transitions"), func.count(ranked.c.seconds).label("completed"),
+               func.avg(ranked.c.seconds).label("avg"),
+               _percentile(ranked, 0.5).label("p50"), _percentile(ranked, 0.9).label("p90"))
+        .group_by(ranked.c.stage)
+    ).all()
+    stages = list(model.OrderStatus)
+    return [{
+        "status": row.stage.value,
+        "transitions": row.transitions,
+        "open": row.transitions - row.completed,
+        "avg_seconds": _round(row.avg),
+        "p50_seconds": _round(row.p50),
+        "p90_seconds": _round(row.p90),
+    } for row in sorted(rows, key=lambda row: stages.index(row.stage))]
+
+
+def order_timeline(db: Session, order_id: str) -> List[Dict]:
+    """An order's status changes in order, each with the time spent in the new status"""
+    events = db.scalars(
+        select(History).where(History.order_id == order_id).order_by(History.changed_at)
+    ).all()
+    timeline = []
+    for event, following in zip(events, [*events[1:], None]):
+        timeline.append({
+            "from_status": event.from_status.value if event.from_status else None,
+            "to_status": event.to_status.value,
+            "warehouse_id": str(event.warehouse_id) if event.warehouse_id else None,
+            "changed_at": event.changed_at,
+            "dwell_seconds": _round((following.changed_at - event.changed_at).total_seconds()) if following else None,
+        })
+    return timeline
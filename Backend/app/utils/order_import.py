@@ -0,0 +1,288 @@
+"""
+Bulk order import from CSV or NDJSON uploads (POST /orders/import).
+
+The upload is read line by line, never as a whole, and grouped into orders:
+  ndjson  one order per line: the create-with-items body plus customer_id and an
+          optional order_ref
+            {"order_ref": "PO-1", "customer_id": "...", "order_date": "2026-11-01T09:00:00",
+             "deliver_address": "...", "deliver_city_id": "...",
+             "items": [{"product_type_id": "...", "quantity": 2, "unit_price": 150.0}]}
+  csv     one line item per row, after a header row
+            order_ref,customer_id,order_date,deliver_address,deliver_city_id,product_type_id,quantity,unit_price
+          consecutive rows with the same order_ref make up one order (the order fields
+          are taken from its first row); a row without an order_ref is a one-item order
+
+Orders are validated and written ORDERS_IMPORT_CHUNK_SIZE at a time:
+  - the chunk's customer ids are checked with one IN query (ids already seen in the
+    same import are remembered), its city and product ids with reference_cache.get_many
+  - the rules are those of create_order_with_items, plus positive quantities and
+    non-negative prices (the order_items check constraints)
+  - the valid orders and their items are written with bulk_insert and committed as
+    one transaction; if that fails, the chunk's orders are written one transaction
+    each so only the orders that can't be saved are rejected
+
+Invalid orders are skipped and the rest of the file still imports. The report lists
+each rejected order with the file line it starts on (the CSV header is line 1), up
+to ORDERS_IMPORT_MAX_ERRORS entries.
+
+Imports are not covered by Idempotency-Key: chunks commit as they go, so uploading
+the same file again creates its valid orders again. To fix rejected orders, re-send
+only the lines the report lists.
+"""
+import io
+import os
+import csv
+import json
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import IO, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import pytz
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+import app.core.model as model
+from app.core import schemas
+from app.core.reference_cache import reference_cache
+from app.core.status_history import record_status_change
+from app.core.transactions import run_in_transaction
+from app.utils.bulk import bulk_insert
+
+ORDERS_IMPORT_CHUNK_SIZE = int(os.getenv("ORDERS_IMPORT_CHUNK_SIZE", "1000"))
+ORDERS_IMPORT_MAX_ERRORS = int(os.getenv("ORDERS_IMPORT_MAX_ERRORS", "1000"))
+
+ORDER_FIELDS = ("customer_id", "order_date", "deliver_address", "deliver_city_id")
+ITEM_FIELDS = ("product_type_id", "quantity", "unit_price")
+CSV_COLUMNS = ("order_ref", *ORDER_FIELDS, *ITEM_FIELDS)
+
+ROUTE = "orders.import_orders"
+SL_TZ = pytz.timezone("Asia/Colombo")
+
+
+@dataclass
+class ParsedOrder:
+    line: int
+    order_ref: Optional[str]
+    order: Optional[schemas.ImportOrder] = None
+    error: Optional[str] = None
+
+
+def import_format(filename: Optional[str], requested: Optional[str] = None) -> str:
+    """"csv" or "ndjson": the requested format, else the one the file extension names"""
+    if requested:
+        return requested
+    extension = os.path.splitext(filename or "")[1].lower()
+    if extension == ".csv":
+        return "csv"
+    if extension in (".ndjson", ".jsonl"):
+        return "ndjson"
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Cannot tell the file format, pass ?format=csv or ?format=ndjson",
+    )
+
+
+def _parsed(line: int, order_ref: Optional[str], data) -> ParsedOrder:
+    try:
+        return ParsedOrder(line, order_ref, order=schemas.ImportOrder.model_validate(data))
+    except ValidationError as exc:
+        detail = "; ".join(
+            f"{'.'.join(str(part) for part in error['loc']) or 'order'}: {error['msg']}" for error in exc.errors()
+        )
+        return ParsedOrder(line, order_ref, error=detail)
+
+
+def _text(stream: IO[bytes], **kwargs) -> io.TextIOWrapper:
+    # undecodable bytes become U+FFFD and fail validation instead of aborting the import
+    return io.TextIOWrapper(stream, encoding="utf-8-sig", errors="replace", **kwargs)
+
+
+def parse_ndjson(stream: IO[bytes]) -> Iterator[ParsedOrder]:
+    for line, text in enumerate(_text(stream), start=1):
+        if not text.strip():
+            continue
+        try:
+            data = json.loads(text)
+        except ValueError:
+            yield ParsedOrder(line, None, error="Invalid JSON")
+            continue
+        order_ref = data.get("order_ref") if isinstance(data, dict) else None
+        yield _parsed(line, order_ref, data)
+
+
+def parse_csv(stream: IO[bytes]) -> Iterator[ParsedOrder]:
+    reader = csv.DictReader(_text(stream, newline=""))
+    missing = [column for column in CSV_COLUMNS[1:] if column not in (reader.fieldnames or [])]
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"CSV is missing columns: {', '.join(missing)}",
+        )
+
+    def order_from(line: int, order_ref: Optional[str], first: Dict, items: List[Dict]) -> ParsedOrder:
+        return _parsed(line, order_ref, {**{field: first[field] for field in ORDER_FIELDS},
+                                         "order_ref": order_ref, "items": items})
+
+    current: Optional[Tuple[int, Optional[str], Dict, List[Dict]]] = None
+    last_line = reader.line_num
+    for row in reader:
+        line, last_line = last_line + 1, reader.line_num
+        row = {key: (value.strip() or None) if isinstance(value, str) else value for key, value in row.items()}
+        order_ref = row.get("order_ref")
+        item = {field: row[field] for field in ITEM_FIELDS}
+        if current is not None and order_ref is not None and order_ref == current[1]:
+            current[3].append(item)
+            continue
+        if current is not None:
+            yield order_from(*current)
+        current = (line, order_ref, row, [item])
+    if current is not None:
+        yield order_from(*current)
+
+
+class OrderImporter:
+    def __init__(self, db: Session, chunk_size: int = ORDERS_IMPORT_CHUNK_SIZE,
+                 max_errors: int = ORDERS_IMPORT_MAX_ERRORS):
+        self.db = db
+        self.chunk_size = chunk_size
+        self.max_errors = max_errors
+        self.known_customers: Set[str] = set()
+        self.missing_customers: Set[str] = set()
+        self.read = self.created = self.rejected = 0
+        self.errors: List[Dict] = []
+
+    def run(self, orders: Iterable[ParsedOrder]) -> Dict:
+        chunk = []
+        for parsed in orders:
+            self.read += 1
+            chunk.append(parsed)
+            if len(chunk) >= self.chunk_size:
+                self._import_chunk(chunk)
+                chunk = []
+        if chunk:
+            self._import_chunk(chunk)
+        return {
+            "orders_read": self.read,
+            "orders_created": self.created,
+            "orders_rejected": self.rejected,
+            "errors": self.errors,
+            "errors_truncated": self.rejected > len(self.errors),
+        }
+
+    def _reject(self, parsed: ParsedOrder, detail: str) -> None:
+        self.rejected += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"line": parsed.line, "order_ref": parsed.order_ref, "detail": detail})
+
+    def _check_customers(self, customer_ids: Set[str]) -> None:
+        unseen = customer_ids - self.known_customers - self.missing_customers
+        if not unseen:
+            return
+        found = {str(customer_id) for customer_id in self.db.scalars(
+            select(model.Customers.customer_id).where(model.Customers.customer_id.in_(unseen))
+        )}
+        self.known_customers |= found
+        self.missing_customers |= unseen - found
+
+    def _validate(self, order: schemas.ImportOrder, earliest: datetime, cities: Dict, products: Dict):
+        """(order_date, None) for a valid order, else (None, the first error)"""
+        order_date = order.order_date
+        if order_date.tzinfo is None:
+            order_date = SL_TZ.localize(order_date)
+        if order_date < earliest:
+            return None, "Order date must be at least 7 days from today."
+        if order.customer_id not in self.known_customers:
+            return None, f"Customer {order.customer_id} not found"
+        if order.deliver_city_id not in cities:
+            return None, f"City {order.deliver_city_id} not found"
+        if not order.items:
+            return None, "Order must have at least one item"
+        for item in order.items:
+            if item.product_type_id not in products:
+                return None, f"Product {item.product_type_id} not found"
+            if item.quantity <= 0:
+                return None, f"Quantity of product {item.product_type_id} must be positive"
+            if item.unit_price < 0:
+                return None, f"Unit price of product {item.product_type_id} cannot be negative"
+        return order_date, None
+
+    @staticmethod
+    def _rows(order: schemas.ImportOrder, order_date: datetime) -> Tuple[Dict, List[Dict]]:
+        # item rows and the order total in one pass, as in create_order_with_items
+        order_id = model.generate_uuid()
+        item_rows = []
+        total_price = 0
+        for item in order.items:
+            total_price += item.quantity * item.unit_price
+            item_rows.append({
+                "order_id": order_id,
+                "store_id": None,
+                "product_type_id": item.product_type_id,
+                "quantity": item.quantity,
+                "item_price": item.unit_price,
+            })
+        order_row = {
+            "order_id": order_id,
+            "customer_id": order.customer_id,
+            "order_date": order_date,
+            "deliver_address": order.deliver_address,
+            "deliver_city_id": order.deliver_city_id,
+            "full_price": total_price,
+            "status": model.OrderStatus.PLACED,
+            "warehouse_id": None,
+        }
+        return order_row, item_rows
+
+    @staticmethod
+    def _write(rows: List[Tuple[Dict, List[Dict]]]):
+        def write(db: Session):
+            bulk_insert(db, model.Orders, [order_row for order_row, _ in rows])
+            bulk_insert(db, model.OrderItems, [item for _, items in rows for item in items])
+            for order_row, _ in rows:
+                record_status_change(db, order_row["order_id"], None, order_row["status"])
+        return write
+
+    def _import_chunk(self, chunk: List[ParsedOrder]) -> None:
+        valid = [parsed for parsed in chunk if parsed.error is None]
+        self._check_customers({parsed.order.customer_id for parsed in valid})
+        cities = reference_cache.get_many(self.db, "cities", {parsed.order.deliver_city_id for parsed in valid})
+        products = reference_cache.get_many(
+            self.db, "products", {item.product_type_id for parsed in valid for item in parsed.order.items}
+        )
+        earliest = datetime.now(SL_TZ) + timedelta(days=7)
+        writes = []
+        for parsed in chunk:  # in file order, so the report is too
+            if parsed.error is not None:
+                self._reject(parsed, parsed.error)
+                continue
+            order_date, error = self._validate(parsed.order, earliest, cities, products)
+            if error is not None:
+                self._reject(parsed, error)
+            else:
+                writes.append((parsed, self._rows(parsed.order, order_date)))
+        if not writes:
+            return
+
+        try:
+            run_in_transaction(self.db, self._write([rows for _, rows in writes]), route=ROUTE)
+            self.created += len(writes)
+            return
+        except (DBAPIError, HTTPException):
+            pass
+        # isolate the orders the database refuses
+        for parsed, rows in writes:
+            try:
+                run_in_transaction(self.db, self._write([rows]), route=ROUTE)
+                self.created += 1
+            except DBAPIError as exc:
+                self._reject(parsed, f"Could not be saved: {getattr(exc, 'orig', exc)}")
+            except HTTPException as exc:
+                self._reject(parsed, exc.detail)
+
+
+def import_orders_file(db: Session, stream: IO[bytes], file_format: str) -> Dict:
+    parsed = parse_csv(stream) if file_format == "csv" else parse_ndjson(stream)
+    return {"format": file_format, **OrderImporter(db).run(parsed)}
@@ -0,0 +1,146 @@
+"""
+Order status transitions.
+
+Every status change goes through this table of allowed edges, whether it comes from
+an allocation, a warehouse assignment, PUT /orders/{id} or a bulk transition:
+
+    PLACED          -> IN_WAREHOUSE, SCHEDULED_RAIL, SCHEDULED_ROAD, FAILED
+    IN_WAREHOUSE    -> SCHEDULED_RAIL, SCHEDULED_ROAD, FAILED
+    SCHEDULED_RAIL  -> IN_WAREHOUSE, SCHEDULED_ROAD, FAILED
+    SCHEDULED_ROAD  -> IN_WAREHOUSE, DELIVERED, FAILED
+    FAILED          -> PLACED
+    DELIVERED       (final)
+
+Setting the status an order already has is always allowed (a no-op edge), so a
+second allocation to the same kind of schedule doesn't fail.
+
+Single orders:
+    transition(order, model.OrderStatus.SCHEDULED_RAIL)   # raises 400 on a bad edge
+Many orders at once:
+    bulk_transition(db, model.OrderStatus.DELIVERED, scope=truck_schedule_scope(schedule_id))
+runs one set-based UPDATE ... WHERE <scope> AND status IN (<states that may move
+to the target>), preceded by one GROUP BY count of the scope, whatever the number
+of orders.
+
+Both record each change in the order status history (app.core.status_history),
+which is written after the transaction commits.
+"""
+from typing import Dict, FrozenSet, Iterable, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session, object_session
+
+import app.core.model as model
+from app.core.status_history import record_status_change, status_history
+
+OrderStatus = model.OrderStatus
+
+TRANSITIONS: Dict[OrderStatus, FrozenSet[OrderStatus]] = {
+    OrderStatus.PLACED: frozenset({OrderStatus.IN_WAREHOUSE, OrderStatus.SCHEDULED_RAIL,
+                                   OrderStatus.SCHEDULED_ROAD, OrderStatus.FAILED}),
+    OrderStatus.IN_WAREHOUSE: frozenset({OrderStatus.SCHEDULED_RAIL, OrderStatus.SCHEDULED_ROAD, OrderStatus.FAILED}),
+    OrderStatus.SCHEDULED_RAIL: frozenset({OrderStatus.IN_WAREHOUSE, OrderStatus.SCHEDULED_ROAD, OrderStatus.FAILED}),
+    OrderStatus.SCHEDULED_ROAD: frozenset({OrderStatus.IN_WAREHOUSE, OrderStatus.DELIVERED, OrderStatus.FAILED}),
+    OrderStatus.FAILED: frozenset({OrderStatus.PLACED}),
+    OrderStatus.DELIVERED: frozenset(),
+}
+
+# target -> states that may move to it (no-op edges included)
+SOURCES: Dict[OrderStatus, FrozenSet[OrderStatus]] = {
+    target: frozenset({source for source, targets in TRANSITIONS.items() if target in targets} | {target})
+    for target in OrderStatus
+}
+
+
+def as_status(value) -> OrderStatus:
+    """model.OrderStatus for an enum member (of any OrderStatus enum) or its value"""
+    return OrderStatus(getattr(value, "value", value))
+
+
+def can_transition(current, target) -> bool:
+    current, target = as_status(current), as_status(target)
+    return current == target or target in TRANSITIONS[current]
+
+
+def check_transition(current, target) -> None:
+    if not can_transition(current, target):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Cannot change order status from {as_status(current).value} to {as_status(target).value}",
+        )
+
+
+def transition(order: model.Orders, target) -> None:
+    """Set `order.status` to `target` if the edge is allowed (400 otherwise)"""
+    check_transition(order.status, target)
+    db = object_session(order)
+    if db is not None:
+        record_status_change(db, order.order_id, order.status, target, order.warehouse_id)
+    order.status = as_status(target)
+
+
+def order_ids_scope(order_ids: Iterable[str]):
+    return model.Orders.order_id.in_(list(order_ids))
+
+
+def warehouse_scope(warehouse_id: str):
+    return model.Orders.warehouse_id == warehouse_id
+
+
+def train_schedule_scope(schedule_id: str):
+    return model.Orders.order_id.in_(
+        select(model.RailAllocations.order_id).where(model.RailAllocations.schedule_id == schedule_id)
+    )
+
+
+def truck_schedule_scope(schedule_id: str):
+    return model.Orders.order_id.in_(
+        select(model.TruckAllocations.order_id).where(model.TruckAllocations.schedule_id == schedule_id)
+    )
+
+
+def route_scope(route_id: str):
+    return model.Orders.order_id.in_(
+        select(model.TruckAllocations.order_id)
+        .join(model.TruckSchedules, model.TruckSchedules.schedule_id == model.TruckAllocations.schedule_id)
+        .where(model.TruckSchedules.route_id == route_id)
+    )
+
+
+def bulk_transition(db: Session, target, scope, from_statuses: Optional[Iterable] = None) -> Dict:
+    """Move every order matching `scope` (a SQL condition on orders) whose current status may
+    move to `target` (and is in `from_statuses`, when given) in one UPDATE. Doesn't commit;
+    the history events for the moved orders are written once the caller does.
+
+    Returns the number of orders updated and, per status, the orders in scope that were
+    left alone because the edge isn't allowed or their status wasn't in `from_statuses`.
+    """
+    target = as_status(target)
+    sources = SOURCES[target] - {target}
+    if from_statuses is not None:
+        sources &= {as_status(value) for value in from_statuses}
+
+    in_scope = dict(db.execute(
+        select(model.Orders.status, func.count()).where(scope).group_by(model.Orders.status)
+    ).all())
+    updated = 0
+    if sources and any(in_scope.get(source) for source in sources):
+        if status_history.enabled:
+            # the rows about to move, locked so the UPDATE moves exactly these
+            moving = db.execute(
+                select(model.Orders.order_id, model.Orders.status, model.Orders.warehouse_id)
+                .where(scope, model.Orders.status.in_(sources))
+                .with_for_update()
+            ).all()
+            for order_id, current, warehouse_id in moving:
+                record_status_change(db, order_id, current, target, warehouse_id)
+        result = db.execute(
+            update(model.Orders)
+            .where(scope, model.Orders.status.in_(sources))
+            .values(status=target)
+            .execution_options(synchronize_session=False)
+        )
+        updated = result.rowcount
+    skipped = {as_status(current).value: count for current, count in in_scope.items() if current not in sources}
+    return {"status": target.value, "matched": sum(in_scope.values()), "updated": updated, "skipped": skipped}
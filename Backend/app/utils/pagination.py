@@ -0,0 +1,112 @@
+"""
+Keyset (cursor) pagination for order lists.
+
+Pages are ordered newest first on (order_date, order_id) and continue from the last
+row of the previous page:
+
+    WHERE order_date <= :d AND (order_date < :d OR (order_date = :d AND order_id < :id))
+    ORDER BY order_date DESC, order_id DESC LIMIT :limit + 1
+
+so fetching page N costs the same as page 1 (an index range scan on the composite
+(…, order_date, order_id) indexes) instead of reading and discarding N * limit rows
+as OFFSET does. The extra row tells whether another page exists.
+
+Response bodies stay JSON arrays; pagination metadata travels in headers:
+  X-Next-Cursor  opaque cursor for the next page (absent on the last page)
+  X-Total-Count  total matching rows, only with ?include_total=true (costs a COUNT)
+
+Routers:
+    def list_orders(response: Response, page: PageParams = Depends(page_params), ...):
+        query = paginate(db.query(model.Orders), page, model.Orders.order_date, model.Orders.order_id)
+        orders, next_cursor = split_page(query.all(), page)
+        response.headers.update(page_headers(next_cursor, total))
+
+Without ?limit= (and with ORDERS_DEFAULT_PAGE_SIZE unset) the whole list is returned,
+as before.
+"""
+import os
+import json
+import base64
+import binascii
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, Query, status
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.orm import Query as OrmQuery, Session
+
+ORDERS_PAGE_MAX = int(os.getenv("ORDERS_PAGE_MAX", "1000"))
+ORDERS_DEFAULT_PAGE_SIZE = int(os.getenv("ORDERS_DEFAULT_PAGE_SIZE", "0"))  # 0: unpaginated unless ?limit= is given
+CURSOR_PAGE_SIZE = 100  # page size when a cursor arrives without ?limit=
+
+
+@dataclass(frozen=True)
+class PageParams:
+    limit: Optional[int]
+    after: Optional[Tuple[datetime, str]]
+    include_total: bool
+
+
+def encode_cursor(order_date: datetime, order_id) -> str:
+    raw = json.dumps([order_date.isoformat(), str(order_id)], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        order_date, order_id = json.loads(raw)
+        return datetime.fromisoformat(order_date), str(order_id)
+    except (binascii.Error, ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def page_params(
+    limit: Optional[int] = Query(None, ge=1, le=ORDERS_PAGE_MAX, description="Page size; omit for the full list"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    include_total: bool = Query(False, description="Send the total match count in X-Total-Count"),
+) -> PageParams:
+    if limit is None:
+        limit = ORDERS_DEFAULT_PAGE_SIZE or (CURSOR_PAGE_SIZE if cursor else None)
+    return PageParams(limit, decode_cursor(cursor) if cursor else None, include_total)
+
+
+def paginate(query, page: PageParams, date_column, id_column):
+    """Order `query` (ORM Query or Select) newest first and apply the page's cursor and limit"""
+    if page.after is not None:
+        order_date, order_id = page.after
+        # the leading `<=` is implied by the OR but gives the planner a plain index range
+        query = query.filter(date_column <= order_date, or_(
+            date_column < order_date,
+            and_(date_column == order_date, id_column < order_id),
+        ))
+    query = query.order_by(date_column.desc(), id_column.desc())
+    if page.limit is not None:
+        query = query.limit(page.limit + 1)
+    return query
+
+
+def split_page(rows: List, page: PageParams,
+               key: Callable = lambda row: (row.order_date, row.order_id)) -> Tuple[List, Optional[str]]:
+    """Drop the look-ahead row; returns (rows, next cursor or None)"""
+    if page.limit is None or len(rows) <= page.limit:
+        return rows, None
+    rows = rows[:page.limit]
+    return rows, encode_cursor(*key(rows[-1]))
+
+
+def count_total(db: Session, query) -> int:
+    """COUNT(*) of an unpaginated ORM Query or Select"""
+    if isinstance(query, OrmQuery):
+        return query.order_by(None).count()
+    return db.execute(select(func.count()).select_from(query.order_by(None).subquery())).scalar_one()
+
+
+def page_headers(next_cursor: Optional[str], total: Optional[int] = None) -> Dict[str, str]:
+    headers = {}
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    if total is not None:
+        headers["X-Total-Count"] = str(total)
+    return headers
@@ -1,7 +1,9 @@
-from app.core.database import engine
+from app.core.database import replica_engine
+from app.core.uuid_type import to_db_value, from_db_value
 
 def _call_proc(proc_name, params=()):
-    conn = engine.raw_connection()
+    # Report procedures are read-only, so they run on the replica (primary if none configured)
+    conn = replica_engine.raw_connection()
     try:
         cur = conn.cursor()
         cur.callproc(proc_name, params)
@@ -11,7 +13,8 @@ def _call_proc(proc_name, params=()):
         conn.commit()
     finally:
         conn.close()
-    return [dict(zip(cols, r)) for r in rows]
+    # id columns come back as BINARY(16) when DB_UUID_STORAGE=binary
+    return [dict(zip(cols, (from_db_value(v) for v in r))) for r in rows]
 
 def quarterly_sales(year, quarter):
     return _call_proc("sp_quarterly_sales", (year, quarter))
@@ -35,4 +38,4 @@ def truck_usage_month(year, month):
     return _call_proc("sp_truck_usage_month", (year, month))
 
 def customer_order_history(customer_id, start_date, end_date):
-    return _call_proc("sp_customer_order_history", (customer_id, start_date, end_date))
\ No newline at end of file
+    return _call_proc("sp_customer_order_history", (to_db_value(customer_id), start_date, end_date))
\ No newline at end of file
@@ -0,0 +1,193 @@
+"""
+Streaming reads with bounded memory.
+
+Queries run with `yield_per`, which makes SQLAlchemy use a server-side (unbuffered)
+cursor and fetch rows in batches of DB_STREAM_BATCH_SIZE instead of loading the
+whole result set. Memory stays proportional to one batch, whatever the table size.
+
+An unbuffered cursor ties up its connection until every row has been read, so each
+stream gets its own session (stream_session()) rather than the request's session.
+That also keeps the stream usable after the request's dependencies have been torn down.
+Streams only read, so the session prefers the read replica when one is configured.
+
+Routers:
+    return json_array_response(stream_rows(select(...)), serialize=to_dict)
+    return ndjson_response(stream_rows(select(...)), serialize=to_dict, compress=accepts_gzip(request))
+    return csv_response(stream_rows(select(...)), fieldnames, serialize=to_dict, filename="orders.csv")
+Responses are encoded chunk by chunk; with compress=True each chunk goes through one
+streaming gzip compressor (Content-Encoding: gzip), so compression needs no buffering either.
+Scripts:
+    with stream_session() as db:
+        for order in stream_scalars(db, select(model.Orders)):
+            ...
+"""
+import io
+import os
+import csv
+import json
+import zlib
+from contextlib import contextmanager
+from enum import Enum
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+
+from app.core.database import Session_local
+
+STREAM_BATCH_SIZE = int(os.getenv("DB_STREAM_BATCH_SIZE", "1000"))
+STREAM_GZIP_LEVEL = int(os.getenv("STREAM_GZIP_LEVEL", "6"))
+
+
+@contextmanager
+def stream_session() -> Iterator[Session]:
+    db = Session_local()
+    db.info["read_only"] = True
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def stream_query(db: Session, statement: Select, batch_size: int = STREAM_BATCH_SIZE) -> Iterator:
+    """Yield result rows batch by batch from a server-side cursor"""
+    result = db.execute(statement.execution_options(yield_per=batch_size))
+    for partition in result.partitions():
+        yield from partition
+
+
+def stream_scalars(db: Session, statement: Select, batch_size: int = STREAM_BATCH_SIZE) -> Iterator:
+    """Like stream_query, for single-entity selects; yields ORM objects.
+
+    The session's identity map only holds weak references to unmodified objects, so
+    objects the caller has finished with are released as the stream advances.
+    """
+    result = db.execute(statement.execution_options(yield_per=batch_size))
+    for partition in result.scalars().partitions():
+        yield from partition
+
+
+def stream_rows(statement: Select, scalars: bool = False, batch_size: int = STREAM_BATCH_SIZE) -> Iterator:
+    """Stream `statement` from its own session, open for the lifetime of the iterator.
+
+    Use this from routers: the session opens when the response starts sending and
+    closes after the last row (or when the client disconnects).
+    """
+    with stream_session() as db:
+        stream = stream_scalars if scalars else stream_query
+        yield from stream(db, statement, batch_size)
+
+
+def json_array_response(rows: Iterable, serialize: Optional[Callable] = None,
+                        chunk_size: int = STREAM_BATCH_SIZE, headers: Optional[dict] = None) -> StreamingResponse:
+    """Stream `rows` as a JSON array, sending one chunk per `chunk_size` rows"""
+    def body():
+        yield "["
+        first = True
+        buffer = []
+        for row in rows:
+            item = serialize(row) if serialize else row
+            buffer.append(("" if first else ",") + json.dumps(jsonable_encoder(item)))
+            first = False
+            if len(buffer) >= chunk_size:
+                yield "".join(buffer)
+                buffer.clear()
+        if buffer:
+            yield "".join(buffer)
+        yield "]"
+
+    return StreamingResponse(body(), media_type="application/json", headers=headers)
+
+
+def accepts_gzip(request: Request) -> bool:
+    """True if Accept-Encoding allows gzip: listed (or matched by "*") with a q-value above 0"""
+    qualities = {}
+    for entry in request.headers.get("accept-encoding", "").lower().split(","):
+        coding, *params = [part.strip() for part in entry.split(";")]
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding:
+            qualities[coding] = quality
+    for coding in ("gzip", "x-gzip", "*"):
+        if coding in qualities:
+            return qualities[coding] > 0
+    return False
+
+
+def gzip_chunks(chunks: Iterable[str], level: int = STREAM_GZIP_LEVEL) -> Iterator[bytes]:
+    """Compress a stream of text chunks into one gzip stream, chunk by chunk"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits 31: gzip header and trailer
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode())
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def encoded_response(chunks: Iterable[str], media_type: str, compress: bool = False,
+                     filename: Optional[str] = None, headers: Optional[dict] = None) -> StreamingResponse:
+    headers = dict(headers or {})
+    if filename:
+        headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    headers["Vary"] = "Accept-Encoding"
+    if compress:
+        headers["Content-Encoding"] = "gzip"
+        chunks = gzip_chunks(chunks)
+    return StreamingResponse(chunks, media_type=media_type, headers=headers)
+
+
+def ndjson_response(rows: Iterable, serialize: Optional[Callable] = None, chunk_size: int = STREAM_BATCH_SIZE,
+                    compress: bool = False, filename: Optional[str] = None,
+                    headers: Optional[dict] = None) -> StreamingResponse:
+    """Stream `rows` as newline-delimited JSON, one chunk per `chunk_size` rows"""
+    def body():
+        buffer = []
+        for row in rows:
+            item = serialize(row) if serialize else row
+            buffer.append(json.dumps(jsonable_encoder(item)) + "\n")
+            if len(buffer) >= chunk_size:
+                yield "".join(buffer)
+                buffer.clear()
+        if buffer:
+            yield "".join(buffer)
+
+    return encoded_response(body(), "application/x-ndjson", compress, filename, headers)
+
+
+def _csv_value(value):
+    if isinstance(value, Enum):
+        return value.value
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return value
+
+
+def csv_response(rows: Iterable, fieldnames: List[str], serialize: Optional[Callable[..., Dict]] = None,
+                 chunk_size: int = STREAM_BATCH_SIZE, compress: bool = False, filename: Optional[str] = None,
+                 headers: Optional[dict] = None) -> StreamingResponse:
+    """Stream `rows` as CSV with a header line, one chunk per `chunk_size` rows"""
+    def body():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(fieldnames)
+        count = 0
+        for row in rows:
+            item = serialize(row) if serialize else row._mapping
+            writer.writerow([_csv_value(item.get(name)) for name in fieldnames])
+            count += 1
+            if count % chunk_size == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+
+    return encoded_response(body(), "text/csv; charset=utf-8", compress, filename, headers)
@@ -1,26 +1,25 @@
 """
-Script to generate a markdown file with all database tables and their data
+Script to generate a markdown file with all database tables and their data.
+Rows are streamed from the database and written straight to the file, so memory
+use does not grow with table size.
 """
 import sys
-from app.core.database import Session_local
 from app.core.model import *
-from sqlalchemy import inspect
+from app.utils.streaming import stream_session, stream_scalars
+from sqlalchemy import inspect, select
 from datetime import datetime
 
-def table_to_markdown(table_name, columns, rows):
-    """Convert table data to markdown format"""
-    md = f"\n## {table_name}\n\n"
+def write_table_markdown(out, table_name, columns, rows):
+    """Write table data to `out` in markdown format"""
+    out.write(f"\n## {table_name}\n\n")
     
-    if not rows:
-        md += "*No data available*\n"
-        return md
-    
-    # Create header
-    md += "| " + " | ".join(columns) + " |\n"
-    md += "| " + " | ".join(["---"] * len(columns)) + " |\n"
-    
-    # Add rows
+    count = 0
     for row in rows:
+        if count == 0:
+            # Create header
+            out.write("| " + " | ".join(columns) + " |\n")
+            out.write("| " + " | ".join(["---"] * len(columns)) + " |\n")
+        count += 1
         values = []
         for col in columns:
             val = getattr(row, col, "")
@@ -33,76 +32,74 @@ def table_to_markdown(table_name, columns, rows):
             # Escape pipe characters
             val = val.replace("|", "\\|")
             values.append(val)
-        md += "| " + " | ".join(values) + " |\n"
+        out.write("| " + " | ".join(values) + " |\n")
     
-    md += f"\n**Total Records:** {len(rows)}\n"
-    return md
+    if count == 0:
+        out.write("*No data available*\n")
+        return
+    out.write(f"\n**Total Records:** {count}\n")
 
-def main():
-    db = Session_local()
+def export_tables(db, out):
+    out.write("# KandyPack Logistics Platform - Database Reference\n\n")
+    out.write(f"**Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
+    out.write("This document contains all tables and their current data from the database.\n\n")
+    out.write("---\n\n")
+    out.write("# Table of Contents\n\n")
     
-    try:
-        md_content = "# KandyPack Logistics Platform - Database Reference\n\n"
-        md_content += f"**Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n"
-        md_content += "This document contains all tables and their current data from the database.\n\n"
-        md_content += "---\n\n"
-        md_content += "# Table of Contents\n\n"
-        
-        tables_to_export = [
-            ("Cities", Cities),
-            ("Customers", Customers),
-            ("Products", Products),
-            ("Stores", Stores),
-            ("Trains", Trains),
-            ("Railway Stations", RailwayStations),
-            ("Train Schedules", TrainSchedules),
-            ("Trucks", Trucks),
-            ("Routes", Routes),
-            ("Route Orders", RouteOrders),
-            ("Users", Users),
-            ("Drivers", Drivers),
-            ("Assistants", Assistants),
-            ("Orders", Orders),
-            ("Order Items", OrderItems),
-            ("Rail Allocations", RailAllocations),
-            ("Truck Allocations", TruckAllocations),
-            ("Truck Schedules", TruckSchedules),
-        ]
-        
-        # Generate table of contents
-        for table_name, _ in tables_to_export:
-            md_content += f"- [{table_name}](#{table_name.lower().replace(' ', '-')})\n"
-        
-        md_content += "\n---\n"
+    tables_to_export = [
+        ("Cities", Cities),
+        ("Customers", Customers),
+        ("Products", Products),
+        ("Stores", Stores),
+        ("Trains", Trains),
+        ("Railway Stations", RailwayStations),
+        ("Train Schedules", TrainSchedules),
+        ("Trucks", Trucks),
+        ("Routes", Routes),
+        ("Route Orders", RouteOrders),
+        ("Users", Users),
+        ("Drivers", Drivers),
+        ("Assistants", Assistants),
+        ("Orders", Orders),
+        ("Order Items", OrderItems),
+        ("Rail Allocations", RailAllocations),
+        ("Truck Allocations", TruckAllocations),
+        ("Truck Schedules", TruckSchedules),
+    ]
+    
+    # Generate table of contents
+    for table_name, _ in tables_to_export:
+        out.write(f"- [{table_name}](#{table_name.lower().replace(' ', '-')})\n")
+    
+    out.write("\n---\n")
+    
+    # Generate table data
+    for table_name, model in tables_to_export:
+        print(f"Exporting {table_name}...")
         
-        # Generate table data
-        for table_name, model in tables_to_export:
-            print(f"Exporting {table_name}...")
-            
-            # Get column names
-            mapper = inspect(model)
-            columns = [col.key for col in mapper.columns]
-            
-            # Query all rows
-            rows = db.query(model).all()
-            
-            # Convert to markdown
-            md_content += table_to_markdown(table_name, columns, rows)
+        # Get column names
+        mapper = inspect(model)
+        columns = [col.key for col in mapper.columns]
         
-        # Write to file
-        output_file = "DATABASE_REFERENCE.md"
-        with open(output_file, "w", encoding="utf-8") as f:
-            f.write(md_content)
+        # Stream rows into the markdown file
+        rows = stream_scalars(db, select(model))
+        write_table_markdown(out, table_name, columns, rows)
+    
+    print(f"Total tables exported: {len(tables_to_export)}")
+
+def main():
+    output_file = "DATABASE_REFERENCE.md"
+    
+    try:
+        with stream_session() as db, open(output_file, "w", encoding="utf-8") as out:
+            export_tables(db, out)
         
         print(f"\n✅ Database reference generated successfully: {output_file}")
-        print(f"Total tables exported: {len(tables_to_export)}")
         
     except Exception as e:
         print(f"❌ Error: {e}")
         import traceback
         traceback.print_exc()
-    finally:
-        db.close()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,52 @@
+"""
+Schema migration CLI.
+
+Usage:
+  python migrate.py upgrade [--to VERSION]   apply pending migrations
+  python migrate.py status                   list migrations and whether they are applied
+  python migrate.py stamp VERSION            mark migrations up to VERSION as applied without running them
+(Loads DB credentials from .env file)
+"""
+import sys
+import argparse
+import logging
+
+from app.core.database import engine
+from app.core.migrations import upgrade, stamp, migration_status
+
+
+def main():
+    parser = argparse.ArgumentParser(description="KandyPack schema migrations")
+    sub = parser.add_subparsers(dest="command", required=True)
+    up = sub.add_parser("upgrade", help="apply pending migrations")
+    up.add_argument("--to", type=int, default=None, help="stop after this version")
+    sub.add_parser("status", help="show migration status")
+    st = sub.add_parser("stamp", help="mark migrations as applied without running them")
+    st.add_argument("version", type=int)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    try:
+        if args.command == "upgrade":
+            applied = upgrade(engine, args.to)
+            if applied:
+                for m in applied:
+                    print(f"✓ Applied {m.version:04d}_{m.name}")
+            else:
+                print("✓ Database is up to date")
+        elif args.command == "status":
+            for row in migration_status(engine):
+                state = f"applied {row['applied_at']}" if row["applied_at"] else "pending"
+                modified = "  (modified since applied)" if row["modified"] else ""
+                print(f"  {row['version']:04d}_{row['name']:<40} {state}{modified}")
+        elif args.command == "stamp":
+            stamp(engine, args.version)
+            print(f"✓ Stamped up to version {args.version:04d}")
+    except Exception as e:
+        print(f"✗ Migration failed: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
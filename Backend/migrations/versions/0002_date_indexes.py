@@ -0,0 +1,7 @@
+"""Date indexes previously applied by hand from schemas/create_indexes.sql"""
+from app.core.migrations import create_index_if_missing
+
+
+def upgrade(conn):
+    create_index_if_missing(conn, "orders", "idx_orders_date", ["order_date"])
+    create_index_if_missing(conn, "truck_schedules", "idx_truck_schedules_date", ["scheduled_date"])
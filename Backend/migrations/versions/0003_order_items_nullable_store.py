@@ -0,0 +1,14 @@
+"""Allow order items without a store: items are written with the order and get their
+store when the order is assigned to a warehouse"""
+from sqlalchemy import text
+
+
+def upgrade(conn):
+    row = conn.execute(text("""
+        SELECT COLUMN_TYPE, IS_NULLABLE FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'order_items' AND COLUMN_NAME = 'store_id'
+    """)).first()
+    if row is None or row.IS_NULLABLE == "YES":
+        return
+    # keep the current type (CHAR(36) or BINARY(16) after migrate_uuid_binary.py)
+    conn.execute(text(f"ALTER TABLE `order_items` MODIFY COLUMN `store_id` {row.COLUMN_TYPE} NULL"))
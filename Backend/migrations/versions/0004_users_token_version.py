@@ -0,0 +1,6 @@
+"""Per-user token version for claims-carrying JWTs; bumping it revokes issued tokens"""
+from app.core.migrations import add_column_if_missing
+
+
+def upgrade(conn):
+    add_column_if_missing(conn, "users", "token_version", "INT NOT NULL DEFAULT 0")
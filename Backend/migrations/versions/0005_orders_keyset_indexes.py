@@ -0,0 +1,14 @@
+"""Composite indexes backing keyset pagination of the order lists on (order_date, order_id).
+
+Unfiltered lists (/orders for Management, /orders/history, /orders/last-mile-delivery)
+walk idx_orders_date backwards: InnoDB secondary indexes end with the primary key, so
+it already is (order_date, order_id). The filtered lists need the filter column first.
+"""
+from app.core.migrations import create_index_if_missing
+
+
+def upgrade(conn):
+    # /orders for StoreManagers: warehouse_id IN (their stores)
+    create_index_if_missing(conn, "orders", "idx_orders_warehouse_date", ["warehouse_id", "order_date", "order_id"])
+    # /orders/my-orders and the customer's /orders/last-mile-delivery: customer_id = ?
+    create_index_if_missing(conn, "orders", "idx_orders_customer_date", ["customer_id", "order_date", "order_id"])
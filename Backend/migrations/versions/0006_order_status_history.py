@@ -0,0 +1,11 @@
+"""Append-only order status history (lead-time and dwell-time reporting).
+
+Orders that existed before this migration have no history; they are left out of the
+lead-time report, which measures from an order's creation event.
+"""
+import app.core.model as model
+
+
+def upgrade(conn):
+    # creates the table with its indexes (no-op if it already exists)
+    model.OrderStatusHistory.__table__.create(bind=conn, checkfirst=True)
@@ -1,2 +1,10 @@
+-- Applied by migrations/versions/0002_date_indexes.py (python migrate.py upgrade)
 CREATE INDEX idx_orders_date ON orders(order_date);
-CREATE INDEX idx_truck_schedules_date ON truck_schedules(scheduled_date);
\ No newline at end of file
+CREATE INDEX idx_truck_schedules_date ON truck_schedules(scheduled_date);
+-- Applied by migrations/versions/0005_orders_keyset_indexes.py (keyset pagination of order lists)
+CREATE INDEX idx_orders_warehouse_date ON orders(warehouse_id, order_date, order_id);
+CREATE INDEX idx_orders_customer_date ON orders(customer_id, order_date, order_id);
+-- Created with the table by migrations/versions/0006_order_status_history.py
+CREATE INDEX idx_status_history_order ON order_status_history(order_id, changed_at);
+CREATE INDEX idx_status_history_status ON order_status_history(to_status, changed_at);
+CREATE INDEX idx_status_history_warehouse ON order_status_history(warehouse_id, changed_at);
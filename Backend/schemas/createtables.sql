@@ -4,7 +4,8 @@ CREATE TABLE users (
     user_name VARCHAR(50) NOT NULL UNIQUE,
     password_hash VARCHAR(255) NOT NULL,
     role VARCHAR(50) NOT NULL,
-    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    token_version INT NOT NULL DEFAULT 0
 );
 
 -- Customers
@@ -74,7 +75,7 @@ CREATE TABLE products (
 CREATE TABLE order_items (
     item_id CHAR(36) PRIMARY KEY,
     order_id CHAR(36) NOT NULL,
-    store_id CHAR(36) NOT NULL,
+    store_id CHAR(36),
     product_type_id CHAR(36) NOT NULL,
     quantity INT NOT NULL,
     item_price FLOAT NOT NULL,
@@ -203,3 +204,13 @@ CREATE TABLE truck_allocations (
     FOREIGN KEY (order_id) REFERENCES orders(order_id),
     FOREIGN KEY (schedule_id) REFERENCES truck_schedules(schedule_id)
 );
+
+-- Order Status History (append-only; no foreign key so it outlives deleted orders)
+CREATE TABLE order_status_history (
+    history_id CHAR(36) PRIMARY KEY,
+    order_id CHAR(36) NOT NULL,
+    from_status ENUM('PLACED','SCHEDULED_RAIL','IN_WAREHOUSE','SCHEDULED_ROAD','DELIVERED','FAILED'),
+    to_status ENUM('PLACED','SCHEDULED_RAIL','IN_WAREHOUSE','SCHEDULED_ROAD','DELIVERED','FAILED') NOT NULL,
+    warehouse_id CHAR(36),
+    changed_at DATETIME(6) NOT NULL
+);
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark: blocking Session vs AsyncSession inside `async def` handlers.
+
+Builds a tiny FastAPI app with two routes that run the same query:
+  /blocking  - async def handler using the sync Session (old pattern, blocks the event loop)
+  /async     - async def handler using get_async_db (non-blocking)
+and fires concurrent requests at each through the ASGI transport, reporting requests/sec.
+
+Usage:
+  python scripts/bench_async_db.py --requests 2000 --concurrency 50 --latency-ms 5
+(Loads DB credentials from .env file; needs a reachable MySQL with the kandypack schema)
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+
+import httpx
+from fastapi import FastAPI, Depends
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(SCRIPT_DIR)
+sys.path.insert(0, BACKEND_DIR)
+
+from app.core.database import get_db, get_async_db, async_engine  # noqa: E402
+
+
+def build_app(latency_ms: int) -> FastAPI:
+    # SLEEP() stands in for network/disk latency so the blocking effect is visible on a local DB
+    query = text("SELECT SLEEP(:delay), COUNT(*) FROM drivers")
+    params = {"delay": latency_ms / 1000}
+    bench_app = FastAPI()
+
+    @bench_app.get("/blocking")
+    async def blocking(db: Session = Depends(get_db)):
+        row = db.execute(query, params).first()
+        return {"count": row[1]}
+
+    @bench_app.get("/async")
+    async def non_blocking(db: AsyncSession = Depends(get_async_db)):
+        row = (await db.execute(query, params)).first()
+        return {"count": row[1]}
+
+    return bench_app
+
+
+async def hammer(client: httpx.AsyncClient, path: str, total: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            response = await client.get(path)
+            response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    return time.perf_counter() - start
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Compare sync vs async DB access under concurrent load")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency-ms", type=int, default=5)
+    args = parser.parse_args()
+
+    bench_app = build_app(args.latency_ms)
+    transport = httpx.ASGITransport(app=bench_app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # warm up both pools before measuring
+        await hammer(client, "/blocking", 10, 5)
+        await hammer(client, "/async", 10, 5)
+
+        print(f"Requests: {args.requests}  Concurrency: {args.concurrency}  Simulated latency: {args.latency_ms} ms")
+        for path in ("/blocking", "/async"):
+            elapsed = await hammer(client, path, args.requests, args.concurrency)
+            print(f"  {path:<10} {args.requests / elapsed:10.1f} req/s  ({elapsed:.2f}s)")
+
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-request authentication latency of get_current_user.
+
+Mounts a /whoami route that does nothing but resolve the principal and calls it
+through the ASGI transport in three modes:
+  db               sub/role token, principal cache disabled (the original behaviour)
+  principal_cache  sub/role token, principal cache on (repeat requests skip the DB)
+  claims           claims-carrying token (AUTH_CLAIMS_TOKENS), only the cached
+                   token-version check runs
+and reports p50/p99/mean latency per request.
+
+Usage:
+  python scripts/bench_auth_latency.py --username store_manager1 --requests 2000
+(Loads DB credentials from .env file; the user must exist, run `python migrate.py upgrade` first)
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import statistics
+
+import httpx
+from fastapi import FastAPI, Depends
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(SCRIPT_DIR)
+sys.path.insert(0, BACKEND_DIR)
+
+import app.core.auth as auth  # noqa: E402
+import app.core.model as model  # noqa: E402
+from app.core.database import Session_local, async_engine  # noqa: E402
+
+MODES = ["db", "principal_cache", "claims"]
+
+
+def build_app() -> FastAPI:
+    bench_app = FastAPI()
+
+    @bench_app.get("/whoami")
+    async def whoami(current_user: dict = Depends(auth.get_current_user)):
+        return current_user
+
+    return bench_app
+
+
+def mint_token(username: str, claims: bool) -> str:
+    db = Session_local()
+    try:
+        user = db.query(model.Users).filter(model.Users.user_name == username).first()
+        if user is None:
+            raise SystemExit(f"❌ User {username} not found")
+        store = db.query(model.Stores).filter(model.Stores.contact_person == user.user_id).first()
+        auth.AUTH_CLAIMS_TOKENS = claims
+        return auth.create_access_token(auth.principal_claims(
+            user, store.store_id if store else None, store.name if store else None
+        ))
+    finally:
+        db.close()
+
+
+def percentile(samples, fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def measure(client: httpx.AsyncClient, token: str, total: int):
+    headers = {"Authorization": f"Bearer {token}"}
+    samples = []
+    for _ in range(total):
+        start = time.perf_counter()
+        response = await client.get("/whoami", headers=headers)
+        samples.append((time.perf_counter() - start) * 1000)
+        response.raise_for_status()
+    return samples
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Compare per-request auth latency across token modes")
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--requests", type=int, default=1000)
+    args = parser.parse_args()
+
+    transport = httpx.ASGITransport(app=build_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        print(f"Requests per mode: {args.requests}\n")
+        print(f"  {'mode':<16} {'p50 ms':>8} {'p99 ms':>8} {'mean ms':>8}")
+        for mode in MODES:
+            token = mint_token(args.username, claims=(mode == "claims"))
+            auth.principal_cache.clear()
+            auth.principal_cache.maxsize = 0 if mode == "db" else auth.PRINCIPAL_CACHE_SIZE
+            await measure(client, token, 20)  # warm up pools and caches
+            samples = await measure(client, token, args.requests)
+            print(f"  {mode:<16} {percentile(samples, 0.5):>8.3f} {percentile(samples, 0.99):>8.3f} "
+                  f"{statistics.mean(samples):>8.3f}")
+
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
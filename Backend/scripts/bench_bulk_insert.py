@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark: rows/sec for per-object ORM adds vs app.utils.bulk.bulk_insert.
+
+Writes the same synthetic orders and order items (see seed_orders.py) with:
+  add_flush  db.add() per object, flush per order   (how create endpoints wrote rows)
+  add_all    db.add_all() for the whole set, one flush
+  bulk       bulk_insert(), one multi-row INSERT per --batch rows
+Each mode runs in its own transaction, which is rolled back, so the database is
+left unchanged.
+
+Usage:
+  python scripts/bench_bulk_insert.py --orders 5000 --items-per-order 3 --batch 500
+(Loads DB credentials from .env file; run reset_database.py first)
+"""
+
+import os
+import sys
+import time
+import argparse
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(SCRIPT_DIR)
+sys.path.insert(0, SCRIPT_DIR)
+sys.path.insert(0, BACKEND_DIR)
+
+import app.core.model as model  # noqa: E402
+from app.core.database import Session_local  # noqa: E402
+from app.utils.bulk import bulk_insert, BULK_BATCH_SIZE  # noqa: E402
+from seed_orders import order_rows  # noqa: E402
+
+MODES = ["add_flush", "add_all", "bulk"]
+
+
+def run_mode(mode: str, orders, items, batch: int) -> float:
+    db = Session_local()
+    try:
+        start = time.perf_counter()
+        if mode == "add_flush":
+            items_by_order = {}
+            for item in items:
+                items_by_order.setdefault(item["order_id"], []).append(item)
+            for order in orders:
+                db.add(model.Orders(**order))
+                db.flush()
+                for item in items_by_order[order["order_id"]]:
+                    db.add(model.OrderItems(**item))
+            db.flush()
+        elif mode == "add_all":
+            db.add_all([model.Orders(**order) for order in orders])
+            db.flush()
+            db.add_all([model.OrderItems(**item) for item in items])
+            db.flush()
+        elif mode == "bulk":
+            bulk_insert(db, model.Orders, orders, batch)
+            bulk_insert(db, model.OrderItems, items, batch)
+        return time.perf_counter() - start
+    finally:
+        db.rollback()
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-object adds with bulk inserts")
+    parser.add_argument("--orders", type=int, default=5000)
+    parser.add_argument("--items-per-order", type=int, default=3)
+    parser.add_argument("--batch", type=int, default=BULK_BATCH_SIZE, help="rows per INSERT statement")
+    args = parser.parse_args()
+
+    db = Session_local()
+    customers = [c for (c,) in db.query(model.Customers.customer_id).all()]
+    cities = [c for (c,) in db.query(model.Cities.city_id).all()]
+    products = [p for (p,) in db.query(model.Products.product_type_id).all()]
+    db.close()
+    if not (customers and cities and products):
+        print("❌ Customers, cities and products must be loaded first (run reset_database.py)")
+        return
+
+    orders, items = order_rows(args.orders, customers, cities, products, args.items_per_order)
+    rows = len(orders) + len(items)
+    print(f"🔄 Writing {len(orders)} orders + {len(items)} items per mode (rolled back)\n")
+    print(f"  {'mode':<10} {'seconds':>8} {'rows/s':>10}")
+    for mode in MODES:
+        elapsed = run_mode(mode, orders, items, args.batch)
+        print(f"  {mode:<10} {elapsed:>8.2f} {rows / elapsed:>10,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark: effect of concurrent logins on unrelated requests.
+
+Builds a tiny FastAPI app with:
+  /login-inline  verifies a pbkdf2_sha256 hash on the event loop (the old login path)
+  /login-pool    verifies through verify_and_update_password_async (password worker pool)
+  /ping          an unrelated, trivial endpoint
+For each login route, keeps --concurrency logins in flight for --seconds while timing
+sequential /ping requests, then reports how many pings completed, their p50/p99
+latency and login throughput.
+A run with no logins gives the baseline. No database is needed.
+
+Usage:
+  python scripts/bench_login_concurrency.py --concurrency 20 --seconds 5
+  PASSWORD_HASH_WORKERS=8 python scripts/bench_login_concurrency.py
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+
+import httpx
+from fastapi import FastAPI
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(SCRIPT_DIR)
+sys.path.insert(0, BACKEND_DIR)
+
+from app.core.auth import (  # noqa: E402
+    pwd_context,
+    verify_and_update_password_async,
+    PASSWORD_HASH_WORKERS,
+)
+
+PASSWORD = "password123"
+
+
+def build_app() -> FastAPI:
+    stored_hash = pwd_context.hash(PASSWORD)
+    bench_app = FastAPI()
+
+    @bench_app.post("/login-inline")
+    async def login_inline():
+        return {"valid": pwd_context.verify(PASSWORD, stored_hash)}
+
+    @bench_app.post("/login-pool")
+    async def login_pool():
+        valid, _ = await verify_and_update_password_async(PASSWORD, stored_hash)
+        return {"valid": valid}
+
+    @bench_app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    return bench_app
+
+
+def percentile(samples, fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def run(client: httpx.AsyncClient, login_path, concurrency: int, seconds: float):
+    deadline = time.perf_counter() + seconds
+    logins = 0
+
+    async def login_worker():
+        nonlocal logins
+        while time.perf_counter() < deadline:
+            (await client.post(login_path)).raise_for_status()
+            logins += 1
+
+    workers = [asyncio.create_task(login_worker()) for _ in range(concurrency if login_path else 0)]
+    pings = []
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        (await client.get("/ping")).raise_for_status()
+        pings.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(0.01)
+    await asyncio.gather(*workers)
+    return pings, logins / seconds
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Measure unrelated-request latency while logins run")
+    parser.add_argument("--concurrency", type=int, default=20, help="logins in flight")
+    parser.add_argument("--seconds", type=float, default=5)
+    args = parser.parse_args()
+
+    transport = httpx.ASGITransport(app=build_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        print(f"Concurrent logins: {args.concurrency}  Duration: {args.seconds}s  "
+              f"Password workers: {PASSWORD_HASH_WORKERS}\n")
+        print(f"  {'login path':<14} {'pings':>6} {'ping p50 ms':>12} {'ping p99 ms':>12} {'logins/s':>10}")
+        for label, path in (("none", None), ("inline", "/login-inline"), ("worker pool", "/login-pool")):
+            pings, rate = await run(client, path, args.concurrency, args.seconds)
+            print(f"  {label:<14} {len(pings):>6} {percentile(pings, 0.5):>12.2f} {percentile(pings, 0.99):>12.2f} "
+                  f"{rate:>10.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Load test: CPU cost of credential-stuffing traffic with and without login throttling.
+
+Builds a tiny FastAPI app whose /login follows the users/customers login path
+(login_throttle.check, pbkdf2 verification on the password worker pool, then
+login_throttle.failure/success) against an in-memory account table. Attackers send
+wrong passwords for --usernames accounts from --ips client addresses while one
+legitimate client logs in correctly every second from its own address. Attack
+traffic is paced at --rate requests per second, so it does not back off when the
+server slows down. For each mode (throttle off / on) it samples process CPU (all
+threads, including the in-process attack client) once per second and reports the
+per-second series, password hashes per second, response codes and whether the
+legitimate logins kept succeeding. No database is needed.
+
+Usage:
+  python scripts/bench_login_throttle.py --rate 200 --seconds 10
+  python scripts/bench_login_throttle.py --rate 500 --ips 100 --usernames 1000 --seconds 30
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+from collections import Counter
+
+import httpx
+from fastapi import FastAPI, Form, HTTPException, Request
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(SCRIPT_DIR)
+sys.path.insert(0, BACKEND_DIR)
+
+from app.core.auth import pwd_context, verify_and_update_password_async  # noqa: E402
+from app.core.login_throttle import LoginThrottle, MemoryThrottleStore, client_ip  # noqa: E402
+
+PASSWORD = "password123"
+LEGIT_USER = "legit_user"
+LEGIT_IP = "10.255.255.1"
+
+
+def build_app(throttle: LoginThrottle, usernames, stats: Counter) -> FastAPI:
+    stored_hash = pwd_context.hash(PASSWORD)
+    accounts = {name: stored_hash for name in [*usernames, LEGIT_USER]}
+    bench_app = FastAPI()
+
+    @bench_app.post("/login")
+    async def login(request: Request, username: str = Form(...), password: str = Form(...)):
+        attempt = ("users", username, client_ip(request))
+        throttle.check(*attempt)
+        valid = False
+        if username in accounts:
+            stats["hashes"] += 1
+            valid, _ = await verify_and_update_password_async(password, accounts[username])
+        if not valid:
+            throttle.failure(*attempt)
+            raise HTTPException(status_code=401, detail="Incorrect username or password")
+        throttle.success(*attempt)
+        return {"ok": True}
+
+    return bench_app
+
+
+def client_for(bench_app: FastAPI, ip: str) -> httpx.AsyncClient:
+    transport = httpx.ASGITransport(app=bench_app, client=(ip, 40000))
+    return httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None)
+
+
+async def run(throttled: bool, args):
+    stats = Counter()
+    statuses = Counter()
+    throttle = LoginThrottle(MemoryThrottleStore(), enabled=throttled)
+    usernames = [f"user{i}" for i in range(args.usernames)]
+    bench_app = build_app(throttle, usernames, stats)
+    clients = [client_for(bench_app, f"10.0.{i // 250}.{i % 250 + 1}") for i in range(args.ips)]
+    legit = client_for(bench_app, LEGIT_IP)
+    deadline = time.perf_counter() + args.seconds
+
+    async def attacker(worker: int):
+        # each worker paces itself to rate/attackers requests per second
+        interval = args.attackers / args.rate
+        next_send = time.perf_counter() + worker * interval / args.attackers
+        n = worker
+        while time.perf_counter() < deadline:
+            await asyncio.sleep(max(0.0, next_send - time.perf_counter()))
+            next_send += interval
+            client = clients[n % len(clients)]
+            response = await client.post("/login", data={"username": usernames[n % len(usernames)], "password": "wrong"})
+            statuses[response.status_code] += 1
+            n += args.attackers
+
+    async def legit_user():
+        ok = total = 0
+        while time.perf_counter() < deadline:
+            response = await legit.post("/login", data={"username": LEGIT_USER, "password": PASSWORD})
+            total += 1
+            ok += response.status_code == 200
+            await asyncio.sleep(1)
+        return ok, total
+
+    async def sample_cpu():
+        samples = []
+        last_wall, last_cpu, last_hashes = time.perf_counter(), time.process_time(), 0
+        while time.perf_counter() < deadline:
+            await asyncio.sleep(1)
+            wall, cpu = time.perf_counter(), time.process_time()
+            samples.append(((cpu - last_cpu) / (wall - last_wall) * 100, stats["hashes"] - last_hashes))
+            last_wall, last_cpu, last_hashes = wall, cpu, stats["hashes"]
+        return samples
+
+    results = await asyncio.gather(sample_cpu(), legit_user(), *(attacker(i) for i in range(args.attackers)))
+    for client in [*clients, legit]:
+        await client.aclose()
+    return results[0], results[1], statuses, throttle.counters.snapshot()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Measure CPU under credential-stuffing traffic with/without throttling")
+    parser.add_argument("--attackers", type=int, default=50, help="concurrent attacking requests")
+    parser.add_argument("--rate", type=float, default=200, help="attack requests per second (all attackers)")
+    parser.add_argument("--ips", type=int, default=10, help="distinct attacker IPs")
+    parser.add_argument("--usernames", type=int, default=50, help="distinct targeted usernames")
+    parser.add_argument("--seconds", type=float, default=10)
+    args = parser.parse_args()
+
+    print(f"Attackers: {args.attackers}  Rate: {args.rate:.0f}/s  IPs: {args.ips}  Usernames: {args.usernames}  "
+          f"Duration: {args.seconds}s\n")
+    for throttled in (False, True):
+        samples, (legit_ok, legit_total), statuses, counters = await run(throttled, args)
+        cpu = [round(c) for c, _ in samples]
+        hashes = [h for _, h in samples]
+        print(f"🔄 throttle {'on' if throttled else 'off'}")
+        print(f"  CPU % per second:    {cpu}")
+        print(f"  hashes per second:   {hashes}")
+        print(f"  mean CPU %: {sum(cpu) / len(cpu):.0f}  max CPU %: {max(cpu)}  "
+              f"mean hashes/s: {sum(hashes) / len(hashes):.1f}")
+        print(f"  responses: {dict(sorted(statuses.items()))}")
+        if throttled:
+            print(f"  throttle counters: { {k: v for k, v in counters.items() if v} }")
+        mark = "✓" if legit_ok == legit_total else "❌"
+        print(f"  {mark} legitimate logins: {legit_ok}/{legit_total}\n")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark: bulk order import throughput (orders per minute on one worker).
+
+Generates --orders synthetic orders for existing customers, cities and products as
+an in-memory CSV or NDJSON file (--items-per-order lines each, --invalid percent of
+them referencing an unknown product) and runs it through the POST /orders/import
+path (app.utils.order_import) for each --chunk size, reporting orders/minute and the
+report counts. Everything runs inside one outer transaction that is rolled back (each
+chunk's commit only releases a savepoint), so the database is left unchanged.
+
+Usage:
+  python scripts/bench_order_import.py --orders 20000 --items-per-order 3 --format csv
+  python scripts/bench_order_import.py --orders 20000 --format ndjson --chunk 250,1000,5000 --invalid 1
+(Loads DB credentials from .env file; needs at least one customer, city and product)
+"""
+
+import io
+import os
+import sys
+import csv
+import json
+import time
+import random
+import argparse
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(SCRIPT_DIR)
+sys.path.insert(0, BACKEND_DIR)
+
+import app.core.model as model  # noqa: E402
+from app.core.database import engine  # noqa: E402
+from app.utils.order_import import CSV_COLUMNS, OrderImporter, parse_csv, parse_ndjson  # noqa: E402
+
+
+def build_file(file_format: str, orders: int, items_per_order: int, invalid: float,
+               customer_ids, city_ids, product_ids) -> bytes:
+    rng = random.Random(42)
+    order_date = (datetime.now() + timedelta(days=10)).isoformat(timespec="seconds")
+    out = io.StringIO()
+    writer = csv.writer(out)
+    if file_format == "csv":
+        writer.writerow(CSV_COLUMNS)
+    for n in range(orders):
+        customer_id, city_id = rng.choice(customer_ids), rng.choice(city_ids)
+        items = [{"product_type_id": rng.choice(product_ids), "quantity": rng.randint(1, 5),
+                  "unit_price": round(rng.uniform(50, 500), 2)} for _ in range(items_per_order)]
+        if rng.random() * 100 < invalid:
+            items[0]["product_type_id"] = "missing-product"
+        if file_format == "csv":
+            for item in items:
+                writer.writerow([f"PO-{n}", customer_id, order_date, f"{n} Bench Road", city_id,
+                                 item["product_type_id"], item["quantity"], item["unit_price"]])
+        else:
+            out.write(json.dumps({"order_ref": f"PO-{n}", "customer_id": customer_id, "order_date": order_date,
+                                  "deliver_address": f"{n} Bench Road", "deliver_city_id": city_id,
+                                  "items": items}) + "\n")
+    return out.getvalue().encode("utf-8")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure bulk order import throughput")
+    parser.add_argument("--orders", type=int, default=20000)
+    parser.add_argument("--items-per-order", type=int, default=3)
+    parser.add_argument("--format", choices=["csv", "ndjson"], default="csv")
+    parser.add_argument("--chunk", default="1000", help="comma-separated chunk sizes (orders per transaction)")
+    parser.add_argument("--invalid", type=float, default=0, help="percent of orders with an unknown product")
+    args = parser.parse_args()
+
+    with engine.connect() as conn:
+        outer = conn.begin()
+        db = Session(bind=conn, join_transaction_mode="create_savepoint")
+        try:
+            customer_ids = [str(c) for c in db.scalars(select(model.Customers.customer_id).limit(1000))]
+            city_ids = [str(c.city_id) for c in db.query(model.Cities).all()]
+            product_ids = [str(p.product_type_id) for p in db.query(model.Products).all()]
+            if not (customer_ids and city_ids and product_ids):
+                print("❌ Need at least one customer, city and product in the database")
+                return
+            data = build_file(args.format, args.orders, args.items_per_order, args.invalid,
+                              customer_ids, city_ids, product_ids)
+            print(f"Orders: {args.orders}  Items/order: {args.items_per_order}  Format: {args.format}  "
+                  f"File: {len(data) / 1e6:.1f} MB  Invalid: {args.invalid}%\n")
+            parse = parse_csv if args.format == "csv" else parse_ndjson
+
+            for chunk in [int(c) for c in args.chunk.split(",")]:
+                print(f"🔄 chunk {chunk}")
+                start = time.perf_counter()
+                report = OrderImporter(db, chunk_size=chunk).run(parse(io.BytesIO(data)))
+                elapsed = time.perf_counter() - start
+                print(f"  {elapsed:.2f}s  {report['orders_created'] / elapsed * 60:,.0f} orders/min  "
+                      f"created {report['orders_created']}  rejected {report['orders_rejected']}")
+            print("\n✓ Done (all orders rolled back)")
+        finally:
+            db.close()
+            outer.rollback()
+
+
+if __name__ == "__main__":
+    main()
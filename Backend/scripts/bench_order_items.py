@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Benchmark: create-with-items latency by order line-item count.
+
+For each line-item count, creates --repeat orders for an existing customer with:
+  per_item  one Products query and one ORM add per line, total summed separately
+            (how orders.create_order_with_items used to validate and write items)
+  batched   orders.create_order_with_items itself: products validated with one
+            reference_cache.get_many call (one IN query for uncached ids), item rows
+            and the total built in one pass, items written in one multi-row INSERT
+and reports the median latency and the SQL statements issued per order. Lines cycle
+through the existing products. Everything runs inside one outer transaction that
+is rolled back (the handler's commit only releases a savepoint), so the database
+is left unchanged.
+
+Usage:
+  python scripts/bench_order_items.py --items 1,10,100,500 --repeat 5
+(Loads DB credentials from .env file; needs at least one customer, city and product)
+"""
+
+import os
+import sys
+import time
+import argparse
+import statistics
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(SCRIPT_DIR)
+sys.path.insert(0, BACKEND_DIR)
+
+import app.core.model as model  # noqa: E402
+import app.core.schemas as schemas  # noqa: E402
+from app.api.orders import create_order_with_items  # noqa: E402
+from app.core.database import engine  # noqa: E402
+from app.core.reference_cache import reference_cache  # noqa: E402
+
+MODES = ["per_item", "batched"]
+
+
+def per_item(order_data, db, customer_id):
+    for item in order_data.items:
+        if not db.query(model.Products).filter(model.Products.product_type_id == item.product_type_id).first():
+            raise RuntimeError(f"Product {item.product_type_id} not found")
+    total_price = sum(item.quantity * item.unit_price for item in order_data.items)
+    new_order = model.Orders(
+        customer_id=customer_id,
+        order_date=order_data.order_date,
+        deliver_address=order_data.deliver_address,
+        deliver_city_id=order_data.deliver_city_id,
+        full_price=total_price,
+        status=model.OrderStatus.PLACED,
+    )
+    db.add(new_order)
+    db.flush()
+    for item in order_data.items:
+        db.add(model.OrderItems(
+            order_id=new_order.order_id,
+            store_id=None,
+            product_type_id=item.product_type_id,
+            quantity=item.quantity,
+            item_price=item.unit_price,
+        ))
+    db.commit()
+    db.refresh(new_order)
+    return new_order
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure create-with-items latency by line-item count")
+    parser.add_argument("--items", default="1,10,100,500", help="comma-separated line-item counts")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with engine.connect() as conn:
+        outer = conn.begin()
+        statements = [0]
+        event.listen(conn, "before_cursor_execute", lambda *_: statements.__setitem__(0, statements[0] + 1))
+        db = Session(bind=conn, join_transaction_mode="create_savepoint")
+        try:
+            customer = db.query(model.Customers).first()
+            city = db.query(model.Cities).first()
+            product_ids = [p.product_type_id for p in db.query(model.Products).all()]
+            if not (customer and city and product_ids):
+                print("❌ Need at least one customer, city and product in the database")
+                return
+            current_user = {"user_id": customer.customer_id, "role": "Customer"}
+            reference_cache.warm(db)
+            print(f"Products: {len(product_ids)}  Repeats: {args.repeat}\n")
+            print(f"  {'items':>6} {'per_item ms':>12} {'stmts':>6} {'batched ms':>11} {'stmts':>6} {'speedup':>8}")
+
+            for count in [int(n) for n in args.items.split(",")]:
+                order_data = schemas.CreateOrderWithItems(
+                    order_date=datetime.now() + timedelta(days=10),
+                    deliver_address="1 Bench Road",
+                    deliver_city_id=city.city_id,
+                    items=[
+                        {"product_type_id": product_ids[i % len(product_ids)], "quantity": 2, "unit_price": 150.0}
+                        for i in range(count)
+                    ],
+                )
+                results = {}
+                for mode in MODES:
+                    samples = []
+                    for _ in range(args.repeat):
+                        statements[0] = 0
+                        start = time.perf_counter()
+                        if mode == "per_item":
+                            per_item(order_data, db, customer.customer_id)
+                        else:
+                            create_order_with_items(order_data, db, current_user)
+                        samples.append((time.perf_counter() - start) * 1000)
+                    results[mode] = (statistics.median(samples), statements[0])
+                (slow_ms, slow_stmts), (fast_ms, fast_stmts) = results["per_item"], results["batched"]
+                print(f"  {count:>6} {slow_ms:>12.2f} {slow_stmts:>6} {fast_ms:>11.2f} {fast_stmts:>6} "
+                      f"{slow_ms / fast_ms:>7.1f}x")
+            print("\n✓ Done (all orders rolled back)")
+        finally:
+            db.close()
+            outer.rollback()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark: deep-page latency of OFFSET vs keyset pagination on the orders table.
+
+For each page depth, fetches one page of --limit orders (newest first on
+order_date, order_id) with:
+  offset  ORDER BY order_date DESC, order_id DESC LIMIT :limit OFFSET :depth * :limit
+  keyset  the same page via app.utils.pagination (WHERE (order_date, order_id) < cursor)
+and reports the median latency of --repeat runs. Both modes must return the same
+rows. With --warehouse the page is restricted to one warehouse (the StoreManager
+list, served by idx_orders_warehouse_date); the default is the unfiltered list.
+
+Usage:
+  python scripts/bench_pagination.py --limit 50 --depths 1,10,100,1000 --repeat 5
+  python scripts/bench_pagination.py --warehouse <store_id>
+(Loads DB credentials from .env file; seed volume with scripts/seed_orders.py and
+run `python migrate.py upgrade` first)
+"""
+
+import os
+import sys
+import time
+import argparse
+import statistics
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(SCRIPT_DIR)
+sys.path.insert(0, BACKEND_DIR)
+
+import app.core.model as model  # noqa: E402
+from app.core.database import Session_local  # noqa: E402
+from app.utils.pagination import PageParams, paginate, split_page  # noqa: E402
+
+
+def base_query(db, warehouse):
+    query = db.query(model.Orders.order_id, model.Orders.order_date)
+    if warehouse:
+        query = query.filter(model.Orders.warehouse_id == warehouse)
+    return query
+
+
+def offset_page(db, warehouse, limit: int, depth: int):
+    return (
+        base_query(db, warehouse)
+        .order_by(model.Orders.order_date.desc(), model.Orders.order_id.desc())
+        .offset(depth * limit).limit(limit).all()
+    )
+
+
+def keyset_page(db, warehouse, page: PageParams):
+    rows = paginate(base_query(db, warehouse), page, model.Orders.order_date, model.Orders.order_id).all()
+    return split_page(rows, page)[0]
+
+
+def timed(fn, repeat: int):
+    samples, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare OFFSET and keyset pagination latency by page depth")
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--depths", default="1,10,100,1000", help="comma-separated page numbers (0 = first page)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--warehouse", help="restrict to one warehouse_id")
+    args = parser.parse_args()
+
+    db = Session_local()
+    try:
+        total = base_query(db, args.warehouse).count()
+        print(f"Orders: {total}  Page size: {args.limit}  Repeats: {args.repeat}\n")
+        print(f"  {'page':>6} {'offset ms':>10} {'keyset ms':>10} {'speedup':>8}")
+        for depth in [int(d) for d in args.depths.split(",")]:
+            if depth * args.limit >= total:
+                print(f"  {depth:>6}  (beyond the last page)")
+                continue
+            # the cursor a client would hold after reading the previous page
+            after = None
+            if depth:
+                last = offset_page(db, args.warehouse, 1, depth * args.limit - 1)[0]
+                after = (last.order_date, last.order_id)
+            page = PageParams(args.limit, after, False)
+
+            offset_ms, offset_rows = timed(lambda: offset_page(db, args.warehouse, args.limit, depth), args.repeat)
+            keyset_ms, keyset_rows = timed(lambda: keyset_page(db, args.warehouse, page), args.repeat)
+            if [r.order_id for r in offset_rows] != [r.order_id for r in keyset_rows]:
+                print(f"❌ page {depth}: keyset and offset returned different rows")
+                return
+            print(f"  {depth:>6} {offset_ms:>10.2f} {keyset_ms:>10.2f} {offset_ms / keyset_ms:>7.1f}x")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Benchmark: peak memory of buffered vs streamed reads over a large orders table.
+
+Fills a scratch table shaped like `orders` (default 1,000,000 rows, built by repeated
+INSERT ... SELECT doubling) and reads every row in a fresh subprocess per mode:
+  all          db.execute(select(...)).all()      (the old pattern)
+  stream       app.utils.streaming.stream_query    (server-side cursor + yield_per)
+  stream_json  stream_query through json_array_response, draining the response body
+  ndjson       stream_query through ndjson_response (the /orders/export encoder)
+  csv_gzip     stream_query through csv_response with streaming gzip compression
+Reports elapsed time and peak RSS growth over the process baseline for each mode.
+The scratch table is dropped afterwards unless --keep is given.
+
+Usage:
+  python scripts/bench_stream_memory.py --rows 1000000 --batch 1000
+(Loads DB credentials from .env file; needs a reachable MySQL)
+"""
+
+import os
+import sys
+import time
+import asyncio
+import resource
+import argparse
+import subprocess
+
+from sqlalchemy import MetaData, Table, select, text
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(SCRIPT_DIR)
+sys.path.insert(0, BACKEND_DIR)
+
+from app.core.database import engine, Session_local  # noqa: E402
+from app.utils.streaming import stream_query, json_array_response, ndjson_response, csv_response  # noqa: E402
+
+TABLE = "bench_stream_orders"
+MODES = ["all", "stream", "stream_json", "ndjson", "csv_gzip"]
+
+
+def fill_table(rows: int) -> None:
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS `{TABLE}`"))
+        conn.execute(text(f"""
+            CREATE TABLE `{TABLE}` (
+                order_id CHAR(36) PRIMARY KEY,
+                customer_id CHAR(36) NOT NULL,
+                order_date DATETIME NOT NULL,
+                deliver_address VARCHAR(200) NOT NULL,
+                deliver_city_id CHAR(36) NOT NULL,
+                full_price FLOAT NOT NULL,
+                status VARCHAR(20) NOT NULL
+            ) ENGINE=InnoDB
+        """))
+        conn.execute(text(f"""
+            INSERT INTO `{TABLE}` VALUES
+            (UUID(), UUID(), NOW(), '42 Peradeniya Road, Kandy', UUID(), 1250.0, 'PLACED')
+        """))
+        count = 1
+        while count < rows:
+            conn.execute(text(f"""
+                INSERT INTO `{TABLE}`
+                SELECT UUID(), customer_id, order_date - INTERVAL FLOOR(RAND() * 365) DAY,
+                       deliver_address, deliver_city_id, full_price + RAND() * 100, status
+                FROM `{TABLE}` LIMIT :n
+            """), {"n": min(count, rows - count)})
+            count = conn.execute(text(f"SELECT COUNT(*) FROM `{TABLE}`")).scalar()
+
+
+def max_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_mode(mode: str, batch: int) -> None:
+    orders = Table(TABLE, MetaData(), autoload_with=engine)
+    query = select(orders)
+    db = Session_local()
+    db.execute(text("SELECT 1"))
+    baseline = max_rss_mb()
+    start = time.perf_counter()
+    count = 0
+
+    if mode == "all":
+        for _ in db.execute(query).all():
+            count += 1
+    elif mode == "stream":
+        for _ in stream_query(db, query, batch):
+            count += 1
+    else:
+        rows = stream_query(db, query, batch)
+        if mode == "stream_json":
+            response = json_array_response(rows, serialize=lambda row: row._asdict(), chunk_size=batch)
+        elif mode == "ndjson":
+            response = ndjson_response(rows, serialize=lambda row: row._asdict(), chunk_size=batch)
+        else:
+            response = csv_response(rows, [column.name for column in orders.columns], chunk_size=batch,
+                                    compress=True)
+
+        async def drain():
+            size = 0
+            async for chunk in response.body_iterator:
+                size += len(chunk)
+            return size
+
+        asyncio.run(drain())
+        count = -1
+
+    elapsed = time.perf_counter() - start
+    db.close()
+    print(f"{mode} {count} {elapsed:.2f} {max_rss_mb() - baseline:.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare buffered and streamed reads")
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--batch", type=int, default=1000, help="yield_per batch size")
+    parser.add_argument("--keep", action="store_true", help="keep the scratch table")
+    parser.add_argument("--reuse", action="store_true", help="reuse an existing scratch table")
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        run_mode(args.mode, args.batch)
+        return
+
+    if not args.reuse:
+        print(f"🔄 Filling {TABLE} with {args.rows} rows...")
+        fill_table(args.rows)
+
+    print(f"\n  {'mode':<12} {'seconds':>8} {'peak RSS growth MB':>19}")
+    try:
+        for mode in MODES:
+            out = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--mode", mode, "--batch", str(args.batch)],
+                capture_output=True, text=True, check=True,
+            ).stdout.split()
+            print(f"  {mode:<12} {float(out[2]):>8.2f} {float(out[3]):>19.1f}")
+    finally:
+        if not args.keep:
+            with engine.begin() as conn:
+                conn.execute(text(f"DROP TABLE IF EXISTS `{TABLE}`"))
+
+
+if __name__ == "__main__":
+    main()
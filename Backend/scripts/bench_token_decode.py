@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: per-request JWT verification cost with and without the token cache.
+
+Mints one access token and times, per call:
+  jwt.decode           python-jose signature check + claims validation (no cache)
+  decode_access_token  with the decoded-token cache disabled (digest + decode)
+  decode_access_token  with the cache warm (digest + lookup)
+No database is needed.
+
+Usage:
+  python scripts/bench_token_decode.py --iterations 100000
+"""
+
+import os
+import sys
+import timeit
+import argparse
+
+from jose import jwt
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(SCRIPT_DIR)
+sys.path.insert(0, BACKEND_DIR)
+
+import app.core.auth as auth  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time JWT verification with and without the token cache")
+    parser.add_argument("--iterations", type=int, default=50000)
+    args = parser.parse_args()
+
+    token = auth.create_access_token({"sub": "01890000-0000-7000-8000-000000000000", "role": "StoreManager",
+                                      "name": "store_manager1", "ver": 0})
+
+    def uncached():
+        auth.token_cache.maxsize = 0
+        auth.token_cache.clear()
+
+    def cached():
+        auth.token_cache.maxsize = auth.TOKEN_CACHE_SIZE
+        auth.decode_access_token(token)
+
+    cases = [
+        ("jwt.decode", lambda: jwt.decode(token, auth.SECRET_KEY, algorithms=[auth.ALGORITHM]), None),
+        ("decode (cache off)", lambda: auth.decode_access_token(token), uncached),
+        ("decode (cache warm)", lambda: auth.decode_access_token(token), cached),
+    ]
+    print(f"Iterations: {args.iterations}\n")
+    print(f"  {'case':<22} {'us/call':>9} {'calls/s':>12}")
+    for label, call, setup in cases:
+        if setup:
+            setup()
+        seconds = timeit.timeit(call, number=args.iterations)
+        per_call = seconds / args.iterations * 1e6
+        print(f"  {label:<22} {per_call:>9.2f} {args.iterations / seconds:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
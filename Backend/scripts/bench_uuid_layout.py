@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark: insert throughput and index size for UUID primary key layouts.
+
+Creates scratch tables shaped like order_items (UUID primary key, a UUID foreign-key
+style secondary index, a few payload columns) and inserts the same number of rows into:
+  char36_uuid4   CHAR(36) + random uuid4   (the original layout)
+  char36_uuid7   CHAR(36) + time-ordered uuid7
+  binary16_uuid7 BINARY(16) + time-ordered uuid7   (DB_UUID_STORAGE=binary)
+then reports rows/sec plus data and index size. Scratch tables are dropped afterwards.
+
+Usage:
+  python scripts/bench_uuid_layout.py --rows 200000 --batch 1000
+(Loads DB credentials from .env file; needs a reachable MySQL)
+"""
+
+import os
+import sys
+import time
+import uuid
+import random
+import argparse
+
+from sqlalchemy import text
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(SCRIPT_DIR)
+sys.path.insert(0, BACKEND_DIR)
+
+from app.core.database import engine  # noqa: E402
+from app.core.uuid_type import uuid7  # noqa: E402
+
+LAYOUTS = {
+    "char36_uuid4": ("CHAR(36)", lambda: str(uuid.uuid4())),
+    "char36_uuid7": ("CHAR(36)", lambda: str(uuid7())),
+    "binary16_uuid7": ("BINARY(16)", lambda: uuid7().bytes),
+}
+
+
+def run_layout(name: str, column_type: str, new_id, rows: int, batch: int, parents):
+    table = f"bench_uuid_{name}"
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS `{table}`"))
+        conn.execute(text(f"""
+            CREATE TABLE `{table}` (
+                item_id {column_type} PRIMARY KEY,
+                order_id {column_type} NOT NULL,
+                quantity INT NOT NULL,
+                item_price FLOAT NOT NULL,
+                INDEX idx_order (order_id)
+            ) ENGINE=InnoDB
+        """))
+
+    insert = text(f"INSERT INTO `{table}` (item_id, order_id, quantity, item_price) VALUES (:i, :o, :q, :p)")
+    start = time.perf_counter()
+    for offset in range(0, rows, batch):
+        params = [
+            {"i": new_id(), "o": random.choice(parents), "q": random.randint(1, 20), "p": random.uniform(10, 500)}
+            for _ in range(min(batch, rows - offset))
+        ]
+        with engine.begin() as conn:
+            conn.execute(insert, params)
+    elapsed = time.perf_counter() - start
+
+    with engine.begin() as conn:
+        conn.execute(text(f"ANALYZE TABLE `{table}`"))
+        data_len, index_len = conn.execute(text("""
+            SELECT DATA_LENGTH, INDEX_LENGTH FROM information_schema.TABLES
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :t
+        """), {"t": table}).one()
+        conn.execute(text(f"DROP TABLE `{table}`"))
+    return rows / elapsed, data_len, index_len
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare UUID key layouts")
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--batch", type=int, default=1000)
+    parser.add_argument("--parents", type=int, default=20000, help="distinct order_id values")
+    args = parser.parse_args()
+
+    print(f"🔄 Inserting {args.rows} rows per layout in batches of {args.batch}...\n")
+    print(f"  {'layout':<16} {'rows/sec':>10} {'data MB':>9} {'index MB':>9}")
+    for name, (column_type, new_id) in LAYOUTS.items():
+        parents = [new_id() for _ in range(args.parents)]
+        rate, data_len, index_len = run_layout(name, column_type, new_id, args.rows, args.batch, parents)
+        print(f"  {name:<16} {rate:>10.0f} {data_len / 2**20:>9.1f} {index_len / 2**20:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
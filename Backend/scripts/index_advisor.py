@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+"""
+Workload-driven index advisor.
+
+Collects a workload, runs EXPLAIN on every distinct statement shape, and looks for
+full table scans (type=ALL), full index scans (type=index) and filesorts/temporary
+tables. For each one it proposes an index from the statement's predicates:
+equality/IN columns first, then one range column, then ORDER BY/GROUP BY columns,
+then (when only a couple more are needed) the selected columns to make it covering.
+Proposals already served by an existing index prefix are dropped.
+
+Estimated benefit per proposal:
+  rows examined now (EXPLAIN rows) - rows / distinct(equality prefix) [x 0.3 with a range]
+multiplied by how often the statement shape occurs in the workload.
+
+Workload sources:
+  --log FILE         NDJSON captured with DB_STATEMENT_CAPTURE_FILE (see app/core/query_stats.py)
+                     or a plain .sql file of ;-separated statements
+  --replay-endpoints run GET endpoints in-process (default list below or --endpoint ...)
+                     as --username and capture what they execute
+
+Writes migrations/versions/NNNN_<name>.py with create_index_if_missing() calls unless --dry-run.
+
+Usage:
+  DB_STATEMENT_CAPTURE_FILE=statements.ndjson uvicorn app.main:app   (exercise the app, then)
+  python scripts/index_advisor.py --log statements.ndjson
+  python scripts/index_advisor.py --replay-endpoints --username admin --dry-run
+(Loads DB credentials from .env file; needs a reachable MySQL with representative data)
+"""
+
+import os
+import re
+import sys
+import json
+import asyncio
+import argparse
+from collections import defaultdict
+from datetime import date
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(SCRIPT_DIR)
+sys.path.insert(0, BACKEND_DIR)
+
+from app.core.database import engine  # noqa: E402
+from app.core.query_stats import normalize_sql  # noqa: E402
+from app.core.migrations import VERSIONS_DIR, latest_version  # noqa: E402
+
+DEFAULT_ENDPOINTS = [
+    "/orders/", "/orders/history", "/allocations/", "/truckSchedules/", "/trainSchedules/",
+    "/stores/", "/routes/", "/drivers/", "/assistants/", "/users/store-managers/list",
+]
+EXPLAINABLE = ("SELECT", "UPDATE", "DELETE")
+IGNORED_TABLES = {"schema_migrations", "proc_migrations"}
+RANGE_SELECTIVITY = 0.3      # assumed fraction of the equality-matched rows a range keeps
+MAX_INDEX_COLUMNS = 5
+SQL_KEYWORDS = {"WHERE", "ON", "LEFT", "RIGHT", "INNER", "OUTER", "JOIN", "CROSS", "ORDER", "GROUP",
+                "LIMIT", "FOR", "HAVING", "USING", "SET", "UNION", "STRAIGHT_JOIN", "NATURAL"}
+
+_REF = r"(?:`?(\w+)`?\.)?`?(\w+)`?"
+_VALUE = r"(?:%\(\w+\)s|%s|\?|'[^']*'|-?\d+(?:\.\d+)?|" + _REF.replace("(\\w+)", "\\w+") + r")"
+_EQUALITY = re.compile(_REF + r"\s*=\s*" + _VALUE)
+_REVERSED_EQUALITY = re.compile(r"(?:%\(\w+\)s|%s|\?)\s*=\s*" + _REF)
+_IN = re.compile(_REF + r"\s+IN\s*\(", re.IGNORECASE)
+_RANGE = re.compile(_REF + r"\s*(?:<=|>=|<|>|\s+BETWEEN\s|\s+LIKE\s)", re.IGNORECASE)
+_TABLE_REF = re.compile(r"\b(?:FROM|JOIN|UPDATE)\s+`?(\w+)`?(?:\s+(?:AS\s+)?`?(\w+)`?)?", re.IGNORECASE)
+_ORDER_BY = re.compile(r"\b(?:ORDER|GROUP)\s+BY\s+(.+?)(?:\bLIMIT\b|\bFOR\b|\bHAVING\b|\bORDER\b|$)", re.IGNORECASE | re.S)
+_SELECT_LIST = re.compile(r"^\s*SELECT\s+(.+?)\s+FROM\s", re.IGNORECASE | re.S)
+
+
+# Workload -----------------------------------------------------------------------
+
+def _decode_parameter(value):
+    if isinstance(value, dict) and set(value) == {"__hex__"}:
+        return bytes.fromhex(value["__hex__"])
+    return value
+
+
+def load_log(path: str):
+    statements = []
+    with open(path, encoding="utf-8") as f:
+        content = f.read()
+    if content.lstrip().startswith("{"):
+        for line in content.splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line, object_hook=_decode_parameter)
+            params = record.get("parameters")
+            if isinstance(params, list):
+                params = tuple(params)
+            statements.append((record["statement"], params, record.get("route")))
+    else:
+        for statement in content.split(";"):
+            lines = [l for l in statement.splitlines() if not l.strip().startswith("--")]
+            statement = "\n".join(lines).strip()
+            if statement:
+                statements.append((statement, None, None))
+    return statements
+
+
+async def _hit_endpoints(app, endpoints, token):
+    import httpx
+    transport = httpx.ASGITransport(app=app)
+    headers = {"Authorization": f"Bearer {token}"}
+    async with httpx.AsyncClient(transport=transport, base_url="http://advisor") as client:
+        for path in endpoints:
+            response = await client.get(path, headers=headers)
+            mark = "✓" if response.status_code < 400 else "✗"
+            print(f"  {mark} GET {path} -> {response.status_code}")
+
+
+def replay_endpoints(endpoints, username: str):
+    from app.main import app
+    from app.core.auth import create_access_token
+    from app.core.database import Session_local
+    import app.core.model as model
+
+    with Session_local() as db:
+        user = db.query(model.Users).filter(model.Users.user_name == username).first()
+        if user is None:
+            raise SystemExit(f"✗ No user named {username!r}")
+        token = create_access_token(data={"sub": user.user_id, "role": user.role})
+
+    statements = []
+
+    def _collect(conn, cursor, statement, parameters, context, executemany):
+        if not executemany:
+            statements.append((statement, parameters, None))
+
+    event.listen(Engine, "before_cursor_execute", _collect)
+    try:
+        print(f"🔄 Replaying {len(endpoints)} endpoints as {username}...")
+        asyncio.run(_hit_endpoints(app, endpoints, token))
+    finally:
+        event.remove(Engine, "before_cursor_execute", _collect)
+    return statements
+
+
+def group_by_shape(statements):
+    shapes = {}
+    for statement, params, route in statements:
+        if not statement.lstrip().upper().startswith(EXPLAINABLE):
+            continue
+        shape = normalize_sql(statement)
+        entry = shapes.setdefault(shape, {"count": 0, "statement": statement, "parameters": params, "routes": set()})
+        entry["count"] += 1
+        if route:
+            entry["routes"].add(route)
+    return shapes
+
+
+# Statement analysis ---------------------------------------------------------------
+
+def table_aliases(statement: str):
+    """alias -> table for every FROM/JOIN/UPDATE reference"""
+    aliases = {}
+    for table, alias in _TABLE_REF.findall(statement):
+        if alias and alias.upper() not in SQL_KEYWORDS:
+            aliases[alias] = table
+        aliases.setdefault(table, table)
+    return aliases
+
+
+def _columns_for(matches, alias, single_table):
+    columns = []
+    for qualifier, column in matches:
+        if qualifier == alias or (not qualifier and single_table):
+            if column not in columns:
+                columns.append(column)
+    return columns
+
+
+def predicate_columns(statement: str, alias: str, single_table: bool):
+    equality = _columns_for(_EQUALITY.findall(statement), alias, single_table)
+    equality += [c for c in _columns_for(_REVERSED_EQUALITY.findall(statement), alias, single_table) if c not in equality]
+    equality += [c for c in _columns_for(_IN.findall(statement), alias, single_table) if c not in equality]
+    ranges = [c for c in _columns_for(_RANGE.findall(statement), alias, single_table) if c not in equality]
+    ordering = []
+    for clause in _ORDER_BY.findall(statement):
+        refs = re.findall(_REF, re.sub(r"\b(?:ASC|DESC)\b", "", clause, flags=re.IGNORECASE))
+        ordering += [c for c in _columns_for(refs, alias, single_table) if c not in ordering]
+    selected = []
+    select_list = _SELECT_LIST.search(statement)
+    if select_list:
+        selected = _columns_for(re.findall(_REF, select_list.group(1)), alias, single_table)
+    return equality, ranges, ordering, selected
+
+
+def propose_columns(equality, ranges, ordering, selected, table_columns):
+    equality = [c for c in equality if c in table_columns]
+    ranges = [c for c in ranges if c in table_columns]
+    ordering = [c for c in ordering if c in table_columns]
+    columns = list(equality)
+    if ranges:
+        columns.append(ranges[0])
+        # an ORDER BY can only use the index if it continues from the range column
+        if ordering and ordering[0] == ranges[0]:
+            columns += [c for c in ordering[1:] if c not in columns]
+    else:
+        columns += [c for c in ordering if c not in columns]
+    selected = [c for c in selected if c in table_columns and c not in columns]
+    covering = 0 < len(selected) <= 2 and len(columns) + len(selected) <= MAX_INDEX_COLUMNS
+    if covering:
+        columns += selected
+    return columns[:MAX_INDEX_COLUMNS], covering and len(columns) <= MAX_INDEX_COLUMNS
+
+
+# Database lookups -------------------------------------------------------------------
+
+def explain(conn, statement: str, params):
+    return conn.exec_driver_sql("EXPLAIN " + statement, params or ()).mappings().all()
+
+
+def table_columns(conn, table: str):
+    return {row[0] for row in conn.execute(text("""
+        SELECT COLUMN_NAME FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :t
+    """), {"t": table})}
+
+
+def existing_indexes(conn, table: str):
+    indexes = defaultdict(list)
+    for name, column in conn.execute(text("""
+        SELECT INDEX_NAME, COLUMN_NAME FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :t
+        ORDER BY INDEX_NAME, SEQ_IN_INDEX
+    """), {"t": table}):
+        indexes[name].append(column)
+    return list(indexes.values())
+
+
+def table_rows(conn, table: str) -> int:
+    return conn.execute(text(f"SELECT COUNT(*) FROM `{table}`")).scalar() or 0
+
+
+def distinct_count(conn, table: str, columns) -> int:
+    if not columns:
+        return 1
+    column_list = ", ".join(f"`{c}`" for c in columns)
+    return conn.execute(text(f"SELECT COUNT(DISTINCT {column_list}) FROM `{table}`")).scalar() or 1
+
+
+# Advisor ------------------------------------------------------------------------------
+
+def _is_problem(row) -> bool:
+    extra = row.get("Extra") or ""
+    return row.get("type") in ("ALL", "index") or "filesort" in extra or "temporary" in extra
+
+
+def analyze(shapes, min_rows: int):
+    proposals = {}
+    cache = {}
+    with engine.connect() as conn:
+        for shape, entry in shapes.items():
+            try:
+                plan = explain(conn, entry["statement"], entry["parameters"])
+            except Exception as e:
+                print(f"  ✗ EXPLAIN failed ({e.__class__.__name__}): {shape[:100]}")
+                continue
+            aliases = table_aliases(entry["statement"])
+            single_table = len(set(aliases.values())) == 1
+            for row in plan:
+                alias = row.get("table") or ""
+                table = aliases.get(alias, alias)
+                if alias.startswith("<") or table in IGNORED_TABLES or not _is_problem(row):
+                    continue
+                if row.get("type") in ("ALL", "index") and (row.get("rows") or 0) < min_rows:
+                    continue
+                if table not in cache:
+                    cache[table] = {"columns": table_columns(conn, table), "indexes": existing_indexes(conn, table),
+                                    "rows": table_rows(conn, table)}
+                info = cache[table]
+                equality, ranges, ordering, selected = predicate_columns(entry["statement"], alias, single_table)
+                columns, covering = propose_columns(equality, ranges, ordering, selected, info["columns"])
+                if not columns or any(index[:len(columns)] == columns for index in info["indexes"]):
+                    continue
+
+                equality_prefix = [c for c in columns if c in equality]
+                estimated = info["rows"] / distinct_count(conn, table, equality_prefix)
+                if ranges and ranges[0] in columns:
+                    estimated *= RANGE_SELECTIVITY
+                examined = row.get("rows") or info["rows"]
+                saved = max(examined - estimated, 0) * entry["count"]
+
+                key = (table, tuple(columns))
+                proposal = proposals.setdefault(key, {
+                    "table": table, "columns": columns, "covering": covering, "saved_rows": 0,
+                    "statements": 0, "executions": 0, "fixes_filesort": False, "routes": set(),
+                })
+                proposal["saved_rows"] += saved
+                proposal["statements"] += 1
+                proposal["executions"] += entry["count"]
+                proposal["fixes_filesort"] |= "filesort" in (row.get("Extra") or "") and bool(ordering)
+                proposal["routes"] |= entry["routes"]
+    return merge_prefixes(list(proposals.values()))
+
+
+def merge_prefixes(proposals):
+    """Fold a proposal into a longer one on the same table that starts with the same columns"""
+    proposals.sort(key=lambda p: -len(p["columns"]))
+    merged = []
+    for proposal in proposals:
+        target = next((m for m in merged if m["table"] == proposal["table"]
+                       and m["columns"][:len(proposal["columns"])] == proposal["columns"]), None)
+        if target is None:
+            merged.append(proposal)
+            continue
+        for key in ("saved_rows", "statements", "executions"):
+            target[key] += proposal[key]
+        target["fixes_filesort"] |= proposal["fixes_filesort"]
+        target["routes"] |= proposal["routes"]
+    return sorted(merged, key=lambda p: -p["saved_rows"])
+
+
+def index_name(table: str, columns) -> str:
+    return f"idx_{table}_{'_'.join(columns)}"[:64]
+
+
+def write_migration(proposals, name: str, source: str) -> str:
+    version = latest_version() + 1
+    path = os.path.join(VERSIONS_DIR, f"{version:04d}_{name}.py")
+    lines = [
+        f'"""Indexes proposed by scripts/index_advisor.py on {date.today().isoformat()} from {source}"""',
+        "from app.core.migrations import create_index_if_missing",
+        "",
+        "",
+        "def upgrade(conn):",
+    ]
+    for p in proposals:
+        notes = [f"~{p['saved_rows']:,.0f} rows examined saved over {p['executions']} executions"]
+        if p["covering"]:
+            notes.append("covering")
+        if p["fixes_filesort"]:
+            notes.append("removes filesort")
+        lines.append(f"    # {p['table']}({', '.join(p['columns'])}): {', '.join(notes)}")
+        lines.append(
+            f"    create_index_if_missing(conn, {p['table']!r}, {index_name(p['table'], p['columns'])!r}, {p['columns']!r})"
+        )
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines).replace("'", '"') + "\n")
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Propose indexes from a captured workload")
+    parser.add_argument("--log", help="NDJSON statement capture or .sql file")
+    parser.add_argument("--replay-endpoints", action="store_true", help="capture by calling GET endpoints in-process")
+    parser.add_argument("--endpoint", action="append", help="endpoint to replay (repeatable)")
+    parser.add_argument("--username", default="admin", help="user to replay endpoints as")
+    parser.add_argument("--min-rows", type=int, default=100, help="ignore scans of smaller tables")
+    parser.add_argument("--min-benefit", type=float, default=0, help="drop proposals saving fewer rows")
+    parser.add_argument("--name", default="advisor_indexes", help="migration file name suffix")
+    parser.add_argument("--dry-run", action="store_true", help="print proposals without writing a migration")
+    args = parser.parse_args()
+
+    if not args.log and not args.replay_endpoints:
+        parser.error("give --log FILE and/or --replay-endpoints")
+
+    statements = []
+    sources = []
+    if args.log:
+        statements += load_log(args.log)
+        sources.append(os.path.basename(args.log))
+    if args.replay_endpoints:
+        statements += replay_endpoints(args.endpoint or DEFAULT_ENDPOINTS, args.username)
+        sources.append("endpoint replay")
+
+    shapes = group_by_shape(statements)
+    print(f"\n🔍 {len(statements)} statements, {len(shapes)} distinct shapes. Running EXPLAIN...\n")
+    proposals = [p for p in analyze(shapes, args.min_rows) if p["saved_rows"] >= args.min_benefit]
+
+    if not proposals:
+        print("✓ No full scans or filesorts that a new index would fix")
+        return
+
+    for p in proposals:
+        flags = "".join([" [covering]" if p["covering"] else "", " [removes filesort]" if p["fixes_filesort"] else ""])
+        print(f"  {p['table']}({', '.join(p['columns'])}){flags}")
+        print(f"      ~{p['saved_rows']:,.0f} rows examined saved, {p['statements']} statement shapes, "
+              f"{p['executions']} executions")
+        if p["routes"]:
+            print(f"      routes: {', '.join(sorted(p['routes']))}")
+
+    if args.dry_run:
+        return
+    path = write_migration(proposals, args.name, " + ".join(sources))
+    print(f"\n✓ Wrote {os.path.relpath(path, BACKEND_DIR)}. Review it, then run `python migrate.py upgrade`.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Online migration of UUID key columns from CHAR(36) to BINARY(16).
+
+Steps (run in order; each is safe to re-run):
+  prepare   add a <column>__bin BINARY(16) shadow column for every UUID column and
+            triggers that keep it in sync on INSERT/UPDATE. The app keeps serving.
+  backfill  fill the shadow columns in primary-key order, in small committed chunks.
+  verify    count rows whose shadow value is missing or differs. Must be all zero.
+  swap      short cutover with writers paused: drop the foreign keys and triggers,
+            replace each CHAR(36) column with its shadow column, then recreate the
+            indexes, primary keys, foreign keys and id-taking stored procedures.
+            Restart the API with DB_UUID_STORAGE=binary afterwards.
+  status    show the shadow-column progress per table.
+
+Ids that are not canonical UUIDs are mapped to UNHEX(LEFT(SHA2(id, 256), 32)),
+the same mapping app/core/uuid_type.py uses, so references stay consistent.
+
+Usage:
+  python scripts/migrate_uuid_binary.py prepare
+  python scripts/migrate_uuid_binary.py backfill [--chunk 1000] [--sleep 0.05]
+  python scripts/migrate_uuid_binary.py verify
+  python scripts/migrate_uuid_binary.py swap --yes
+(Loads DB credentials from .env file)
+"""
+import os
+import re
+import sys
+import time
+import argparse
+from collections import defaultdict
+
+from sqlalchemy import text
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(SCRIPT_DIR)
+sys.path.insert(0, BACKEND_DIR)
+
+from app.core.database import engine, Base  # noqa: E402
+from app.core.uuid_type import UUIDType, CANONICAL_UUID_PATTERN  # noqa: E402
+import app.core.model  # noqa: E402,F401  (registers the tables on Base.metadata)
+
+SHADOW_SUFFIX = "__bin"
+PROCS_DIR = os.path.join(BACKEND_DIR, "migrations", "sql", "procs")
+
+
+def to_bin_sql(expr: str) -> str:
+    return (
+        f"IF({expr} REGEXP '{CANONICAL_UUID_PATTERN}', UUID_TO_BIN({expr}), "
+        f"UNHEX(LEFT(SHA2({expr}, 256), 32)))"
+    )
+
+
+def uuid_columns():
+    """table name -> [uuid column names], in dependency order"""
+    columns = {}
+    for table in Base.metadata.sorted_tables:
+        names = [c.name for c in table.columns if isinstance(c.type, UUIDType)]
+        if names:
+            columns[table.name] = names
+    return columns
+
+
+def primary_key(table_name: str) -> str:
+    return Base.metadata.tables[table_name].primary_key.columns.values()[0].name
+
+
+def data_type(conn, table: str, column: str):
+    return conn.execute(text("""
+        SELECT DATA_TYPE FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :t AND COLUMN_NAME = :c
+    """), {"t": table, "c": column}).scalar()
+
+
+def trigger_names(table: str):
+    return f"{table}_uuid_bin_ins", f"{table}_uuid_bin_upd"
+
+
+def prepare():
+    for table, cols in uuid_columns().items():
+        with engine.begin() as conn:
+            if data_type(conn, table, cols[0]) == "binary":
+                print(f"  {table}: already binary, skipping")
+                continue
+            for col in cols:
+                if data_type(conn, table, col + SHADOW_SUFFIX) is None:
+                    conn.execute(text(f"ALTER TABLE `{table}` ADD COLUMN `{col}{SHADOW_SUFFIX}` BINARY(16) NULL"))
+            sets = "; ".join(f"SET NEW.`{c}{SHADOW_SUFFIX}` = {to_bin_sql(f'NEW.`{c}`')}" for c in cols)
+            ins, upd = trigger_names(table)
+            conn.execute(text(f"DROP TRIGGER IF EXISTS `{ins}`"))
+            conn.execute(text(f"DROP TRIGGER IF EXISTS `{upd}`"))
+            conn.execute(text(f"CREATE TRIGGER `{ins}` BEFORE INSERT ON `{table}` FOR EACH ROW BEGIN {sets}; END"))
+            conn.execute(text(f"CREATE TRIGGER `{upd}` BEFORE UPDATE ON `{table}` FOR EACH ROW BEGIN {sets}; END"))
+        print(f"✓ {table}: shadow columns and triggers for {', '.join(cols)}")
+
+
+def backfill(chunk: int, pause: float):
+    for table, cols in uuid_columns().items():
+        pk = primary_key(table)
+        sets = ", ".join(f"`{c}{SHADOW_SUFFIX}` = {to_bin_sql(f'`{c}`')}" for c in cols)
+        last, total = "", 0
+        while True:
+            with engine.begin() as conn:
+                upper = conn.execute(text(f"""
+                    SELECT MAX(k) FROM (
+                        SELECT `{pk}` AS k FROM `{table}` WHERE `{pk}` > :last ORDER BY `{pk}` LIMIT :chunk
+                    ) AS next_chunk
+                """), {"last": last, "chunk": chunk}).scalar()
+                if upper is None:
+                    break
+                total += conn.execute(
+                    text(f"UPDATE `{table}` SET {sets} WHERE `{pk}` > :last AND `{pk}` <= :upper"),
+                    {"last": last, "upper": upper},
+                ).rowcount
+            last = upper
+            if pause:
+                time.sleep(pause)
+        print(f"✓ {table}: backfilled {total} rows")
+
+
+def verify() -> bool:
+    ok = True
+    with engine.connect() as conn:
+        for table, cols in uuid_columns().items():
+            for col in cols:
+                shadow = col + SHADOW_SUFFIX
+                if data_type(conn, table, shadow) is None:
+                    print(f"✗ {table}.{col}: no shadow column (run prepare)")
+                    ok = False
+                    continue
+                mismatched = conn.execute(text(f"""
+                    SELECT COUNT(*) FROM `{table}`
+                    WHERE `{col}` IS NOT NULL AND (`{shadow}` IS NULL OR `{shadow}` <> {to_bin_sql(f'`{col}`')})
+                """)).scalar()
+                legacy = conn.execute(text(
+                    f"SELECT COUNT(*) FROM `{table}` WHERE `{col}` NOT REGEXP '{CANONICAL_UUID_PATTERN}'"
+                )).scalar()
+                mark = "✓" if mismatched == 0 else "✗"
+                note = f", {legacy} non-canonical ids (hash-mapped)" if legacy else ""
+                print(f"{mark} {table}.{col}: {mismatched} rows pending{note}")
+                ok = ok and mismatched == 0
+    return ok
+
+
+def _foreign_keys(conn, tables):
+    rows = conn.execute(text("""
+        SELECT k.TABLE_NAME, k.CONSTRAINT_NAME, k.COLUMN_NAME, k.REFERENCED_TABLE_NAME,
+               k.REFERENCED_COLUMN_NAME, r.UPDATE_RULE, r.DELETE_RULE
+        FROM information_schema.KEY_COLUMN_USAGE k
+        JOIN information_schema.REFERENTIAL_CONSTRAINTS r
+          ON r.CONSTRAINT_SCHEMA = k.CONSTRAINT_SCHEMA AND r.CONSTRAINT_NAME = k.CONSTRAINT_NAME
+        WHERE k.CONSTRAINT_SCHEMA = DATABASE() AND k.REFERENCED_TABLE_NAME IS NOT NULL
+        ORDER BY k.TABLE_NAME, k.CONSTRAINT_NAME, k.ORDINAL_POSITION
+    """)).all()
+    fks = {}
+    for table, name, col, ref_table, ref_col, on_update, on_delete in rows:
+        if table not in tables and ref_table not in tables:
+            continue
+        fk = fks.setdefault((table, name), {"cols": [], "ref_table": ref_table, "ref_cols": [],
+                                            "on_update": on_update, "on_delete": on_delete})
+        fk["cols"].append(col)
+        fk["ref_cols"].append(ref_col)
+    return fks
+
+
+def _indexes(conn, table, cols):
+    rows = conn.execute(text("""
+        SELECT INDEX_NAME, NON_UNIQUE, COLUMN_NAME FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :t
+        ORDER BY INDEX_NAME, SEQ_IN_INDEX
+    """), {"t": table}).all()
+    indexes = defaultdict(lambda: {"unique": False, "cols": []})
+    for name, non_unique, col in rows:
+        indexes[name]["unique"] = not non_unique
+        indexes[name]["cols"].append(col)
+    return {name: idx for name, idx in indexes.items() if set(idx["cols"]) & set(cols)}
+
+
+def _binary_procs():
+    """Procedure files with VARCHAR(36) id parameters, rewritten to take BINARY(16)"""
+    param = re.compile(r"(IN\s+\w+\s+)VARCHAR\(36\)", re.IGNORECASE)
+    for filename in sorted(os.listdir(PROCS_DIR)):
+        with open(os.path.join(PROCS_DIR, filename), encoding="utf-8") as f:
+            sql = f.read()
+        if not param.search(sql):
+            continue
+        sql = "\n".join(line for line in sql.splitlines() if not line.strip().startswith("--"))
+        drop, create = sql.split(";", 1)
+        yield filename, drop, param.sub(r"\1BINARY(16)", create).strip()
+
+
+def swap():
+    columns = uuid_columns()
+    with engine.connect() as conn:
+        fks = _foreign_keys(conn, columns)
+        conn.execute(text("SET FOREIGN_KEY_CHECKS = 0"))
+        try:
+            for (table, name) in fks:
+                conn.execute(text(f"ALTER TABLE `{table}` DROP FOREIGN KEY `{name}`"))
+            print(f"✓ Dropped {len(fks)} foreign keys")
+
+            for table, cols in columns.items():
+                if data_type(conn, table, cols[0]) == "binary":
+                    print(f"  {table}: already binary, skipping")
+                    continue
+                for trigger in trigger_names(table):
+                    conn.execute(text(f"DROP TRIGGER IF EXISTS `{trigger}`"))
+                indexes = _indexes(conn, table, cols)
+                changes = [f"DROP INDEX `{name}`" for name in indexes if name != "PRIMARY"]
+                if "PRIMARY" in indexes:
+                    changes.append("DROP PRIMARY KEY")
+                for col in cols:
+                    nullable = Base.metadata.tables[table].columns[col].nullable
+                    changes.append(f"DROP COLUMN `{col}`")
+                    changes.append(
+                        f"CHANGE COLUMN `{col}{SHADOW_SUFFIX}` `{col}` BINARY(16) {'NULL' if nullable else 'NOT NULL'}"
+                    )
+                for name, idx in indexes.items():
+                    col_list = ", ".join(f"`{c}`" for c in idx["cols"])
+                    if name == "PRIMARY":
+                        changes.append(f"ADD PRIMARY KEY ({col_list})")
+                    else:
+                        changes.append(f"ADD {'UNIQUE ' if idx['unique'] else ''}INDEX `{name}` ({col_list})")
+                conn.execute(text(f"ALTER TABLE `{table}` " + ", ".join(changes)))
+                conn.commit()
+                print(f"✓ {table}: {', '.join(cols)} now BINARY(16)")
+
+            for (table, name), fk in fks.items():
+                cols = ", ".join(f"`{c}`" for c in fk["cols"])
+                ref_cols = ", ".join(f"`{c}`" for c in fk["ref_cols"])
+                conn.execute(text(
+                    f"ALTER TABLE `{table}` ADD CONSTRAINT `{name}` FOREIGN KEY ({cols}) "
+                    f"REFERENCES `{fk['ref_table']}` ({ref_cols}) "
+                    f"ON UPDATE {fk['on_update']} ON DELETE {fk['on_delete']}"
+                ))
+            conn.commit()
+            print(f"✓ Recreated {len(fks)} foreign keys")
+        finally:
+            conn.execute(text("SET FOREIGN_KEY_CHECKS = 1"))
+
+        for filename, drop, create in _binary_procs():
+            conn.exec_driver_sql(drop)
+            conn.exec_driver_sql(create)
+            conn.commit()
+            print(f"✓ Recreated procedure from {filename} with BINARY(16) id parameters")
+
+    print("\nDone. Restart the API with DB_UUID_STORAGE=binary.")
+
+
+def status():
+    with engine.connect() as conn:
+        for table, cols in uuid_columns().items():
+            col = cols[0]
+            kind = data_type(conn, table, col)
+            if kind == "binary":
+                print(f"  {table:<20} binary")
+                continue
+            if data_type(conn, table, col + SHADOW_SUFFIX) is None:
+                print(f"  {table:<20} {kind}, not prepared")
+                continue
+            total, filled = conn.execute(text(
+                f"SELECT COUNT(*), COUNT(`{col}{SHADOW_SUFFIX}`) FROM `{table}`"
+            )).one()
+            print(f"  {table:<20} {kind}, shadow {filled}/{total}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate UUID keys from CHAR(36) to BINARY(16)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("prepare")
+    bf = sub.add_parser("backfill")
+    bf.add_argument("--chunk", type=int, default=1000, help="rows per committed batch")
+    bf.add_argument("--sleep", type=float, default=0.05, help="pause between batches (seconds)")
+    sub.add_parser("verify")
+    sw = sub.add_parser("swap")
+    sw.add_argument("--yes", action="store_true", help="confirm writers are paused")
+    sub.add_parser("status")
+    args = parser.parse_args()
+
+    if engine.dialect.name != "mysql":
+        print("✗ This migration targets MySQL 8")
+        sys.exit(1)
+
+    if args.command == "prepare":
+        prepare()
+    elif args.command == "backfill":
+        backfill(args.chunk, args.sleep)
+    elif args.command == "verify":
+        sys.exit(0 if verify() else 1)
+    elif args.command == "swap":
+        if not args.yes:
+            print("✗ swap rewrites every key column; pause writers and re-run with --yes")
+            sys.exit(1)
+        if not verify():
+            print("✗ Shadow columns are incomplete; run backfill first")
+            sys.exit(1)
+        swap()
+    elif args.command == "status":
+        status()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Seed synthetic orders (with items) for load and performance testing.
+
+Picks random customers, cities and products from the reference data loaded by
+reset_database.py and writes orders and order items through app.utils.bulk, one
+multi-row INSERT per DB_BULK_BATCH_SIZE rows, committing every --commit-every orders.
+
+Usage:
+  python scripts/seed_orders.py --orders 50000 --items-per-order 3
+(Loads DB credentials from .env file; run reset_database.py first)
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+from datetime import datetime, timedelta
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(SCRIPT_DIR)
+sys.path.insert(0, BACKEND_DIR)
+
+import app.core.model as model  # noqa: E402
+from app.core.database import Session_local  # noqa: E402
+from app.utils.bulk import bulk_insert, BULK_BATCH_SIZE  # noqa: E402
+
+STATUSES = list(model.OrderStatus)
+
+
+def order_rows(count: int, customers, cities, products, items_per_order: int):
+    """Build `count` orders and their items as row dicts for bulk_insert"""
+    orders, items = [], []
+    now = datetime.now()
+    for _ in range(count):
+        order_id = model.generate_uuid()
+        lines = [
+            (random.choice(products), random.randint(1, 20), round(random.uniform(50, 5000), 2))
+            for _ in range(random.randint(1, items_per_order))
+        ]
+        orders.append({
+            "order_id": order_id,
+            "customer_id": random.choice(customers),
+            "order_date": now - timedelta(days=random.randint(0, 365)),
+            "deliver_address": f"{random.randint(1, 500)} Main Street",
+            "status": random.choice(STATUSES),
+            "deliver_city_id": random.choice(cities),
+            "full_price": sum(quantity * price for _, quantity, price in lines),
+            "warehouse_id": None,
+        })
+        items.extend(
+            {"order_id": order_id, "store_id": None, "product_type_id": product,
+             "quantity": quantity, "item_price": price}
+            for product, quantity, price in lines
+        )
+    return orders, items
+
+
+def seed(total: int, items_per_order: int, commit_every: int, batch: int) -> None:
+    db = Session_local()
+    try:
+        customers = [c for (c,) in db.query(model.Customers.customer_id).all()]
+        cities = [c for (c,) in db.query(model.Cities.city_id).all()]
+        products = [p for (p,) in db.query(model.Products.product_type_id).all()]
+        if not (customers and cities and products):
+            print("❌ Customers, cities and products must be loaded first (run reset_database.py)")
+            return
+
+        start = time.perf_counter()
+        written_orders = written_items = 0
+        while written_orders < total:
+            orders, items = order_rows(min(commit_every, total - written_orders), customers, cities, products,
+                                       items_per_order)
+            bulk_insert(db, model.Orders, orders, batch)
+            bulk_insert(db, model.OrderItems, items, batch)
+            db.commit()
+            written_orders += len(orders)
+            written_items += len(items)
+            print(f"   {written_orders}/{total} orders")
+
+        elapsed = time.perf_counter() - start
+        rows = written_orders + written_items
+        print(f"✅ Inserted {written_orders} orders and {written_items} items in {elapsed:.1f}s "
+              f"({rows / elapsed:,.0f} rows/s)")
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed synthetic orders with bulk inserts")
+    parser.add_argument("--orders", type=int, default=10000)
+    parser.add_argument("--items-per-order", type=int, default=3, help="maximum items per order")
+    parser.add_argument("--commit-every", type=int, default=5000, help="orders per transaction")
+    parser.add_argument("--batch", type=int, default=BULK_BATCH_SIZE, help="rows per INSERT statement")
+    args = parser.parse_args()
+
+    print(f"🔄 Seeding {args.orders} orders...")
+    seed(args.orders, args.items_per_order, args.commit_every, args.batch)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,9 @@
+#!/bin/sh
+# Container start command (Dockerfile, Dockerfile.railway, railway.toml, docker-compose.dev.yml):
+# apply pending schema migrations, then serve the API. Extra arguments go to uvicorn.
+# Behind a proxy, set FORWARDED_ALLOW_IPS to its addresses (IPs or CIDRs) so the
+# client address (login throttling per IP) is taken from X-Forwarded-For.
+set -e
+python migrate.py upgrade
+exec uvicorn app.main:app --host 0.0.0.0 --port "${PORT:-8000}" \
+    --proxy-headers --forwarded-allow-ips "${FORWARDED_ALLOW_IPS:-127.0.0.1}" "$@"
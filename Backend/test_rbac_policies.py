@@ -0,0 +1,149 @@
+"""
+Test role-based access control for KandyPack Logistics API
+Checks check_role_permission for every role, the compiled policy table, the
+require_policy dependency and the SQL warehouse scope. No server or database needed.
+
+Run with `python -m pytest test_rbac_policies.py` or `python test_rbac_policies.py`
+"""
+
+import asyncio
+
+from fastapi import HTTPException
+from sqlalchemy.dialects import mysql
+
+import app.core.model as model
+from app.core.auth import check_role_permission
+from app.core.policies import (
+    POLICIES,
+    COMPILED_POLICIES,
+    ROLES,
+    Policy,
+    compile_policies,
+    get_policy,
+    authorize,
+    require_policy,
+    scope_filter,
+    apply_scope,
+)
+
+# Role lists used by the routers and the roles each one must admit
+ROLE_CASES = [
+    (["Management"], {"SystemAdmin", "Management"}),
+    (["StoreManager", "Management"], {"SystemAdmin", "StoreManager", "Management"}),
+    (["Assistant", "Management"], {"SystemAdmin", "Assistant", "Management"}),
+    (["WarehouseStaff", "Management"], {"SystemAdmin", "WarehouseStaff", "Management"}),
+    (["Assistant", "Management", "Driver", "WarehouseStaff"],
+     {"SystemAdmin", "Assistant", "Management", "Driver", "WarehouseStaff"}),
+    (["Customer"], {"SystemAdmin", "Customer"}),
+    ([], {"SystemAdmin"}),
+]
+
+
+def principal(role, user_id="u-1"):
+    return {"user_id": user_id, "username": "test", "role": role}
+
+
+def test_check_role_permission_each_role():
+    for allowed_roles, expected in ROLE_CASES:
+        for role in ROLES:
+            assert check_role_permission(role, allowed_roles) == (role in expected), (role, allowed_roles)
+
+
+def test_check_role_permission_unknown_role():
+    assert not check_role_permission(None, ["Management"])
+    assert not check_role_permission("", ["Management"])
+    assert not check_role_permission("management", ["Management"])
+
+
+def test_compiled_policies_match_check_role_permission():
+    for name, policy in POLICIES.items():
+        compiled = COMPILED_POLICIES[name]
+        for role in ROLES:
+            assert compiled.allows(role) == check_role_permission(role, list(policy.roles)), (name, role)
+
+
+def test_default_detail():
+    assert get_policy("reports.read").detail == "Management or SystemAdmin role required"
+    assert get_policy("cities.read").detail == "StoreManager, Management or SystemAdmin role required"
+    assert get_policy("trucks.read").detail == "You don't have permission to view trucks"
+
+
+def test_compile_rejects_bad_policies():
+    for bad in (Policy(("Manager",)), Policy(("Management",), scope="region"),
+                Policy(("Management",), principal="service")):
+        try:
+            compile_policies({"bad.policy": bad})
+        except ValueError:
+            continue
+        raise AssertionError(f"{bad} compiled")
+
+
+def test_unknown_policy_name():
+    try:
+        require_policy("orders.nope")
+    except KeyError:
+        return
+    raise AssertionError("unknown policy name accepted")
+
+
+def test_require_policy_dependency():
+    dependency = require_policy("orders.write")
+    for role in ROLES:
+        user = principal(role)
+        if role in ("SystemAdmin", "Management"):
+            assert asyncio.run(dependency(current_user=user)) is user
+            continue
+        try:
+            asyncio.run(dependency(current_user=user))
+        except HTTPException as exc:
+            assert exc.status_code == 403
+            assert exc.detail == "Management or SystemAdmin role required"
+        else:
+            raise AssertionError(f"{role} allowed by orders.write")
+
+
+def test_authorize():
+    user = principal("Management")
+    assert authorize("orders.last_mile", user) is user
+    try:
+        authorize("orders.last_mile", principal("Driver"))
+    except HTTPException as exc:
+        assert exc.status_code == 403
+        assert exc.detail == "Access restricted to Customers, Management, or SystemAdmin"
+    else:
+        raise AssertionError("Driver allowed by orders.last_mile")
+
+
+def test_warehouse_scope_for_store_manager():
+    condition = scope_filter("orders.list", principal("StoreManager", "sm-1"), model.Orders.warehouse_id)
+    sql = str(condition.compile(dialect=mysql.dialect(), compile_kwargs={"literal_binds": True}))
+    assert "orders.warehouse_id IN (SELECT stores.store_id" in sql
+    assert "stores.contact_person = 'sm-1'" in sql
+
+
+def test_warehouse_scope_only_applies_to_store_managers():
+    for role in ("SystemAdmin", "Management"):
+        assert scope_filter("orders.list", principal(role), model.Orders.warehouse_id) is None
+    # unscoped policies never filter
+    assert scope_filter("orders.read", principal("StoreManager"), model.Orders.warehouse_id) is None
+
+
+def test_apply_scope_single_statement():
+    from sqlalchemy import select
+    query = apply_scope(select(model.Orders), "orders.list", principal("StoreManager"), model.Orders.warehouse_id)
+    sql = str(query.compile(dialect=mysql.dialect()))
+    assert sql.count("SELECT") == 2 and "IN (SELECT stores.store_id" in sql
+
+
+if __name__ == "__main__":
+    tests = [(name, fn) for name, fn in sorted(globals().items()) if name.startswith("test_") and callable(fn)]
+    failed = 0
+    for name, fn in tests:
+        try:
+            fn()
+            print(f"✅ {name}")
+        except AssertionError as exc:
+            failed += 1
+            print(f"❌ {name}: {exc}")
+    print(f"\n{len(tests) - failed}/{len(tests)} passed")
+    raise SystemExit(1 if failed else 0)